@@ -0,0 +1,80 @@
+"""
+Module that contains an asyncio facade over an R-Tree, for serving queries from an event loop
+"""
+import asyncio
+from itertools import islice
+
+from bounds import bounds_of
+from point import Point
+from r_tree import RTree, Entry
+from rectangle import Rectangle
+
+
+class AsyncRTree:
+    """
+    Runs whole queries in an executor, so that a long traversal never blocks the event loop.
+        Streamed results are pulled from the tree's iterators in batches of `yield_every` Entries, also in the executor,
+        so the traversal between two batches (however many nodes it visits) does not run on the loop either.
+        Identical queries which are in flight at the same time share a single traversal.
+    The tree is read from other threads - if it is also written to, wrap a concurrent_r_tree.ConcurrentRTree
+    """
+    def __init__(self, r_tree: RTree, executor=None, yield_every: int = 64):
+        """
+        :param r_tree: Anything with search() and nearest()/iter_nearest() - an RTree, a ConcurrentRTree, a PagedRTree
+        :param executor: The concurrent.futures executor queries run in, the loop's default one if None
+        :param yield_every: How many streamed Entries to pull from the tree in one executor call
+        """
+        self.r_tree = r_tree
+        self.executor = executor
+        self.yield_every = yield_every
+        self._in_flight = {}
+
+    async def search(self, window: Rectangle) -> [Entry]:
+        return await self._coalesced(('search', bounds_of(window)), self.r_tree.search, window)
+
+    async def nearest(self, query, k: int = 1) -> [Entry]:
+        query_key = (query.x, query.y) if isinstance(query, Point) else bounds_of(query)
+        return await self._coalesced(('nearest', query_key, k), self.r_tree.nearest, query, k)
+
+    async def iter_search(self, window: Rectangle):
+        """
+        Asynchronously yields every Entry whose MBR intersects the window, as the traversal finds them
+        """
+        if hasattr(self.r_tree, 'iter_search'):
+            iterator = self.r_tree.iter_search(window)
+        else:
+            def searched():  # a generator, so that the search runs when the first batch is pulled in the executor
+                yield from self.r_tree.search(window)
+            iterator = searched()
+        async for entry in self._stream(iterator):
+            yield entry
+
+    async def iter_nearest(self, query):
+        """
+        Asynchronously yields every Entry in increasing distance from the query.
+            Only the nodes needed for the Entries actually consumed are expanded
+        """
+        async for entry in self._stream(self.r_tree.iter_nearest(query)):
+            yield entry
+
+    async def _stream(self, iterator):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await loop.run_in_executor(self.executor, list, islice(iterator, self.yield_every))
+            for entry in batch:
+                yield entry
+            if len(batch) < self.yield_every:
+                return
+
+    async def _coalesced(self, key: tuple, query, *args) -> [Entry]:
+        """
+        Runs the query in the executor, unless an identical one is already running - then waits for its results
+        """
+        future = self._in_flight.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().run_in_executor(self.executor, query, *args)
+            self._in_flight[key] = future
+            future.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        # Shielded, so that one cancelled caller does not cancel the query for the others
+        results = await asyncio.shield(future)
+        return list(results)
@@ -0,0 +1,151 @@
+import asyncio
+import threading
+import unittest
+
+from async_r_tree import AsyncRTree
+from concurrent_r_tree import ConcurrentRTree
+from entry_fixtures import grid_entries
+from point import Point
+from r_tree import RTree, Entry
+from rectangle import Rectangle
+
+
+EVERYTHING = Rectangle(Point(-1000, 1000), Point(1000, -1000))
+
+
+class BlockingRTree(RTree):
+    """
+    An RTree whose searches wait until released, to keep queries in flight
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.release = threading.Event()
+        self.search_count = 0
+
+    def search(self, window: Rectangle) -> [Entry]:
+        self.search_count += 1
+        self.release.wait(timeout=5)
+        return super().search(window)
+
+
+class AsyncRTreeTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.entries = grid_entries(10, 10, size=2)
+        self.r_tree = RTree(2, 4)
+        self.r_tree.insert_many(self.entries)
+
+    async def test_search_and_nearest_match_tree(self):
+        async_r_tree = AsyncRTree(self.r_tree)
+        window = Rectangle(Point(15, 35), Point(45, 5))
+        self.assertCountEqual(self.r_tree.search(window), await async_r_tree.search(window))
+        self.assertEqual(self.r_tree.nearest(Point(33, 33), k=5), await async_r_tree.nearest(Point(33, 33), k=5))
+
+    async def test_streams_results(self):
+        async_r_tree = AsyncRTree(self.r_tree, yield_every=7)
+        window = Rectangle(Point(15, 35), Point(45, 5))
+        streamed = [entry async for entry in async_r_tree.iter_search(window)]
+        self.assertCountEqual(self.r_tree.search(window), streamed)
+
+        streamed = []
+        async for entry in async_r_tree.iter_nearest(Point(0, 0)):
+            streamed.append(entry)
+            if len(streamed) == 10:
+                break
+        self.assertEqual(self.r_tree.nearest(Point(0, 0), k=10), streamed)
+
+    async def test_streaming_yields_to_event_loop(self):
+        async_r_tree = AsyncRTree(self.r_tree, yield_every=10)
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0)
+
+        ticker_task = asyncio.create_task(ticker())
+        await asyncio.sleep(0)
+        ticks_before = ticks
+        count = len([entry async for entry in async_r_tree.iter_search(EVERYTHING)])
+        ticker_task.cancel()
+
+        self.assertEqual(100, count)
+        self.assertGreaterEqual(ticks - ticks_before, 9)
+
+    async def test_streaming_traverses_the_tree_off_the_event_loop(self):
+        loop_thread = threading.get_ident()
+        traversal_threads = set()
+
+        class RecordingRTree(RTree):
+            def iter_search(self, window: Rectangle):
+                for entry in super().iter_search(window):
+                    traversal_threads.add(threading.get_ident())
+                    yield entry
+
+            def iter_nearest(self, query):
+                for entry in super().iter_nearest(query):
+                    traversal_threads.add(threading.get_ident())
+                    yield entry
+
+        r_tree = RecordingRTree(2, 4)
+        r_tree.insert_many(self.entries)
+        async_r_tree = AsyncRTree(r_tree, yield_every=8)
+
+        self.assertEqual(100, len([entry async for entry in async_r_tree.iter_search(EVERYTHING)]))
+        async for _ in async_r_tree.iter_nearest(Point(0, 0)):
+            pass
+
+        self.assertTrue(traversal_threads)
+        self.assertNotIn(loop_thread, traversal_threads)
+
+    async def test_coalesces_identical_in_flight_queries(self):
+        r_tree = BlockingRTree(2, 4)
+        r_tree.insert_many(self.entries)
+        async_r_tree = AsyncRTree(r_tree)
+        window = Rectangle(Point(15, 35), Point(45, 5))
+        same_window = Rectangle(Point(15, 35), Point(45, 5))
+
+        queries = [asyncio.create_task(async_r_tree.search(window)),
+                   asyncio.create_task(async_r_tree.search(same_window)),
+                   asyncio.create_task(async_r_tree.search(EVERYTHING))]
+        await asyncio.sleep(0.05)
+        r_tree.release.set()
+        first, second, everything = await asyncio.gather(*queries)
+
+        self.assertEqual(2, r_tree.search_count)
+        self.assertCountEqual(first, second)
+        self.assertIsNot(first, second)
+        self.assertEqual(100, len(everything))
+        self.assertEqual({}, async_r_tree._in_flight)
+
+        # Finished queries are not cached
+        await async_r_tree.search(window)
+        self.assertEqual(3, r_tree.search_count)
+
+    async def test_cancelled_caller_does_not_cancel_shared_query(self):
+        r_tree = BlockingRTree(2, 4)
+        r_tree.insert_many(self.entries)
+        async_r_tree = AsyncRTree(r_tree)
+
+        cancelled = asyncio.create_task(async_r_tree.search(EVERYTHING))
+        waiting = asyncio.create_task(async_r_tree.search(EVERYTHING))
+        await asyncio.sleep(0.05)
+        cancelled.cancel()
+        r_tree.release.set()
+
+        self.assertEqual(100, len(await waiting))
+        with self.assertRaises(asyncio.CancelledError):
+            await cancelled
+
+    async def test_wraps_concurrent_tree(self):
+        concurrent_r_tree = ConcurrentRTree(2, 4)
+        concurrent_r_tree.insert_many(self.entries)
+        async_r_tree = AsyncRTree(concurrent_r_tree)
+
+        self.assertEqual(100, len(await async_r_tree.search(EVERYTHING)))
+        self.assertEqual(100, len([entry async for entry in async_r_tree.iter_search(EVERYTHING)]))
+        self.assertEqual(['0-0'], [entry.name for entry in await async_r_tree.nearest(Point(-5, -5))])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,352 @@
+"""
+Benchmarks for the R-Tree
+    python benchmark.py memory --entries 100000
+    python benchmark.py suite --entries 20000 --orders 2:4,4:16,16:64 --output results.json
+    python benchmark.py suite --entries 20000 --compare results.json
+    python benchmark.py suite --entries 20000 --knn 1,10,100 --distributions uniform,clustered
+
+Every distribution is generated from a fixed seed, so runs of different versions build and query the same data
+"""
+import argparse
+import json
+import platform
+import random
+import statistics
+import time
+import tracemalloc
+
+from point import Point
+from r_tree import RTree, Entry
+from rectangle import Rectangle
+from split_strategies import QuadraticSplit
+
+
+def uniform_entries(count: int, extent: int = 100_000, max_size: int = 100, seed: int = 0) -> [Entry]:
+    """
+    :return: Entries with randomly sized rectangles spread uniformly over an extent x extent square
+    """
+    generator = random.Random(seed)
+    entries = []
+    for idx in range(count):
+        x, y = generator.uniform(0, extent), generator.uniform(0, extent)
+        width, height = generator.uniform(1, max_size), generator.uniform(1, max_size)
+        entries.append(Entry(str(idx), bounds=Rectangle(Point(x, y + height), Point(x + width, y))))
+    return entries
+
+
+def clustered_entries(count: int, extent: int = 100_000, max_size: int = 100, seed: int = 0,
+                      cluster_count: int = 20, spread: int = 1_000) -> [Entry]:
+    """
+    :return: Entries with randomly sized rectangles, normally distributed around cluster_count random centers
+    """
+    generator = random.Random(seed)
+    centers = [(generator.uniform(0, extent), generator.uniform(0, extent)) for _ in range(cluster_count)]
+    entries = []
+    for idx in range(count):
+        center_x, center_y = generator.choice(centers)
+        x, y = generator.gauss(center_x, spread), generator.gauss(center_y, spread)
+        width, height = generator.uniform(1, max_size), generator.uniform(1, max_size)
+        entries.append(Entry(str(idx), bounds=Rectangle(Point(x, y + height), Point(x + width, y))))
+    return entries
+
+
+def skewed_entries(count: int, extent: int = 100_000, max_size: int = 100, seed: int = 0) -> [Entry]:
+    """
+    :return: Entries with randomly sized rectangles, crowded towards the origin (their coordinates are cubed)
+    """
+    generator = random.Random(seed)
+    entries = []
+    for idx in range(count):
+        x, y = generator.random() ** 3 * extent, generator.random() ** 3 * extent
+        width, height = generator.uniform(1, max_size), generator.uniform(1, max_size)
+        entries.append(Entry(str(idx), bounds=Rectangle(Point(x, y + height), Point(x + width, y))))
+    return entries
+
+
+def mixed_size_entries(count: int, extent: int = 100_000, seed: int = 0, huge_fraction: float = 0.05) -> [Entry]:
+    """
+    :return: Entries spread uniformly, mostly tiny (up to 2 units wide) with a huge_fraction of huge ones
+        (up to a tenth of the extent wide)
+    """
+    generator = random.Random(seed)
+    entries = []
+    for idx in range(count):
+        max_size = extent / 10 if generator.random() < huge_fraction else 2
+        x, y = generator.uniform(0, extent), generator.uniform(0, extent)
+        width, height = generator.uniform(1, max_size), generator.uniform(1, max_size)
+        entries.append(Entry(str(idx), bounds=Rectangle(Point(x, y + height), Point(x + width, y))))
+    return entries
+
+
+DISTRIBUTIONS = {
+    'uniform': uniform_entries,
+    'clustered': clustered_entries,
+    'skewed': skewed_entries,
+    'mixed': mixed_size_entries,
+}
+
+
+# The k of the nearest() queries run by every case
+KNN_KS = (1, 10, 100)
+
+
+def query_windows(entries: [Entry], count: int, size: int = 1_000, seed: int = 1) -> [Rectangle]:
+    """
+    :return: size x size query windows, each centered on a random Entry so that queries follow the data
+    """
+    generator = random.Random(seed)
+    windows = []
+    for _ in range(count):
+        center = generator.choice(entries).mbr.calculate_center()
+        windows.append(Rectangle(Point(center.x - size / 2, center.y + size / 2),
+                                 Point(center.x + size / 2, center.y - size / 2)))
+    return windows
+
+
+def query_points(entries: [Entry], count: int, seed: int = 2) -> [Point]:
+    """
+    :return: kNN query points, each the center of a random Entry so that queries follow the data
+    """
+    generator = random.Random(seed)
+    return [generator.choice(entries).mbr.calculate_center() for _ in range(count)]
+
+
+def timed_split_strategy(split_strategy):
+    """
+    :return: A subclass of the split strategy which adds up the number of splits and the time spent in them
+    """
+    class TimedSplit(split_strategy):
+        split_count = 0
+        split_seconds = 0.0
+
+        @classmethod
+        def split(cls, items: list, min_order: int):
+            start = time.perf_counter()
+            groups = super().split(items, min_order)
+            cls.split_seconds += time.perf_counter() - start
+            cls.split_count += 1
+            return groups
+
+    return TimedSplit
+
+
+def percentiles(values: list) -> dict:
+    if len(values) == 1:
+        cut_points = values * 99  # statistics.quantiles() needs at least two values
+    else:
+        cut_points = statistics.quantiles(values, n=100, method='inclusive')
+    return {'p50': cut_points[49], 'p90': cut_points[89], 'p99': cut_points[98], 'max': max(values)}
+
+
+def run_case(entries: [Entry], min_order: int, max_order: int, query_count: int, split_strategy=QuadraticSplit,
+             knn_ks: [int] = KNN_KS) -> dict:
+    """
+    Builds a tree out of the entries one add() at a time, then runs query_count window queries against it
+        and query_count nearest() queries for every k of knn_ks.
+        The peak memory only covers what the tree allocates, as the entries exist before it is built.
+        The visited nodes are counted by the statistics of a second, identical tree, so they do not slow down the timed one
+    """
+    strategy = timed_split_strategy(split_strategy)
+    r_tree = RTree(min_order, max_order, split_strategy=strategy)
+    start = time.perf_counter()
+    for entry in entries:
+        r_tree.add(entry)
+    insert_seconds = time.perf_counter() - start
+
+    counted_tree = RTree(min_order, max_order, split_strategy=split_strategy, collect_statistics=True)
+    for entry in entries:
+        counted_tree.add(entry)
+    visited = []
+    counted_tree.statistics.on_query(lambda event: visited.append(event.nodes_visited))
+
+    windows = query_windows(entries, query_count)
+    latencies = []
+    for window in windows:
+        start = time.perf_counter()
+        r_tree.search(window)
+        latencies.append((time.perf_counter() - start) * 1_000_000)
+    for window in windows:
+        counted_tree.search(window)
+    window_visited = list(visited)
+
+    points = query_points(entries, query_count)
+    knn = {}
+    for k in knn_ks:
+        knn_latencies = []
+        for point in points:
+            start = time.perf_counter()
+            r_tree.nearest(point, k)
+            knn_latencies.append((time.perf_counter() - start) * 1_000_000)
+        visited.clear()
+        for point in points:
+            counted_tree.nearest(point, k)
+        knn_visited = list(visited)
+        # Keyed by the k as a string, like the results look once saved as JSON
+        knn[str(k)] = {
+            'latency_us': percentiles(knn_latencies),
+            'nodes_visited_per_query': {'mean': statistics.fmean(knn_visited), **percentiles(knn_visited)},
+        }
+
+    # Built again, as tracing allocations slows everything down
+    tracemalloc.start()
+    traced_tree = RTree(min_order, max_order, split_strategy=split_strategy)
+    for entry in entries:
+        traced_tree.add(entry)
+    _, peak_size = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'min_order': min_order,
+        'max_order': max_order,
+        'height': r_tree.root.height(),
+        'inserts_per_second': len(entries) / insert_seconds,
+        'splits': strategy.split_count,
+        'split_seconds': strategy.split_seconds,
+        'query_latency_us': percentiles(latencies),
+        'nodes_visited_per_query': {'mean': statistics.fmean(window_visited), **percentiles(window_visited)},
+        'knn': knn,
+        'peak_bytes': peak_size,
+    }
+
+
+def run_suite(entry_count: int, orders: [(int, int)], distributions: [str], query_count: int,
+              knn_ks: [int] = KNN_KS) -> dict:
+    """
+    Runs every distribution against every (min_order, max_order) pair
+    :return: The results along with the environment they were measured in, ready to be saved as JSON
+    """
+    cases = {}
+    for distribution in distributions:
+        entries = DISTRIBUTIONS[distribution](entry_count)
+        cases[distribution] = [run_case(entries, min_order, max_order, query_count, knn_ks=knn_ks)
+                               for min_order, max_order in orders]
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'entries': entry_count,
+        'queries': query_count,
+        'knn_ks': list(knn_ks),
+        'cases': cases,
+    }
+
+
+# metric -> whether a higher value is better
+COMPARED_METRICS = {
+    'inserts_per_second': True,
+    'split_seconds': False,
+    'query_latency_us.p50': False,
+    'query_latency_us.p99': False,
+    'nodes_visited_per_query.mean': False,
+    'peak_bytes': False,
+}
+# Compared for every k a case's 'knn' results hold
+COMPARED_KNN_METRICS = {
+    'latency_us.p50': False,
+    'latency_us.p99': False,
+    'nodes_visited_per_query.mean': False,
+}
+
+
+def compare(baseline: dict, results: dict, tolerance: float = 0.1) -> [str]:
+    """
+    :return: A line per metric of a case which got worse than in the baseline by more than the tolerance (a fraction)
+    """
+    regressions = []
+    for distribution, cases in results['cases'].items():
+        baseline_cases = {(case['min_order'], case['max_order']): case for case in baseline['cases'].get(distribution, [])}
+        for case in cases:
+            baseline_case = baseline_cases.get((case['min_order'], case['max_order']))
+            if baseline_case is None:
+                continue
+            metrics = dict(COMPARED_METRICS)
+            metrics.update((f'knn.{k}.{metric}', higher_is_better) for k in case.get('knn', {})
+                           for metric, higher_is_better in COMPARED_KNN_METRICS.items())
+            for metric, higher_is_better in metrics.items():
+                value, baseline_value = case, baseline_case
+                for key in metric.split('.'):
+                    value, baseline_value = value.get(key, {}), baseline_value.get(key, {})
+                if value == {} or baseline_value == {}:
+                    continue  # not measured by one of the runs, e.g a k it was not run with
+                if not baseline_value:
+                    continue
+                change = (value - baseline_value) / baseline_value
+                if (-change if higher_is_better else change) > tolerance:
+                    regressions.append(f'{distribution} {case["min_order"]}:{case["max_order"]} {metric}: '
+                                       f'{baseline_value:,.1f} -> {value:,.1f} ({change:+.0%})')
+    return regressions
+
+
+def measure_memory(entry_count: int, min_order: int, max_order: int) -> dict:
+    """
+    Measures the memory allocated for the entries and for a tree indexing them, in bytes per indexed entry
+    """
+    tracemalloc.start()
+    entries = uniform_entries(entry_count)
+    entries_size, _ = tracemalloc.get_traced_memory()
+
+    r_tree = RTree(min_order, max_order)
+    for entry in entries:
+        r_tree.add(entry)
+    total_size, peak_size = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'entries': entry_count,
+        'min_order': min_order,
+        'max_order': max_order,
+        'entry_bytes_per_entry': entries_size / entry_count,
+        'index_bytes_per_entry': (total_size - entries_size) / entry_count,
+        'total_bytes_per_entry': total_size / entry_count,
+        'peak_bytes': peak_size,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('benchmark', choices=['memory', 'suite'])
+    parser.add_argument('--entries', type=int, default=100_000)
+    parser.add_argument('--min-order', type=int, default=4)
+    parser.add_argument('--max-order', type=int, default=16)
+    parser.add_argument('--orders', default='2:4,4:16,16:64', help='suite: comma-separated min_order:max_order pairs')
+    parser.add_argument('--distributions', default=','.join(DISTRIBUTIONS),
+                        help=f'suite: comma-separated, out of {", ".join(DISTRIBUTIONS)}')
+    parser.add_argument('--queries', type=int, default=1_000, help='suite: window queries (and kNN queries per k) per case')
+    parser.add_argument('--knn', default=','.join(str(k) for k in KNN_KS), help='suite: comma-separated kNN k values')
+    parser.add_argument('--output', help='suite: the JSON file to save the results into')
+    parser.add_argument('--compare', help='suite: a JSON file of earlier results, to report regressions against')
+    parser.add_argument('--tolerance', type=float, default=0.1, help='suite: the change reported as a regression')
+    args = parser.parse_args()
+
+    if args.benchmark == 'memory':
+        result = measure_memory(args.entries, args.min_order, args.max_order)
+        for key, value in result.items():
+            print(f'{key}: {value:,.1f}' if isinstance(value, float) else f'{key}: {value:,}')
+    elif args.benchmark == 'suite':
+        orders = [tuple(int(order) for order in pair.split(':')) for pair in args.orders.split(',')]
+        knn_ks = [int(k) for k in args.knn.split(',')]
+        if args.queries < 1:
+            parser.error('--queries must be at least 1')
+        results = run_suite(args.entries, orders, args.distributions.split(','), args.queries, knn_ks)
+        for distribution, cases in results['cases'].items():
+            for case in cases:
+                print(f'{distribution:>9} {case["min_order"]:>3}:{case["max_order"]:<3} '
+                      f'{case["inserts_per_second"]:>10,.0f} inserts/s  '
+                      f'splits {case["split_seconds"]:.3f}s  '
+                      f'p50 {case["query_latency_us"]["p50"]:>8,.1f}us  p99 {case["query_latency_us"]["p99"]:>8,.1f}us  '
+                      f'{case["nodes_visited_per_query"]["mean"]:>6.1f} nodes/query  '
+                      f'peak {case["peak_bytes"] / 1_000:,.0f}KB')
+                for k, knn in case['knn'].items():
+                    print(f'{"":>17} {k:>3}-NN  '
+                          f'p50 {knn["latency_us"]["p50"]:>8,.1f}us  p99 {knn["latency_us"]["p99"]:>8,.1f}us  '
+                          f'{knn["nodes_visited_per_query"]["mean"]:>6.1f} nodes/query')
+        if args.output:
+            with open(args.output, 'w') as file:
+                json.dump(results, file, indent=2)
+        if args.compare:
+            with open(args.compare) as file:
+                regressions = compare(json.load(file), results, args.tolerance)
+            print('\n'.join(['Regressions:'] + regressions) if regressions else 'No regressions')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""
+Module that contains functions working on the raw (min x, min y, max x, max y) coordinates of a Rectangle,
+    for hot paths which should not allocate Rectangle and Point objects
+"""
+from math import sqrt
+
+from point import Point
+from rectangle import Rectangle
+
+
+def bounds_of(rectangle) -> (float, float, float, float):
+    """
+    :return: The (min x, min y, max x, max y) coordinates of the rectangle
+    """
+    return rectangle.top_left.x, rectangle.bottom_right.y, rectangle.bottom_right.x, rectangle.top_left.y
+
+
+def rectangle_of(bounds: tuple) -> Rectangle:
+    """
+    :return: A new Rectangle with the given (min x, min y, max x, max y) coordinates
+    """
+    return Rectangle(top_left=Point(bounds[0], bounds[3]), bottom_right=Point(bounds[2], bounds[1]))
+
+
+def union(bounds_a: tuple, bounds_b: tuple) -> tuple:
+    return (min(bounds_a[0], bounds_b[0]), min(bounds_a[1], bounds_b[1]),
+            max(bounds_a[2], bounds_b[2]), max(bounds_a[3], bounds_b[3]))
+
+
+def area(bounds: tuple):
+    return (bounds[2] - bounds[0]) * (bounds[3] - bounds[1])
+
+
+def margin_of(bounds: tuple):
+    return (bounds[2] - bounds[0]) + (bounds[3] - bounds[1])
+
+
+def enlargement(bounds: tuple, other_bounds: tuple):
+    """
+    :return: The area by which bounds would grow if it were expanded to contain other_bounds
+    """
+    return area(union(bounds, other_bounds)) - area(bounds)
+
+
+def overlap(bounds_a: tuple, bounds_b: tuple):
+    width = min(bounds_a[2], bounds_b[2]) - max(bounds_a[0], bounds_b[0])
+    height = min(bounds_a[3], bounds_b[3]) - max(bounds_a[1], bounds_b[1])
+    if width <= 0 or height <= 0:
+        return 0
+    return width * height
+
+
+def is_intersecting(bounds_a: tuple, bounds_b: tuple) -> bool:
+    """
+    The raw counterpart of Rectangle.is_intersecting
+    """
+    return (bounds_a[0] <= bounds_b[2] and bounds_a[2] >= bounds_b[0]
+            and bounds_a[1] <= bounds_b[3] and bounds_a[3] >= bounds_b[1])
+
+
+def distance_between(bounds_a: tuple, bounds_b: tuple) -> float:
+    """
+    The raw counterpart of Rectangle.distance_between.
+        A Point's bounds are (x, y, x, y), which makes this the distance between a point and a rectangle as well
+    """
+    dx = max(0, bounds_b[0] - bounds_a[2], bounds_a[0] - bounds_b[2])
+    dy = max(0, bounds_b[1] - bounds_a[3], bounds_a[1] - bounds_b[3])
+    return sqrt(dx * dx + dy * dy)
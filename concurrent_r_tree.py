@@ -0,0 +1,151 @@
+"""
+Module that contains an R-Tree for many reader threads and a single writer path.
+    Readers query an immutable snapshot without taking any lock.
+    Writers are serialized, copy every node they modify (path copying) instead of changing it in place
+    and then publish the new root by swapping the snapshot, which is a single atomic reference assignment
+"""
+import threading
+
+from r_tree import RTree, Entry
+from rectangle import Rectangle
+
+
+class CopyOnWriteRTree(RTree):
+    """
+    An RTree whose writes never modify a node reachable from before the write - the root and every node on the
+        paths being changed are copied first. Nodes created by splits are new anyway.
+        Does not support the Entry locator, as its leaves are replaced by copies on every write
+    """
+
+    class RTreeNode(RTree.RTreeNode):
+        __slots__ = ()
+
+        def choose_subtree(self, object) -> 'RTreeNode':
+            """
+            Chooses the child like a regular node, but swaps it with a copy, which is what the insertion then modifies
+            """
+            child = super().choose_subtree(object)
+            child_copy = child.copy()
+            self.children[self.children.index(child)] = child_copy
+            return child_copy
+
+    def __init__(self, min_order: int, max_order: int, **kwargs):
+        if kwargs.get('locate_entries'):
+            raise ValueError('A copy-on-write tree cannot locate entries')
+        if kwargs.get('cache_size'):
+            raise ValueError('A copy-on-write tree cannot cache queries, as its snapshots are shared between threads')
+        super().__init__(min_order, max_order, **kwargs)
+
+    def fork(self) -> 'CopyOnWriteRTree':
+        """
+        :return: A new tree sharing this tree's nodes, which can be written to without affecting this one
+        """
+        r_tree = self.__class__(self.minimum_order, self.maximum_order, split_strategy=self.split_strategy)
+        r_tree.root = self.root
+        r_tree.statistics = self.statistics
+        return r_tree
+
+    def add(self, object: Entry):
+        if self.root is not None:
+            self.root = self.root.copy()
+        super().add(object)
+
+    def delete(self, object: Entry) -> bool:
+        if self.root is None:
+            return False
+        path = self._find_leaf_path(self.root, object)
+        if path is None:
+            return False
+        self._copy_path(path)
+        self._delete_from_path(path, object)
+        return True
+
+    def _repack(self, path: [RTree.RTreeNode], packer) -> bool:
+        self._copy_path(path)
+        return super()._repack(path, packer)
+
+    def _copy_path(self, path: [RTree.RTreeNode]):
+        """
+        Replaces every node of the path (from the root) with a copy, in the path as well as in the tree
+        """
+        path[0] = self.root = self.root.copy()
+        for depth in range(1, len(path)):
+            parent, node = path[depth - 1], path[depth]
+            path[depth] = node.copy()
+            parent.children[parent.children.index(node)] = path[depth]
+
+    def move(self, object: Entry, new_bounds: Rectangle, slack: float = 0) -> bool:
+        """
+        Entries are shared between snapshots, so moving one always replaces it with a new Entry
+        """
+        if not self.delete(object):
+            return False
+        self.add(Entry(object.name, bounds=new_bounds))
+        return True
+
+
+class ConcurrentRTree:
+    """
+    Queries run against the latest published snapshot, without locking.
+        Writes are serialized by a lock, applied to a fork of the snapshot and published once complete,
+        so a reader never sees a half-applied write
+    """
+    def __init__(self, min_order: int, max_order: int, **kwargs):
+        """
+        :param kwargs: Passed on to the CopyOnWriteRTree's constructor
+        """
+        self._snapshot = CopyOnWriteRTree(min_order, max_order, **kwargs)
+        self._write_lock = threading.Lock()
+
+    def snapshot(self) -> CopyOnWriteRTree:
+        """
+        :return: The latest published tree. It never changes, so a reader can run several queries against it
+            and get consistent results. It must not be written to
+        """
+        return self._snapshot
+
+    def _write(self, operation):
+        with self._write_lock:
+            r_tree = self._snapshot.fork()
+            result = operation(r_tree)
+            self._snapshot = r_tree
+            return result
+
+    def add(self, object: Entry):
+        self._write(lambda r_tree: r_tree.add(object))
+
+    def insert_many(self, entries: [Entry]):
+        """
+        Adds the whole batch as a single write, published at once
+        """
+        self._write(lambda r_tree: r_tree.insert_many(entries))
+
+    def delete(self, object: Entry) -> bool:
+        return self._write(lambda r_tree: r_tree.delete(object))
+
+    def move(self, object: Entry, new_bounds: Rectangle, slack: float = 0) -> bool:
+        return self._write(lambda r_tree: r_tree.move(object, new_bounds, slack))
+
+    def reorganize(self, overlap_threshold: float = 0.1, max_subtrees: int = None, **kwargs) -> int:
+        return self._write(lambda r_tree: r_tree.reorganize(overlap_threshold, max_subtrees, **kwargs))
+
+    def analyze(self) -> dict:
+        return self._snapshot.analyze()
+
+    def search(self, window: Rectangle) -> [Entry]:
+        return self._snapshot.search(window)
+
+    def iter_search(self, window: Rectangle):
+        return self._snapshot.iter_search(window)
+
+    def contained_in(self, window: Rectangle) -> [Entry]:
+        return self._snapshot.contained_in(window)
+
+    def containing(self, query) -> [Entry]:
+        return self._snapshot.containing(query)
+
+    def nearest(self, query, k: int = 1) -> [Entry]:
+        return self._snapshot.nearest(query, k)
+
+    def iter_nearest(self, query):
+        return self._snapshot.iter_nearest(query)
@@ -0,0 +1,102 @@
+import threading
+import unittest
+
+from bounds import bounds_of
+from concurrent_r_tree import ConcurrentRTree, CopyOnWriteRTree
+from entry_fixtures import scattered_entries
+from point import Point
+from rectangle import Rectangle
+from split_strategies import RStarSplit
+
+
+def structure_of(node) -> tuple:
+    """
+    :return: Everything a reader could observe about the subtree, to check that writes leave it alone
+    """
+    return (id(node), bounds_of(node.mbr), tuple((entry.name, bounds_of(entry.mbr)) for entry in node.entries),
+            tuple(structure_of(child) for child in node.children))
+
+
+EVERYTHING = Rectangle(Point(-1000, 1000), Point(1000, -1000))
+
+
+class CopyOnWriteRTreeTests(unittest.TestCase):
+    def test_writes_do_not_change_forked_tree(self):
+        entries = scattered_entries(200, x_extent=101, y_extent=97)
+        for split_strategy in (RStarSplit, None):
+            kwargs = {'split_strategy': split_strategy} if split_strategy else {}
+            r_tree = CopyOnWriteRTree(2, 4, **kwargs)
+            r_tree.insert_many(entries[:100])
+            structure = structure_of(r_tree.root)
+
+            fork = r_tree.fork()
+            fork.insert_many(entries[100:])
+            for entry in entries[:50]:
+                self.assertTrue(fork.delete(entry))
+            fork.move(entries[60], Rectangle(Point(500, 505), Point(505, 500)))
+
+            self.assertEqual(structure_of(r_tree.root), structure)
+            self.assertCountEqual([entry.name for entry in fork.search(EVERYTHING)],
+                                  [entry.name for entry in entries[50:]])
+            self.assertCountEqual(r_tree.search(EVERYTHING), entries[:100])
+
+    def test_reorganize_does_not_change_forked_tree(self):
+        r_tree = CopyOnWriteRTree(2, 4)
+        r_tree.insert_many(scattered_entries(200, x_extent=101, y_extent=97))
+        structure = structure_of(r_tree.root)
+
+        fork = r_tree.fork()
+        self.assertGreater(fork.reorganize(overlap_threshold=0), 0)
+        self.assertEqual(structure_of(r_tree.root), structure)
+        self.assertCountEqual(fork.search(EVERYTHING), r_tree.search(EVERYTHING))
+
+    def test_cannot_locate_entries(self):
+        with self.assertRaises(ValueError):
+            CopyOnWriteRTree(2, 4, locate_entries=True)
+
+
+class ConcurrentRTreeTests(unittest.TestCase):
+    def test_writes_are_published_whole(self):
+        r_tree = ConcurrentRTree(2, 4)
+        entries = scattered_entries(50, x_extent=101, y_extent=97)
+        snapshot = r_tree.snapshot()
+
+        r_tree.insert_many(entries)
+
+        self.assertIsNone(snapshot.root)
+        self.assertCountEqual(r_tree.search(EVERYTHING), entries)
+        self.assertTrue(r_tree.delete(entries[0]))
+        self.assertEqual(len(r_tree.search(EVERYTHING)), 49)
+        self.assertEqual(len(r_tree.nearest(Point(0, 0), k=3)), 3)
+
+    def test_readers_always_see_a_complete_snapshot(self):
+        r_tree = ConcurrentRTree(2, 4)
+        entries = scattered_entries(300, x_extent=101, y_extent=97)
+        errors = []
+        done = threading.Event()
+
+        def read():
+            seen = 0
+            while not done.is_set():
+                found = r_tree.search(EVERYTHING)
+                # The writer adds entries in order, so a snapshot holds exactly a prefix of them
+                names = {entry.name for entry in found}
+                if names != {entry.name for entry in entries[:len(found)]} or len(found) < seen:
+                    errors.append(len(found))
+                seen = len(found)
+
+        readers = [threading.Thread(target=read) for _ in range(4)]
+        for reader in readers:
+            reader.start()
+        for entry in entries:
+            r_tree.add(entry)
+        done.set()
+        for reader in readers:
+            reader.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(r_tree.search(EVERYTHING)), len(entries))
+
+
+if __name__ == '__main__':
+    unittest.main()
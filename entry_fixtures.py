@@ -0,0 +1,25 @@
+"""
+Module that contains the Entry factories shared by the test modules
+"""
+from point import Point
+from r_tree import Entry
+from rectangle import Rectangle
+
+
+def grid_entries(columns: int, rows: int, size: float = 5) -> [Entry]:
+    """
+    :return: Entries of size x size squares named '{x}-{y}', laid out on a grid with a 10 point step
+    """
+    return [Entry(f'{x}-{y}', bounds=Rectangle(Point(x * 10, y * 10 + size), Point(x * 10 + size, y * 10)))
+            for x in range(columns) for y in range(rows)]
+
+
+def scattered_entries(count: int, x_extent: int = 1001, y_extent: int = 997, width: float = 2, height: float = 3,
+                      name: str = '{}') -> [Entry]:
+    """
+    :return: width x height Entries scattered deterministically, their bottom left corners over an x_extent x y_extent area
+    :param name: The format of the Entries' names, given their index
+    """
+    return [Entry(name.format(idx), bounds=Rectangle(Point((idx * 37) % x_extent, (idx * 53) % y_extent + height),
+                                                     Point((idx * 37) % x_extent + width, (idx * 53) % y_extent)))
+            for idx in range(count)]
@@ -0,0 +1,116 @@
+"""
+Module that contains an RTree whose nodes keep the MBRs of their items as contiguous coordinate columns.
+    The per-node intersection and enlargement tests then run over the columns at once instead of
+    calling Rectangle methods item by item, which pays off with large max_order fan-outs.
+    Uses NumPy when it is installed and falls back to the array module otherwise
+"""
+from array import array
+
+from bounds import bounds_of
+from r_tree import RTree
+from rectangle import Rectangle
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class PackedRTree(RTree):
+    """
+    An RTree using PackedRTree.RTreeNode as its nodes. Everything else behaves like a regular RTree
+    """
+
+    class RTreeNode(RTree.RTreeNode):
+        """
+        A node which lazily builds min x, min y, max x and max y columns out of its items' MBRs.
+            The columns are dropped whenever the items change (see items_changed) and rebuilt by the next query
+        """
+        __slots__ = ('_columns',)
+
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self._columns = None
+
+        def items_changed(self):
+            self._columns = None
+
+        def columns(self):
+            """
+            :return: The (min x, min y, max x, max y) coordinate columns of this node's items, in the items' order
+            """
+            if self._columns is None:
+                items = self.entries if self.is_leaf() else self.children
+                bounds = [bounds_of(item.mbr) for item in items]
+                if numpy is not None:
+                    self._columns = numpy.array(bounds, dtype=float).reshape(-1, 4).T
+                else:
+                    self._columns = tuple(array('d', (item_bounds[axis] for item_bounds in bounds))
+                                          for axis in range(4))
+            return self._columns
+
+        def intersecting_items(self, window: Rectangle) -> list:
+            items = self.entries if self.is_leaf() else self.children
+            min_x, min_y, max_x, max_y = self.columns()
+            window_min_x, window_min_y, window_max_x, window_max_y = bounds_of(window)
+
+            if numpy is not None:
+                mask = ((min_x <= window_max_x) & (max_x >= window_min_x)
+                        & (min_y <= window_max_y) & (max_y >= window_min_y))
+                return [items[idx] for idx in numpy.flatnonzero(mask)]
+
+            return [items[idx] for idx in range(len(items))
+                    if min_x[idx] <= window_max_x and max_x[idx] >= window_min_x
+                    and min_y[idx] <= window_max_y and max_y[idx] >= window_min_y]
+
+        def covered_items(self, window: Rectangle) -> list:
+            items = self.entries if self.is_leaf() else self.children
+            min_x, min_y, max_x, max_y = self.columns()
+            window_min_x, window_min_y, window_max_x, window_max_y = bounds_of(window)
+
+            if numpy is not None:
+                mask = ((min_x >= window_min_x) & (max_x <= window_max_x)
+                        & (min_y >= window_min_y) & (max_y <= window_max_y))
+                return [items[idx] for idx in numpy.flatnonzero(mask)]
+
+            return [items[idx] for idx in range(len(items))
+                    if min_x[idx] >= window_min_x and max_x[idx] <= window_max_x
+                    and min_y[idx] >= window_min_y and max_y[idx] <= window_max_y]
+
+        def covering_items(self, query: Rectangle) -> list:
+            items = self.entries if self.is_leaf() else self.children
+            min_x, min_y, max_x, max_y = self.columns()
+            query_min_x, query_min_y, query_max_x, query_max_y = bounds_of(query)
+
+            if numpy is not None:
+                mask = ((min_x <= query_min_x) & (max_x >= query_max_x)
+                        & (min_y <= query_min_y) & (max_y >= query_max_y))
+                return [items[idx] for idx in numpy.flatnonzero(mask)]
+
+            return [items[idx] for idx in range(len(items))
+                    if min_x[idx] <= query_min_x and max_x[idx] >= query_max_x
+                    and min_y[idx] <= query_min_y and max_y[idx] >= query_max_y]
+
+        def choose_subtree(self, object) -> 'RTreeNode':
+            """
+            :return: The child whose MBR needs the least enlargement to accommodate the object,
+                the one with the smallest area and then the fewest items on ties, like find_min_expansion_node
+            """
+            min_x, min_y, max_x, max_y = self.columns()
+            item_counts = [child.item_count() for child in self.children]
+            object_min_x, object_min_y, object_max_x, object_max_y = bounds_of(object.mbr)
+
+            if numpy is not None:
+                areas = (max_x - min_x) * (max_y - min_y)
+                enlargements = ((numpy.maximum(max_x, object_max_x) - numpy.minimum(min_x, object_min_x))
+                                * (numpy.maximum(max_y, object_max_y) - numpy.minimum(min_y, object_min_y))
+                                - areas)
+                return self.children[numpy.lexsort((item_counts, areas, enlargements))[0]]
+
+            def cost(idx):
+                area = (max_x[idx] - min_x[idx]) * (max_y[idx] - min_y[idx])
+                enlarged_area = ((max(max_x[idx], object_max_x) - min(min_x[idx], object_min_x))
+                                 * (max(max_y[idx], object_max_y) - min(min_y[idx], object_min_y)))
+                return enlarged_area - area, area, item_counts[idx]
+
+            return self.children[min(range(len(self.children)), key=cost)]
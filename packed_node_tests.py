@@ -0,0 +1,102 @@
+import unittest
+from unittest import mock
+
+import packed_node
+from entry_fixtures import scattered_entries
+from packed_node import PackedRTree
+from r_tree import RTree, Entry
+from rectangle import Rectangle, Point
+from split_strategies import RStarSplit
+
+
+class PackedRTreeTests(unittest.TestCase):
+    def setUp(self):
+        # Run every test against the NumPy columns (if installed) and the array module fallback
+        self.numpy_modules = [None] if packed_node.numpy is None else [packed_node.numpy, None]
+
+    def test_nodes_are_packed(self):
+        r_tree = PackedRTree(2, 4)
+        for entry in scattered_entries(20, x_extent=101, y_extent=97):
+            r_tree.add(entry)
+
+        self.assertIsInstance(r_tree.root, PackedRTree.RTreeNode)
+        self.assertTrue(all(isinstance(child, PackedRTree.RTreeNode) for child in r_tree.root.children))
+
+    def test_columns_follow_items(self):
+        node = PackedRTree.RTreeNode(2, 4, mbr=Rectangle(Point(0, 10), Point(10, 0)))
+        node.place(Entry('A', bounds=Rectangle(Point(1, 5), Point(3, 2))), leaf=True)
+        self.assertEqual([list(column) for column in node.columns()], [[1], [2], [3], [5]])
+
+        node.place(Entry('B', bounds=Rectangle(Point(4, 9), Point(8, 6))), leaf=True)
+        self.assertEqual([list(column) for column in node.columns()], [[1, 4], [2, 6], [3, 8], [5, 9]])
+
+    def test_search_matches_brute_force(self):
+        entries = scattered_entries(300, x_extent=101, y_extent=97)
+        window = Rectangle(Point(20, 70), Point(55, 30))
+        expected = [entry for entry in entries if entry.mbr.is_intersecting(window)]
+        for numpy_module in self.numpy_modules:
+            with mock.patch.object(packed_node, 'numpy', numpy_module):
+                r_tree = PackedRTree(4, 32)
+                for entry in entries:
+                    r_tree.add(entry)
+                self.assertCountEqual(r_tree.search(window), expected)
+
+    def test_containment_queries_match_brute_force(self):
+        entries = scattered_entries(300, x_extent=101, y_extent=97)
+        window = Rectangle(Point(20, 70), Point(55, 30))
+        zone = Rectangle(Point(31, 39), Point(31, 39))
+        for numpy_module in self.numpy_modules:
+            with mock.patch.object(packed_node, 'numpy', numpy_module):
+                r_tree = PackedRTree(4, 32)
+                r_tree.insert_many(entries)
+                self.assertCountEqual(r_tree.contained_in(window),
+                                      [entry for entry in entries if entry.mbr.is_covered_by(window)])
+                self.assertCountEqual(r_tree.containing(zone.top_left),
+                                      [entry for entry in entries if entry.mbr.is_covering(zone)])
+
+    def test_delete_and_search_with_r_star_split(self):
+        entries = scattered_entries(300, x_extent=101, y_extent=97)
+        window = Rectangle(Point(10, 90), Point(75, 15))
+        for numpy_module in self.numpy_modules:
+            with mock.patch.object(packed_node, 'numpy', numpy_module):
+                r_tree = PackedRTree(2, 8, split_strategy=RStarSplit)
+                for entry in entries:
+                    r_tree.add(entry)
+                for entry in entries[::2]:
+                    self.assertTrue(r_tree.delete(entry))
+
+                self.assertCountEqual(r_tree.search(window),
+                                      [entry for entry in entries[1::2] if entry.mbr.is_intersecting(window)])
+
+    def test_choose_subtree_picks_least_enlargement(self):
+        node = PackedRTree.RTreeNode(2, 4, mbr=Rectangle(Point(0, 100), Point(100, 0)))
+        near = PackedRTree.RTreeNode(2, 4, mbr=Rectangle(Point(10, 20), Point(20, 10)))
+        far = PackedRTree.RTreeNode(2, 4, mbr=Rectangle(Point(70, 80), Point(80, 70)))
+        node.place(far, leaf=False)
+        node.place(near, leaf=False)
+        entry = Entry('E', bounds=Rectangle(Point(21, 19), Point(23, 17)))
+        for numpy_module in self.numpy_modules:
+            with mock.patch.object(packed_node, 'numpy', numpy_module):
+                node.items_changed()
+                self.assertIs(node.choose_subtree(entry), near)
+
+    def test_choose_subtree_breaks_ties_like_a_plain_tree(self):
+        entry = Entry('E', bounds=Rectangle(Point(48, 52), Point(52, 48)))
+        for numpy_module in self.numpy_modules:
+            with mock.patch.object(packed_node, 'numpy', numpy_module):
+                node = PackedRTree.RTreeNode(2, 4, mbr=Rectangle(Point(0, 100), Point(100, 0)))
+                # Both children need the same enlargement and have the same area, the second one has fewer items
+                crowded = PackedRTree.RTreeNode(2, 4, mbr=Rectangle(Point(10, 20), Point(20, 10)))
+                sparse = PackedRTree.RTreeNode(2, 4, mbr=Rectangle(Point(80, 90), Point(90, 80)))
+                for idx in range(3):
+                    crowded.place(Entry(f'C{idx}', bounds=Rectangle(Point(10, 20), Point(20, 10))), leaf=True)
+                sparse.place(Entry('S', bounds=Rectangle(Point(80, 90), Point(90, 80))), leaf=True)
+                node.place(crowded, leaf=False)
+                node.place(sparse, leaf=False)
+
+                self.assertIs(node.choose_subtree(entry), sparse)
+                self.assertIs(RTree.RTreeNode.find_min_expansion_node(node.children, entry), sparse)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+"""
+Module that contains functions for ordering and grouping the items of an R-Tree level (Entries or RTreeNodes)
+    into nodes, used for bottom-up bulk loading
+"""
+from math import ceil, sqrt
+
+
+def sort_tile_recursive(items: list, min_order: int, max_order: int) -> [list]:
+    """
+    Groups the items into nodes using the Sort-Tile-Recursive algorithm:
+        sorts them by the X of their MBR's center, cuts them into sqrt(node_count) vertical slabs,
+        then sorts every slab by Y and cuts it into runs of max_order items
+    """
+    node_count = ceil(len(items) / max_order)
+    slab_count = ceil(sqrt(node_count))
+    slab_size = slab_count * max_order
+
+    centers = {id(item): item.mbr.calculate_center() for item in items}
+    by_x = sorted(items, key=lambda item: centers[id(item)].x)
+
+    groups = []
+    for slab in chunk(by_x, slab_size, min_order):
+        by_y = sorted(slab, key=lambda item: centers[id(item)].y)
+        groups.extend(chunk(by_y, max_order, min_order))
+    return groups
+
+
+def chunk(items: list, size: int, min_size: int) -> [list]:
+    """
+    Cuts the items into consecutive runs of `size` items.
+        If the last run is left with less than `min_size` items, it takes the missing ones from the run before it
+    """
+    groups = [items[idx:idx + size] for idx in range(0, len(items), size)]
+    if len(groups) > 1 and len(groups[-1]) < min_size:
+        missing = min_size - len(groups[-1])
+        groups[-1] = groups[-2][-missing:] + groups[-1]
+        groups[-2] = groups[-2][:-missing]
+    return groups
+
+
+# The Hilbert curve used for ordering covers a 2^HILBERT_ORDER x 2^HILBERT_ORDER grid
+HILBERT_ORDER = 16
+
+
+def hilbert_pack(items: list, min_order: int, max_order: int) -> [list]:
+    """
+    Groups the items into nodes by cutting them into runs of max_order items along the Hilbert curve
+    """
+    return chunk(hilbert_sorted(items), max_order, min_order)
+
+
+def hilbert_sorted(items: list) -> list:
+    """
+    Returns the items sorted by the Hilbert value of their MBR's center,
+        the grid of the curve being stretched over the extent of all the centers
+    """
+    if not items:
+        return []
+    centers = [item.mbr.calculate_center() for item in items]
+    min_x, max_x = min(center.x for center in centers), max(center.x for center in centers)
+    min_y, max_y = min(center.y for center in centers), max(center.y for center in centers)
+    cells = (1 << HILBERT_ORDER) - 1
+    x_scale = cells / (max_x - min_x) if max_x > min_x else 0
+    y_scale = cells / (max_y - min_y) if max_y > min_y else 0
+
+    values = [hilbert_value(int((center.x - min_x) * x_scale), int((center.y - min_y) * y_scale), HILBERT_ORDER)
+              for center in centers]
+    return [item for _, item in sorted(zip(values, items), key=lambda pair: pair[0])]
+
+
+def hilbert_value(x: int, y: int, order: int) -> int:
+    """
+    Returns the distance along a Hilbert curve of the given order at which the grid cell (x, y) is visited
+    """
+    value = 0
+    size = 1 << order
+    side = size >> 1
+    while side > 0:
+        rx = 1 if x & side else 0
+        ry = 1 if y & side else 0
+        value += side * side * ((3 * rx) ^ ry)
+        # Rotate the quadrant so that the curve inside it has the canonical orientation
+        if ry == 0:
+            if rx == 1:
+                x = size - 1 - x
+                y = size - 1 - y
+            x, y = y, x
+        side >>= 1
+    return value
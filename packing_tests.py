@@ -0,0 +1,65 @@
+import unittest
+
+from packing import chunk, sort_tile_recursive, hilbert_value, hilbert_sorted, hilbert_pack
+from r_tree import Entry
+from rectangle import Rectangle, Point
+
+
+class PackingTests(unittest.TestCase):
+    def test_chunk_cuts_items_into_runs(self):
+        self.assertEqual(chunk(list(range(6)), 3, 1), [[0, 1, 2], [3, 4, 5]])
+
+    def test_chunk_fills_up_last_run_to_min_size(self):
+        self.assertEqual(chunk(list(range(9)), 4, 2), [[0, 1, 2, 3], [4, 5, 6], [7, 8]])
+
+    def test_sort_tile_recursive_groups_by_slabs(self):
+        """
+        A 4x4 grid of entries with nodes of 4 should be packed into its four 2x2 quadrants
+        """
+        entries = [Entry(f'{x}-{y}', bounds=Rectangle(Point(x * 10, y * 10 + 5), Point(x * 10 + 5, y * 10)))
+                   for x in range(4) for y in range(4)]
+
+        groups = sort_tile_recursive(entries, 2, 4)
+
+        self.assertEqual(len(groups), 4)
+        self.assertCountEqual([sorted(entry.name for entry in group) for group in groups],
+                              [['0-0', '0-1', '1-0', '1-1'], ['0-2', '0-3', '1-2', '1-3'],
+                               ['2-0', '2-1', '3-0', '3-1'], ['2-2', '2-3', '3-2', '3-3']])
+
+
+    def test_hilbert_value_visits_every_cell_once_through_neighbours(self):
+        order = 3
+        side = 1 << order
+        cells = {hilbert_value(x, y, order): (x, y) for x in range(side) for y in range(side)}
+
+        self.assertEqual(sorted(cells), list(range(side * side)))
+        for value in range(side * side - 1):
+            (x_a, y_a), (x_b, y_b) = cells[value], cells[value + 1]
+            self.assertEqual(abs(x_a - x_b) + abs(y_a - y_b), 1)
+
+    def test_hilbert_sorted_orders_items_along_the_curve(self):
+        """
+        The first-order curve visits the bottom left, top left, top right and bottom right quadrants in that order
+        """
+        bottom_left = Entry('BL', bounds=Rectangle(Point(0, 5), Point(5, 0)))
+        top_left = Entry('TL', bounds=Rectangle(Point(0, 105), Point(5, 100)))
+        top_right = Entry('TR', bounds=Rectangle(Point(100, 105), Point(105, 100)))
+        bottom_right = Entry('BR', bounds=Rectangle(Point(100, 5), Point(105, 0)))
+
+        ordered = hilbert_sorted([top_right, bottom_right, bottom_left, top_left])
+
+        self.assertEqual(ordered, [bottom_left, top_left, top_right, bottom_right])
+
+    def test_hilbert_pack_keeps_neighbours_together(self):
+        entries = [Entry(f'{x}-{y}', bounds=Rectangle(Point(x * 10, y * 10 + 5), Point(x * 10 + 5, y * 10)))
+                   for x in range(4) for y in range(4)]
+
+        groups = hilbert_pack(entries, 2, 4)
+
+        self.assertCountEqual([sorted(entry.name for entry in group) for group in groups],
+                              [['0-0', '0-1', '1-0', '1-1'], ['0-2', '0-3', '1-2', '1-3'],
+                               ['2-0', '2-1', '3-0', '3-1'], ['2-2', '2-3', '3-2', '3-3']])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,181 @@
+"""
+Module that contains a read-only, disk-based R-Tree.
+    Every node of an RTree is written as a fixed-size page of a single file, which is then memory-mapped.
+    Opening the file only reads its header and a page is only decoded once a query visits it,
+    so the process holds just the pages its queries touch (and the OS caches the hot ones).
+
+File layout (little-endian):
+    page 0:       magic, version, page size, min order, max order, root page, page count, names offset
+    pages 1..N:   is_leaf flag, item count, then per item its min x, min y, max x, max y and a reference -
+                  the child's page number in internal nodes, the name's offset in the names section in leaves
+    names:        per Entry name, its UTF-8 length followed by the UTF-8 bytes
+"""
+import mmap
+import struct
+from functools import lru_cache
+from heapq import heappush, heappop
+from itertools import count, islice
+
+from bounds import bounds_of, rectangle_of, is_intersecting, distance_between
+from point import Point
+from r_tree import RTree, Entry
+from rectangle import Rectangle
+
+MAGIC = b'RTPG'
+VERSION = 1
+
+FILE_HEADER = struct.Struct('<4sHxxIIIQQQ')
+PAGE_HEADER = struct.Struct('<BxxxI')
+ITEM = struct.Struct('<ddddQ')
+NAME_LENGTH = struct.Struct('<I')
+
+
+class PagedRTree:
+    class InvalidPageFileError(Exception):
+        pass
+
+    def __init__(self, path: str, cached_pages: int = 1024):
+        """
+        Opens a page file written by PagedRTree.write
+        :param cached_pages: How many decoded pages to keep around
+        """
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # an empty file cannot be mapped
+            self._file.close()
+            raise self.InvalidPageFileError(f'{path} is not an R-Tree page file')
+
+        if len(self._map) < FILE_HEADER.size:
+            self.close()
+            raise self.InvalidPageFileError(f'{path} is not an R-Tree page file')
+        (magic, version, self.page_size, self.minimum_order, self.maximum_order,
+         self.root_page, self.page_count, self._names_offset) = FILE_HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise self.InvalidPageFileError(f'{path} is not a version {VERSION} R-Tree page file')
+
+        self.read_page = lru_cache(maxsize=cached_pages)(self._decode_page)
+
+    @staticmethod
+    def max_order_for(page_size: int) -> int:
+        """
+        :return: The biggest max_order whose nodes still fit in a page of the given size
+        """
+        return (page_size - PAGE_HEADER.size) // ITEM.size
+
+    @classmethod
+    def write(cls, r_tree: RTree, path: str, page_size: int = 4096):
+        """
+        Writes the RTree into a page file, one page per node in breadth-first order
+        """
+        if r_tree.maximum_order > cls.max_order_for(page_size):
+            raise ValueError(f'Nodes of max_order {r_tree.maximum_order} do not fit in {page_size} byte pages, '
+                             f'the maximum is {cls.max_order_for(page_size)}')
+
+        nodes = RTree._nodes_breadth_first(r_tree.root)
+        page_numbers = {id(node): page_number for page_number, node in enumerate(nodes, start=1)}
+
+        names = bytearray()
+        pages = bytearray()
+        for node in nodes:
+            page = bytearray(page_size)
+            if node.is_leaf():
+                PAGE_HEADER.pack_into(page, 0, 1, len(node.entries))
+                for idx, entry in enumerate(node.entries):
+                    ITEM.pack_into(page, PAGE_HEADER.size + idx * ITEM.size, *bounds_of(entry.mbr), len(names))
+                    encoded_name = entry.name.encode('utf-8')
+                    names += NAME_LENGTH.pack(len(encoded_name)) + encoded_name
+            else:
+                PAGE_HEADER.pack_into(page, 0, 0, len(node.children))
+                for idx, child in enumerate(node.children):
+                    ITEM.pack_into(page, PAGE_HEADER.size + idx * ITEM.size,
+                                   *bounds_of(child.mbr), page_numbers[id(child)])
+            pages += page
+
+        header = bytearray(page_size)
+        FILE_HEADER.pack_into(header, 0, MAGIC, VERSION, page_size, r_tree.minimum_order, r_tree.maximum_order,
+                              1 if nodes else 0, len(nodes), (len(nodes) + 1) * page_size)
+        with open(path, 'wb') as file:
+            file.write(header)
+            file.write(pages)
+            file.write(names)
+
+    def close(self):
+        if hasattr(self, 'read_page'):
+            self.read_page.cache_clear()
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _decode_page(self, page_number: int) -> (bool, [tuple]):
+        """
+        :return: Whether the page is a leaf, along with its (bounds, reference) items
+        """
+        offset = page_number * self.page_size
+        is_leaf, item_count = PAGE_HEADER.unpack_from(self._map, offset)
+        items = []
+        for idx in range(item_count):
+            *item_bounds, reference = ITEM.unpack_from(self._map, offset + PAGE_HEADER.size + idx * ITEM.size)
+            items.append((tuple(item_bounds), reference))
+        return bool(is_leaf), items
+
+    def _entry_of(self, item_bounds: tuple, name_reference: int) -> Entry:
+        offset = self._names_offset + name_reference
+        (length,) = NAME_LENGTH.unpack_from(self._map, offset)
+        start = offset + NAME_LENGTH.size
+        return Entry(self._map[start:start + length].decode('utf-8'), bounds=rectangle_of(item_bounds))
+
+    def search(self, window: Rectangle) -> [Entry]:
+        """
+        Returns every Entry whose MBR intersects the given window, only reading the pages of intersecting nodes
+        """
+        if self.root_page == 0:
+            return []
+        window_bounds = bounds_of(window)
+
+        results = []
+        pages = [self.root_page]
+        while pages:
+            is_leaf, items = self.read_page(pages.pop())
+            for item_bounds, reference in items:
+                if not is_intersecting(item_bounds, window_bounds):
+                    continue
+                if is_leaf:
+                    results.append(self._entry_of(item_bounds, reference))
+                else:
+                    pages.append(reference)
+        return results
+
+    def nearest(self, query, k: int = 1) -> [Entry]:
+        """
+        Returns the k Entries closest to the given Point or Rectangle, closest first
+        """
+        # islice stops right after the k-th Entry, without expanding the nodes the next one would need
+        return list(islice(self.iter_nearest(query), k))
+
+    def iter_nearest(self, query):
+        """
+        Lazily yields every Entry in increasing distance from the given Point or Rectangle, see RTree.iter_nearest
+        """
+        if self.root_page == 0:
+            return
+        query_bounds = (query.x, query.y, query.x, query.y) if isinstance(query, Point) else bounds_of(query)
+
+        tiebreaker = count()
+        # (distance, tiebreaker, page number, None) for nodes, (distance, tiebreaker, name reference, bounds) for entries
+        queue = [(0, next(tiebreaker), self.root_page, None)]
+        while queue:
+            _, _, reference, item_bounds = heappop(queue)
+            if item_bounds is not None:
+                yield self._entry_of(item_bounds, reference)
+                continue
+            is_leaf, items = self.read_page(reference)
+            for child_bounds, child_reference in items:
+                heappush(queue, (distance_between(child_bounds, query_bounds), next(tiebreaker),
+                                 child_reference, child_bounds if is_leaf else None))
@@ -0,0 +1,74 @@
+import os
+import tempfile
+import unittest
+
+from entry_fixtures import scattered_entries
+from paged_r_tree import PagedRTree
+from point import Point
+from r_tree import RTree
+from rectangle import Rectangle
+
+
+class PagedRTreeTests(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'index.rtp')
+
+        self.entries = scattered_entries(500, width=2.25, height=3.5, name='entry-{}')
+        self.r_tree = RTree.bulk_load(self.entries, 2, 8)
+
+    def test_max_order_for_page_size(self):
+        self.assertEqual(PagedRTree.max_order_for(4096), 102)
+        self.assertEqual(PagedRTree.max_order_for(256), 6)
+
+    def test_write_rejects_nodes_too_big_for_pages(self):
+        with self.assertRaises(ValueError):
+            PagedRTree.write(self.r_tree, self.path, page_size=256)
+
+    def test_open_reads_header(self):
+        PagedRTree.write(self.r_tree, self.path, page_size=512)
+        with PagedRTree(self.path) as paged_tree:
+            self.assertEqual(paged_tree.page_size, 512)
+            self.assertEqual(paged_tree.minimum_order, 2)
+            self.assertEqual(paged_tree.maximum_order, 8)
+            self.assertEqual(paged_tree.root_page, 1)
+            self.assertGreaterEqual(os.path.getsize(self.path), (paged_tree.page_count + 1) * 512)
+            self.assertEqual(paged_tree.read_page.cache_info().currsize, 0)
+
+    def test_search_matches_in_memory_tree(self):
+        PagedRTree.write(self.r_tree, self.path)
+        window = Rectangle(Point(100, 400), Point(300, 150))
+        with PagedRTree(self.path) as paged_tree:
+            found = paged_tree.search(window)
+
+            self.assertCountEqual([(entry.name, entry.mbr) for entry in found],
+                                  [(entry.name, entry.mbr) for entry in self.r_tree.search(window)])
+            # Only the visited pages were decoded
+            self.assertLess(paged_tree.read_page.cache_info().currsize, paged_tree.page_count)
+
+    def test_nearest_matches_in_memory_tree(self):
+        PagedRTree.write(self.r_tree, self.path)
+        query = Point(512, 498)
+        with PagedRTree(self.path) as paged_tree:
+            nearest = paged_tree.nearest(query, k=10)
+
+        expected = self.r_tree.nearest(query, k=10)
+        self.assertEqual([entry.mbr.distance_to_point(query) for entry in nearest],
+                         [entry.mbr.distance_to_point(query) for entry in expected])
+
+    def test_empty_tree(self):
+        PagedRTree.write(RTree(2, 8), self.path)
+        with PagedRTree(self.path) as paged_tree:
+            self.assertEqual(paged_tree.search(Rectangle(Point(0, 10), Point(10, 0))), [])
+            self.assertEqual(paged_tree.nearest(Point(0, 0)), [])
+
+    def test_open_rejects_other_files(self):
+        with open(self.path, 'wb') as file:
+            file.write(b'not an r-tree' * 10)
+        with self.assertRaises(PagedRTree.InvalidPageFileError):
+            PagedRTree(self.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,192 @@
+"""
+Module that contains the multi-process building and querying of R-Trees too big for a single core.
+    The entries are cut into vertical slabs by the X of their centers (the first step of Sort-Tile-Recursive).
+    Worker processes group every slab into leaves, and the leaves are packed into one tree per slab.
+    Only raw coordinates go to the workers and only the leaf groupings come back,
+    as pickling Entries and whole trees across processes costs far more than building the tree
+"""
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from math import ceil
+
+from bounds import bounds_of, rectangle_of
+from packing import chunk, sort_tile_recursive
+from r_tree import RTree, Entry
+from rectangle import Rectangle
+
+# The partitions a query worker process searches, set once when the worker starts
+_worker_partitions: [RTree] = []
+
+
+def _group_leaves(coordinates: array, min_order: int, max_order: int, packer) -> (array, array, array):
+    """
+    Groups a slab's entries into leaves, in a worker process
+    :param coordinates: The (min x, min y, max x, max y) bounds of the slab's entries, one after the other
+    :return: The positions of the entries within the slab in leaf order, the size of every leaf
+        and the (min x, min y, max x, max y) bounds of every leaf, one after the other
+    """
+    # The packer only needs the items' MBRs, so the Entries are named after their position in the slab
+    items = [Entry(idx, bounds=rectangle_of(coordinates[idx * 4:idx * 4 + 4])) for idx in range(len(coordinates) // 4)]
+    order, sizes, leaf_coordinates = array('L'), array('L'), array('d')
+    for group in packer(items, min_order, max_order):
+        order.extend(item.name for item in group)
+        sizes.append(len(group))
+        group_bounds = [coordinates[item.name * 4:item.name * 4 + 4] for item in group]
+        leaf_coordinates.extend((min(bounds[0] for bounds in group_bounds), min(bounds[1] for bounds in group_bounds),
+                                 max(bounds[2] for bounds in group_bounds), max(bounds[3] for bounds in group_bounds)))
+    return order, sizes, leaf_coordinates
+
+
+def _set_worker_partitions(partitions: [RTree]):
+    global _worker_partitions
+    _worker_partitions = partitions
+
+
+def _search_partition(partition_idx: int, window: Rectangle) -> [Entry]:
+    return _worker_partitions[partition_idx].search(window)
+
+
+class PartitionedRTree:
+    """
+    A set of R-Trees, each indexing one spatial partition of the entries
+    """
+    def __init__(self, partitions: [RTree], min_order: int, max_order: int, **kwargs):
+        """
+        :param kwargs: The RTree constructor arguments the partitions were built with
+        """
+        self.partitions = partitions
+        self.minimum_order = min_order
+        self.maximum_order = max_order
+        self.tree_kwargs = kwargs
+
+    @classmethod
+    def build(cls, entries: [Entry], min_order: int, max_order: int, partition_count: int = None,
+              max_workers: int = None, packer=sort_tile_recursive, **kwargs) -> 'PartitionedRTree':
+        """
+        Cuts the entries into partition_count slabs, groups every one into leaves in a separate process
+            and packs the leaves into a tree per slab. The trees hold the given Entries themselves
+        :param partition_count: Defaults to the number of CPUs
+        :param kwargs: Passed on to every partition's RTree constructor. Entries cannot be located
+        """
+        if kwargs.get('locate_entries'):
+            raise ValueError('Partitions are built by other processes and cannot locate entries, '
+                             'use stitch(locate_entries=True) instead')
+        partition_count = partition_count or os.cpu_count() or 1
+        slabs = cls.slabs(entries, partition_count, min_order)
+
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(_group_leaves, cls._coordinates_of(slab), min_order, max_order, packer)
+                       for slab in slabs]
+            partitions = [cls._partition_of(slab, *future.result(), min_order, max_order, packer, kwargs)
+                          for slab, future in zip(slabs, futures)]
+        return cls(partitions, min_order, max_order, **kwargs)
+
+    @staticmethod
+    def _coordinates_of(entries: [Entry]) -> array:
+        coordinates = array('d')
+        for entry in entries:
+            coordinates.extend(bounds_of(entry.mbr))
+        return coordinates
+
+    @staticmethod
+    def _partition_of(slab: [Entry], order: array, sizes: array, leaf_coordinates: array, min_order: int,
+                      max_order: int, packer, kwargs: dict) -> RTree:
+        """
+        :return: A tree whose leaves hold the slab's Entries as grouped by _group_leaves
+        """
+        r_tree = RTree(min_order, max_order, **kwargs)
+        leaves, start = [], 0
+        for leaf_idx, size in enumerate(sizes):
+            # The worker already computed the leaf's MBR, so the Entries are attached directly instead of through place()
+            leaf = r_tree._new_node(rectangle_of(leaf_coordinates[leaf_idx * 4:leaf_idx * 4 + 4]))
+            leaf.entries = [slab[idx] for idx in order[start:start + size]]
+            leaf.items_changed()
+            leaves.append(leaf)
+            start += size
+        if leaves:
+            r_tree.root = leaves[0] if len(leaves) == 1 else r_tree._pack(leaves, packer, leaf=False)
+        return r_tree
+
+    @staticmethod
+    def slabs(entries: [Entry], partition_count: int, min_order: int) -> [[Entry]]:
+        """
+        Cuts the entries into partition_count vertical slabs of (about) the same size
+        """
+        by_x = sorted(entries, key=lambda entry: entry.mbr.top_left.x + entry.mbr.bottom_right.x)
+        return chunk(by_x, max(1, ceil(len(by_x) / partition_count)), min_order)
+
+    def stitch(self, packer=sort_tile_recursive, locate_entries: bool = False) -> RTree:
+        """
+        Joins the partitions into a single RTree, by packing the leaves of all of them into new upper levels.
+            Leaves with less than minimum_order Entries (the root of a partition too small to fill one)
+            are not reused, their Entries are added to the joined tree instead.
+            The resulting tree shares its leaves with the partitions
+        """
+        r_tree = RTree(self.minimum_order, self.maximum_order, locate_entries=locate_entries, **self.tree_kwargs)
+        leaves, small_leaves = [], []
+        for partition in self.partitions:
+            if partition.root is not None:
+                for leaf in self._nodes_at_height(partition.root, 0):
+                    (leaves if leaf.item_count() >= self.minimum_order else small_leaves).append(leaf)
+        if leaves:
+            r_tree.root = leaves[0] if len(leaves) == 1 else r_tree._pack(leaves, packer, leaf=False)
+
+        if r_tree.locator is not None or r_tree.statistics is not None:
+            # The partitions' nodes were created for other trees, possibly in other processes
+            stack = [r_tree.root]
+            while stack:
+                node = stack.pop()
+                node.locator = r_tree.locator
+                node.statistics = r_tree.statistics
+                if r_tree.locator is not None:
+                    r_tree.locator.update((entry.name, node) for entry in node.entries)
+                stack.extend(node.children)
+        for leaf in small_leaves:
+            for entry in leaf.entries:
+                r_tree.add(entry)
+        return r_tree
+
+    @staticmethod
+    def _nodes_at_height(root: RTree.RTreeNode, height: int) -> [RTree.RTreeNode]:
+        nodes = [root]
+        for _ in range(root.height() - height):
+            nodes = [child for node in nodes for child in node.children]
+        return nodes
+
+    def executor(self, max_workers: int = None) -> ProcessPoolExecutor:
+        """
+        :return: A process pool whose workers hold a copy of the partitions, for parallel_search.
+            Changes made to the partitions afterwards are not seen by the workers
+        """
+        return ProcessPoolExecutor(max_workers=max_workers, initializer=_set_worker_partitions,
+                                   initargs=(self.partitions,))
+
+    def search(self, window: Rectangle) -> [Entry]:
+        """
+        Returns every Entry whose MBR intersects the given window, searching the partitions one after the other
+        """
+        return [entry for partition in self.partitions
+                if partition.root is not None and partition.root.mbr.is_intersecting(window)
+                for entry in partition.search(window)]
+
+    def parallel_search(self, window: Rectangle, executor: ProcessPoolExecutor) -> [Entry]:
+        """
+        Returns every Entry whose MBR intersects the given window, searching the partitions it touches in parallel.
+            The Entries are copies made by the workers
+        :param executor: A pool created by executor()
+        """
+        partition_idxs = [idx for idx, partition in enumerate(self.partitions)
+                          if partition.root is not None and partition.root.mbr.is_intersecting(window)]
+        results = executor.map(_search_partition, partition_idxs, [window] * len(partition_idxs))
+        return [entry for partition_results in results for entry in partition_results]
+
+
+def parallel_bulk_load(entries: [Entry], min_order: int, max_order: int, partition_count: int = None,
+                       max_workers: int = None, packer=sort_tile_recursive, locate_entries: bool = False,
+                       **kwargs) -> RTree:
+    """
+    Bulk loads the entries into a single RTree, building its partitions in parallel processes
+    """
+    partitioned = PartitionedRTree.build(entries, min_order, max_order, partition_count, max_workers, packer, **kwargs)
+    return partitioned.stitch(packer, locate_entries=locate_entries)
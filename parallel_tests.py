@@ -0,0 +1,89 @@
+import unittest
+
+from entry_fixtures import scattered_entries
+from parallel import PartitionedRTree, parallel_bulk_load
+from point import Point
+from r_tree import RTree, Entry
+from rectangle import Rectangle
+from split_strategies import LinearSplit
+
+
+class ParallelTests(unittest.TestCase):
+    def setUp(self):
+        self.entries = scattered_entries(600)
+        self.window = Rectangle(Point(150, 700), Point(620, 240))
+        self.expected = [entry.name for entry in self.entries if entry.mbr.is_intersecting(self.window)]
+
+    def test_slabs_are_vertical_and_even(self):
+        slabs = PartitionedRTree.slabs(self.entries, 4, 2)
+
+        self.assertEqual([len(slab) for slab in slabs], [150, 150, 150, 150])
+        for left_slab, right_slab in zip(slabs, slabs[1:]):
+            self.assertLessEqual(max(entry.mbr.top_left.x for entry in left_slab),
+                                 min(entry.mbr.top_left.x for entry in right_slab))
+
+    def test_parallel_bulk_load_stitches_partitions(self):
+        r_tree = parallel_bulk_load(self.entries, 2, 6, partition_count=3, max_workers=2,
+                                    split_strategy=LinearSplit, locate_entries=True)
+
+        self.assertIs(r_tree.split_strategy, LinearSplit)
+        self.assertCountEqual([entry.name for entry in r_tree.search(self.window)], self.expected)
+        self.assertEqual(len(r_tree.locator), len(self.entries))
+        leaf_depths = set()
+        nodes = [(r_tree.root, 0)]
+        while nodes:
+            node, depth = nodes.pop()
+            if node.is_leaf():
+                leaf_depths.add(depth)
+            nodes.extend((child, depth + 1) for child in node.children)
+        self.assertEqual(len(leaf_depths), 1)
+
+        r_tree.add(Entry('new', bounds=Rectangle(Point(0, 1), Point(1, 0))))
+        self.assertIn('new', r_tree)
+
+    def test_stitch_partitions_of_different_heights(self):
+        partitions = [RTree.bulk_load(self.entries[:500], 2, 4), RTree.bulk_load(self.entries[500:], 2, 4)]
+        self.assertNotEqual(partitions[0].root.height(), partitions[1].root.height())
+
+        r_tree = PartitionedRTree(partitions, 2, 4).stitch()
+
+        self.assertCountEqual([entry.name for entry in r_tree.search(self.window)], self.expected)
+
+    def test_stitch_keeps_nodes_filled(self):
+        # The second partition's root has 2 children and the third one is a single leaf, both less than min_order
+        partitions = [RTree.bulk_load(self.entries[:500], 3, 6), RTree.bulk_load(self.entries[500:507], 3, 6),
+                      RTree.bulk_load(self.entries[507:509], 3, 6)]
+        self.assertEqual(partitions[1].root.item_count(), 2)
+
+        r_tree = PartitionedRTree(partitions, 3, 6).stitch(locate_entries=True)
+
+        nodes = [r_tree.root]
+        for node in nodes:  # grows while iterating
+            if node is not r_tree.root:
+                self.assertGreaterEqual(node.item_count(), 3)
+            self.assertLessEqual(node.item_count(), 6)
+            nodes.extend(node.children)
+        self.assertCountEqual(r_tree.root.iter_entries(), self.entries[:509])
+        self.assertEqual(len(r_tree.locator), 509)
+
+    def test_build_keeps_the_given_entries(self):
+        partitioned = PartitionedRTree.build(self.entries, 2, 6, partition_count=3, max_workers=1)
+
+        found = [entry for partition in partitioned.partitions for entry in partition.root.iter_entries()]
+        self.assertEqual(sorted(map(id, found)), sorted(map(id, self.entries)))
+
+    def test_parallel_search_fans_out_over_partitions(self):
+        partitioned = PartitionedRTree.build(self.entries, 2, 6, partition_count=4, max_workers=2)
+
+        self.assertCountEqual([entry.name for entry in partitioned.search(self.window)], self.expected)
+        with partitioned.executor(max_workers=2) as executor:
+            found = partitioned.parallel_search(self.window, executor)
+        self.assertCountEqual([entry.name for entry in found], self.expected)
+
+    def test_build_without_entries(self):
+        r_tree = parallel_bulk_load([], 2, 6, max_workers=1)
+        self.assertIsNone(r_tree.root)
+
+
+if __name__ == '__main__':
+    unittest.main()
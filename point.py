@@ -8,6 +8,9 @@ class Point:
     # The distance at which the move_xxx methods will check
     MOVE_DISTANCE = 1
 
+    # Points are by far the most numerous objects in a tree - no per-instance __dict__
+    __slots__ = ('x', 'y')
+
     def __init__(self, x, y):
         self.x = x
         self.y = y
@@ -81,4 +84,4 @@ class Point:
         return self.x == other.x and self.y == other.y
 
     def __hash__(self):
-        return hash(f'{self.x}{self.y}')
+        return hash((self.x, self.y))
@@ -0,0 +1,105 @@
+"""
+Module that contains an R-Tree for point data.
+    Its leaves hold PointEntries, which keep a single Point instead of a Rectangle and its two corner Points,
+    and test them against queries with coordinate comparisons and Point.distance_to.
+    Leaves also place their Entries and recalculate their MBRs from the Points,
+    so a PointEntry's Rectangle is only created where generic code asks for it - when choosing subtrees and splitting
+"""
+from point import Point
+from r_tree import RTree
+from rectangle import Rectangle
+
+
+class PointEntry:
+    """
+    An entry in the R-Tree, located at a single point
+    """
+    __slots__ = ('name', 'point')
+
+    def __init__(self, name: str, point: Point):
+        self.name = name
+        self.point = point
+
+    @property
+    def mbr(self) -> Rectangle:
+        """
+        A Rectangle of no width and height at the entry's point, created on demand (and not kept) for generic code.
+            Its corners are the entry's point itself, so it must not be modified
+        """
+        return Rectangle.of_point(self.point)
+
+    @mbr.setter
+    def mbr(self, bounds: Rectangle):
+        """
+        Moves the entry to the top left corner of the bounds, see RTree.move
+        """
+        self.point = Point(bounds.top_left.x, bounds.top_left.y)
+
+    def __eq__(self, other):
+        return self.name == other.name and self.point == other.point
+
+    def __hash__(self):
+        return hash((self.name, self.point))
+
+
+class PointRTree(RTree):
+    """
+    An RTree of PointEntries, using PointRTree.RTreeNode as its nodes. Everything else behaves like a regular RTree
+    """
+
+    class RTreeNode(RTree.RTreeNode):
+        __slots__ = ()
+
+        def place(self, item, leaf: bool):
+            if not leaf:
+                return super().place(item, leaf)
+            self.entries.append(item)
+            if self.locator is not None:
+                self.locator[item.name] = self
+            self.items_changed()
+            point, top_left, bottom_right = item.point, self.mbr.top_left, self.mbr.bottom_right
+            if not (top_left.x <= point.x <= bottom_right.x and bottom_right.y <= point.y <= top_left.y):
+                self.mbr.expand_to_cover(item.mbr)
+
+        def recalculate_mbr(self):
+            if not self.is_leaf():
+                return super().recalculate_mbr()
+            xs = [entry.point.x for entry in self.entries]
+            ys = [entry.point.y for entry in self.entries]
+            self.mbr = Rectangle(Point(min(xs), max(ys)), Point(max(xs), min(ys)))
+
+        def intersecting_items(self, window: Rectangle) -> list:
+            if not self.is_leaf():
+                return super().intersecting_items(window)
+            min_x, max_x = window.top_left.x, window.bottom_right.x
+            min_y, max_y = window.bottom_right.y, window.top_left.y
+            return [entry for entry in self.entries
+                    if min_x <= entry.point.x <= max_x and min_y <= entry.point.y <= max_y]
+
+        def covered_items(self, window: Rectangle) -> list:
+            if not self.is_leaf():
+                return super().covered_items(window)
+            # A point lies inside the window whenever it intersects it
+            return self.intersecting_items(window)
+
+        def covering_items(self, query: Rectangle) -> list:
+            if not self.is_leaf():
+                return super().covering_items(query)
+            x, y = query.top_left.x, query.top_left.y
+            if x != query.bottom_right.x or y != query.bottom_right.y:
+                return []  # a point only covers a query of no width and height
+            return [entry for entry in self.entries if entry.point.x == x and entry.point.y == y]
+
+        def entry_distances(self, query) -> [(float, PointEntry)]:
+            if isinstance(query, Point):
+                return [(query.distance_to(entry.point), entry) for entry in self.entries]
+            return [(query.distance_to_point(entry.point), entry) for entry in self.entries]
+
+    def entry_of(self, name: str, bounds: tuple) -> PointEntry:
+        return PointEntry(name, Point(bounds[0], bounds[1]))
+
+    def move(self, object: PointEntry, new_point: Point, slack: float = 0) -> bool:
+        """
+        Moves the PointEntry to the new point, see RTree.move
+        """
+        return super().move(object, Rectangle(new_point, new_point), slack)
@@ -0,0 +1,160 @@
+import os
+import random
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+from point import Point
+from point_r_tree import PointRTree, PointEntry
+from r_tree import Entry
+from rectangle import Rectangle
+
+
+def random_points(count: int, seed: int = 0) -> [PointEntry]:
+    generator = random.Random(seed)
+    return [PointEntry(f'point-{idx}', Point(generator.uniform(0, 100), generator.uniform(0, 100)))
+            for idx in range(count)]
+
+
+def footprint(obj, seen: set = None) -> int:
+    """
+    :return: The size of the object along with every object it holds in its slots, each counted once.
+        Strings are left out, as both kinds of entries share their names
+    """
+    seen = set() if seen is None else seen
+    if id(obj) in seen or isinstance(obj, str):
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    for cls in type(obj).__mro__:
+        for slot in getattr(cls, '__slots__', ()):
+            if hasattr(obj, slot):
+                size += footprint(getattr(obj, slot), seen)
+    return size
+
+
+class PointRTreeTests(unittest.TestCase):
+    def setUp(self):
+        self.entries = random_points(500)
+        self.r_tree = PointRTree(2, 6)
+        for entry in self.entries:
+            self.r_tree.add(entry)
+
+    def assert_nodes_cover_points(self, node: PointRTree.RTreeNode):
+        for entry in node.entries:
+            self.assertTrue(node.mbr.is_covering(entry.mbr))
+        for child in node.children:
+            self.assertTrue(node.mbr.is_covering(child.mbr))
+            self.assert_nodes_cover_points(child)
+
+    def test_nodes_are_point_r_tree_nodes(self):
+        self.assertIsInstance(self.r_tree.root, PointRTree.RTreeNode)
+        self.assert_nodes_cover_points(self.r_tree.root)
+        self.assertCountEqual(self.r_tree.root.iter_entries(), self.entries)
+
+    def test_search_includes_points_on_the_window_edges(self):
+        r_tree = PointRTree.bulk_load([PointEntry('a', Point(0, 0)), PointEntry('b', Point(5, 5)),
+                                       PointEntry('c', Point(5.5, 2))], 2, 4)
+
+        found = r_tree.search(Rectangle(Point(0, 5), Point(5, 0)))
+
+        self.assertCountEqual([entry.name for entry in found], ['a', 'b'])
+
+    def test_search_finds_points_inside_the_window(self):
+        for seed in range(20):
+            generator = random.Random(seed)
+            x, y = generator.uniform(0, 90), generator.uniform(0, 90)
+            window = Rectangle(Point(x, y + 10), Point(x + 10, y))
+            expected = [entry for entry in self.entries
+                        if x <= entry.point.x <= x + 10 and y <= entry.point.y <= y + 10]
+
+            self.assertCountEqual(self.r_tree.search(window), expected)
+
+    def test_containment_queries(self):
+        window = Rectangle(Point(20, 70), Point(55, 30))
+
+        self.assertCountEqual(self.r_tree.contained_in(window), self.r_tree.search(window))
+        self.assertEqual(self.r_tree.containing(self.entries[7].point), [self.entries[7]])
+        self.assertEqual(self.r_tree.containing(Point(-1, -1)), [])
+        self.assertEqual(self.r_tree.containing(window), [])
+
+    def test_nearest_to_a_point_orders_by_point_distance(self):
+        query = Point(42.5, 17.25)
+
+        nearest = self.r_tree.nearest(query, k=10)
+
+        expected = sorted(self.entries, key=lambda entry: query.distance_to(entry.point))[:10]
+        self.assertEqual([query.distance_to(entry.point) for entry in nearest],
+                         [query.distance_to(entry.point) for entry in expected])
+
+    def test_nearest_to_a_rectangle(self):
+        query = Rectangle(Point(40, 60), Point(45, 50))
+
+        nearest = self.r_tree.nearest(query, k=10)
+
+        expected = sorted(self.entries, key=lambda entry: query.distance_to_point(entry.point))[:10]
+        self.assertEqual([query.distance_to_point(entry.point) for entry in nearest],
+                         [query.distance_to_point(entry.point) for entry in expected])
+
+    def test_move_and_delete(self):
+        entry = self.entries[0]
+
+        self.assertTrue(self.r_tree.move(entry, Point(200, 200)))
+        self.assertEqual(entry.point, Point(200, 200))
+        self.assertEqual(self.r_tree.nearest(Point(199, 199)), [entry])
+
+        self.r_tree.delete(entry)
+        self.assertNotIn(entry, self.r_tree.root.iter_entries())
+        self.assertEqual(self.r_tree.search(Rectangle(Point(150, 250), Point(250, 150))), [])
+        self.assert_nodes_cover_points(self.r_tree.root)
+
+    def test_save_and_load_keeps_point_entries(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, 'points.rts')
+
+        self.r_tree.save(path)
+        loaded_tree = PointRTree.load(path)
+
+        loaded_entries = list(loaded_tree.root.iter_entries())
+        self.assertTrue(all(isinstance(entry, PointEntry) for entry in loaded_entries))
+        self.assertCountEqual(loaded_entries, self.entries)
+
+    def test_point_entries_hold_fewer_objects_than_rectangle_entries(self):
+        point_entry = PointEntry('p', Point(1.5, 2.5))
+        entry = Entry('p', Rectangle(Point(1.5, 2.5), Point(1.5, 2.5)))
+
+        self.assertLess(footprint(point_entry), footprint(entry))
+        # Reading the MBR does not keep a Rectangle around
+        self.assertEqual(point_entry.mbr, entry.mbr)
+        self.assertEqual(footprint(point_entry), sys.getsizeof(point_entry) + footprint(point_entry.point))
+
+    def test_internal_nodes_cover_only_children_inside_window(self):
+        self.r_tree.insert_many(self.entries)
+        window = Rectangle(Point(0, 50), Point(50, 0))
+        root = self.r_tree.root
+
+        self.assertFalse(root.is_leaf())
+        self.assertEqual(root.covered_items(window), [child for child in root.children if child.mbr.is_covered_by(window)])
+        self.assertLess(len(root.covered_items(window)), len(root.intersecting_items(window)))
+
+    def test_leaves_do_not_create_rectangles_of_their_entries(self):
+        leaf = PointRTree.RTreeNode(2, 6, mbr=Rectangle(Point(0, 100), Point(100, 0)))
+        with mock.patch.object(PointEntry, 'mbr', new_callable=mock.PropertyMock) as mbr:
+            for entry in self.entries[:6]:
+                leaf.place(entry, leaf=True)
+            leaf.recalculate_mbr()
+            leaf.entry_distances(Point(0, 0))
+            leaf.intersecting_items(Rectangle(Point(0, 100), Point(100, 0)))
+            leaf.covered_items(Rectangle(Point(0, 100), Point(100, 0)))
+
+        self.assertEqual(mbr.call_count, 0)
+        self.assertEqual(leaf.mbr, Rectangle(Point(min(entry.point.x for entry in self.entries[:6]),
+                                                   max(entry.point.y for entry in self.entries[:6])),
+                                             Point(max(entry.point.x for entry in self.entries[:6]),
+                                                   min(entry.point.y for entry in self.entries[:6]))))
+
+
+if __name__ == '__main__':
+    unittest.main()
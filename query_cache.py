@@ -0,0 +1,68 @@
+"""
+Module that contains the cache behind RTree's cache_size option.
+    Every cached result is kept along with its reach - the bounds an Entry must intersect to be able to change it.
+    For a window query that is the window itself, for a kNN query the query grown by the distance of its k-th result.
+    A write then only drops the results whose reach intersects the MBR of the Entry it added, removed or moved,
+    instead of flushing the whole cache.
+    The cache guards itself with a lock, as concurrent readers of a tree (e.g AsyncRTree's executor threads)
+    all look up and store results
+"""
+from collections import OrderedDict
+from threading import Lock
+
+from bounds import is_intersecting
+
+
+class QueryCache:
+    """
+    A least recently used cache of query results
+    """
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._results = OrderedDict()  # key -> (reach bounds, None if any write can change the result; results)
+        self._lock = Lock()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._results)
+
+    def get(self, key: tuple) -> list:
+        """
+        :return: A copy of the cached results of the query, None if they are not cached
+        """
+        with self._lock:
+            cached = self._results.get(key)
+            if cached is None:
+                self.misses += 1
+                return None
+            self._results.move_to_end(key)
+            self.hits += 1
+            return list(cached[1])
+
+    def put(self, key: tuple, reach: tuple, results: list):
+        """
+        Caches a copy of the query's results, evicting the least recently used ones if the cache is full
+        :param reach: The (min x, min y, max x, max y) bounds of the results' reach, None if it is unbounded
+        """
+        cached = (reach, list(results))
+        with self._lock:
+            self._results[key] = cached
+            self._results.move_to_end(key)
+            if len(self._results) > self.max_size:
+                self._results.popitem(last=False)
+
+    def invalidate(self, bounds: tuple):
+        """
+        Drops the results a write of an Entry with the given (min x, min y, max x, max y) bounds can change
+        """
+        with self._lock:
+            stale = [key for key, (reach, _) in self._results.items()
+                     if reach is None or is_intersecting(reach, bounds)]
+            for key in stale:
+                del self._results[key]
+
+    def clear(self):
+        with self._lock:
+            self._results.clear()
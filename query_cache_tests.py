@@ -0,0 +1,137 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from concurrent_r_tree import CopyOnWriteRTree
+from entry_fixtures import grid_entries
+from query_cache import QueryCache
+from r_tree import RTree, Entry
+from rectangle import Rectangle, Point
+
+
+class QueryCacheTests(unittest.TestCase):
+    def test_evicts_least_recently_used(self):
+        cache = QueryCache(2)
+        cache.put(('a',), (0, 0, 1, 1), [1])
+        cache.put(('b',), (0, 0, 1, 1), [2])
+        self.assertEqual(cache.get(('a',)), [1])
+        cache.put(('c',), (0, 0, 1, 1), [3])
+
+        self.assertIsNone(cache.get(('b',)))
+        self.assertEqual(cache.get(('a',)), [1])
+        self.assertEqual(cache.get(('c',)), [3])
+        self.assertEqual((cache.hits, cache.misses), (3, 1))
+
+    def test_get_returns_a_copy(self):
+        cache = QueryCache(2)
+        cache.put(('a',), (0, 0, 1, 1), [1])
+        cache.get(('a',)).append(2)
+        self.assertEqual(cache.get(('a',)), [1])
+
+    def test_invalidate_only_drops_intersecting_reaches(self):
+        cache = QueryCache(10)
+        cache.put(('near',), (0, 0, 10, 10), [])
+        cache.put(('far',), (50, 50, 60, 60), [])
+        cache.put(('unbounded',), None, [])
+
+        cache.invalidate((5, 5, 20, 20))
+        self.assertEqual(len(cache), 1)
+        self.assertIsNotNone(cache.get(('far',)))
+
+
+class RTreeQueryCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.r_tree = RTree(2, 4, cache_size=16)
+        self.r_tree.insert_many(grid_entries(10, 10))
+        self.cache = self.r_tree.query_cache
+
+    def test_is_safe_to_share_between_threads(self):
+        cache = QueryCache(16)
+
+        def hammer(thread_idx: int):
+            for step in range(2000):
+                key = ('search', (thread_idx + step) % 40)
+                if cache.get(key) is None:
+                    cache.put(key, (step % 10, 0, step % 10 + 1, 1), [step])
+                if step % 7 == 0:
+                    cache.invalidate((step % 10, 0, step % 10, 0))
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(hammer, range(8)))
+
+        self.assertEqual(cache.hits + cache.misses, 8 * 2000)
+        self.assertLessEqual(len(cache), 16)
+
+    def test_repeated_search_is_served_from_cache(self):
+        window = Rectangle(Point(12, 38), Point(33, 18))
+        results = self.r_tree.search(window)
+        self.assertCountEqual(self.r_tree.search(Rectangle(Point(12, 38), Point(33, 18))), results)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_write_only_invalidates_queries_it_can_change(self):
+        near_window = Rectangle(Point(0, 25), Point(25, 0))
+        far_window = Rectangle(Point(60, 95), Point(95, 60))
+        self.r_tree.search(near_window)
+        far_results = self.r_tree.search(far_window)
+
+        added = Entry('new', bounds=Rectangle(Point(7, 8), Point(8, 7)))
+        self.r_tree.add(added)
+        self.assertIn(added, self.r_tree.search(near_window))
+        self.assertCountEqual(self.r_tree.search(far_window), far_results)
+        self.assertEqual(self.cache.hits, 1)
+
+        self.r_tree.delete(added)
+        self.assertNotIn(added, self.r_tree.search(near_window))
+        self.assertEqual(self.cache.hits, 1)
+
+    def test_move_invalidates_old_and_new_position(self):
+        old_window = Rectangle(Point(0, 8), Point(8, 0))
+        new_window = Rectangle(Point(80, 98), Point(98, 80))
+        self.r_tree.search(old_window)
+        self.r_tree.search(new_window)
+
+        moved = self.r_tree.search(old_window)[0]
+        self.r_tree.move(moved, Rectangle(Point(90, 95), Point(95, 90)))
+        self.assertNotIn(moved, self.r_tree.search(old_window))
+        self.assertIn(moved, self.r_tree.search(new_window))
+
+    def test_nearest_is_invalidated_only_by_closer_entries(self):
+        query = Point(47, 63)
+        results = self.r_tree.nearest(query, k=3)
+
+        self.r_tree.add(Entry('far', bounds=Rectangle(Point(200, 205), Point(205, 200))))
+        self.assertEqual(self.r_tree.nearest(query, k=3), results)
+        self.assertEqual(self.cache.hits, 1)
+
+        closest = Entry('closest', bounds=Rectangle(Point(46, 64), Point(48, 62)))
+        self.r_tree.add(closest)
+        self.assertEqual(self.r_tree.nearest(query, k=3)[0], closest)
+
+    def test_nearest_with_less_than_k_results_is_invalidated_by_any_add(self):
+        r_tree = RTree(2, 4, cache_size=4)
+        r_tree.add(Entry('a', bounds=Rectangle(Point(0, 5), Point(5, 0))))
+        self.assertEqual(len(r_tree.nearest(Point(0, 0), k=2)), 1)
+
+        r_tree.add(Entry('b', bounds=Rectangle(Point(900, 905), Point(905, 900))))
+        self.assertEqual([entry.name for entry in r_tree.nearest(Point(0, 0), k=2)], ['a', 'b'])
+
+    def test_cached_results_match_uncached_tree(self):
+        uncached = RTree(2, 4)
+        uncached.insert_many(grid_entries(10, 10))
+        windows = [Rectangle(Point(x, x + 30), Point(x + 30, x)) for x in range(0, 70, 10)]
+        for step in range(30):
+            entry = Entry(f'extra-{step}', bounds=Rectangle(Point(step * 3, step * 3 + 2), Point(step * 3 + 2, step * 3)))
+            for r_tree in (self.r_tree, uncached):
+                r_tree.add(entry)
+                if step % 3 == 0:
+                    r_tree.remove(f'{step // 3}-{step // 3}')
+            for window in windows:
+                self.assertCountEqual(self.r_tree.search(window), uncached.search(window))
+                self.assertEqual(self.r_tree.nearest(window.top_left, k=4), uncached.nearest(window.top_left, k=4))
+
+    def test_copy_on_write_tree_rejects_cache(self):
+        with self.assertRaises(ValueError):
+            CopyOnWriteRTree(2, 4, cache_size=4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,10 +1,21 @@
-from rectangle import Rectangle, Point, RectangleResizer
+from heapq import heappush, heappop
+from itertools import count, islice
+from time import perf_counter
+
+from bounds import bounds_of, rectangle_of, distance_between, area, overlap
+from packing import sort_tile_recursive, hilbert_sorted
+from query_cache import QueryCache
+from rectangle import Rectangle, Point
+from split_strategies import QuadraticSplit, ForcedReinsertion
+from tree_statistics import TreeStatistics
 
 
 class Entry:
     """
     An entry in the R-Tree
     """
+    __slots__ = ('name', 'mbr')
+
     def __init__(self, name: str, bounds: Rectangle):
         self.name = name
         self.mbr: Rectangle = bounds
@@ -13,115 +24,968 @@ class Entry:
         return self.name == other.name and self.mbr == other.mbr
 
     def __hash__(self):
-        return hash(f'{self.name}{hash(self.mbr)}')
+        return hash((self.name, self.mbr))
 
 
 class RTree:
+    class InvalidSnapshotError(Exception):
+        pass
 
     class RTreeNode:
         """
         A node in the R-Tree
         """
-        def __init__(self, min_order: int, max_order: int, mbr: Rectangle=Rectangle(Point(0, 1), Point(1, 0))):
-            self.mbr: Rectangle = mbr
+        __slots__ = ('mbr', 'minimum_order', 'maximum_order', 'split_strategy', 'locator', 'statistics',
+                     'children', 'entries')
+
+        def __init__(self, min_order: int, max_order: int, mbr: Rectangle=None, split_strategy=QuadraticSplit,
+                     locator: dict = None, statistics: TreeStatistics = None):
+            # Each node gets its own default MBR, as MBRs are expanded in place
+            self.mbr: Rectangle = mbr if mbr is not None else Rectangle(Point(0, 1), Point(1, 0))
             self.minimum_order = min_order
             self.maximum_order = max_order
+            self.split_strategy = split_strategy
+            # The tree's Entry name -> leaf index, shared by all of its nodes. None if the tree does not keep one
+            self.locator = locator
+            # The tree's TreeStatistics, shared by all of its nodes. None if the tree does not collect any
+            self.statistics = statistics
             self.children = []
             self.entries: [Entry] = []
 
-        def add(self, object: Entry):
-            if len(self.children) == 0:
-                # This node is a leaf, add the entry
-                self.entries.append(object)
+        def add(self, object: Entry, level: int = 0, reinsertion: ForcedReinsertion = None) -> ('RTreeNode', 'RTreeNode'):
+            """
+            Inserts the Entry into the subtree rooted at this node,
+                descending through the child which requires the least expansion (ChooseLeaf)
+                and expanding every MBR on the way down (AdjustTree)
+            :param level: The height of the node the object should be placed in -
+                0 for Entries, which go into leaves, the subtree's height + 1 for RTreeNodes
+            :param reinsertion: The R* forced reinsertion state of the insertion, if the split strategy uses one
+            :return: The two nodes this node was split into if it overflowed, None otherwise.
+                The caller is expected to replace this node with them
+            """
+            if self.is_leaf() if level == 0 else self.height() == level:
+                leaf = level == 0
+                self.place(object, leaf)
+                if self.item_count() > self.maximum_order:
+                    return self._overflow(leaf, reinsertion)
+                return None
 
-                if not self.mbr.is_bounding(object.mbr):
-                    self.mbr.expand_to(object.mbr)
+            if self.statistics is None:
+                child: 'RTreeNode' = self.choose_subtree(object)
+            else:
+                start = perf_counter()
+                child = self.choose_subtree(object)
+                self.statistics.choose_subtree_seconds += perf_counter() - start
+            orphan_count = len(reinsertion.orphans) if reinsertion is not None else 0
+            split_nodes = child.add(object, level, reinsertion)
+            if split_nodes is None:
+                self.items_changed()  # the child's MBR may have been expanded
+                if reinsertion is not None and len(reinsertion.orphans) > orphan_count:
+                    self.recalculate_mbr()  # or shrunk, by evicting items below it
+                else:
+                    self.expand_mbr(child.mbr)
+                return None
 
-                if len(self.entries) == self.maximum_order:
-                    # Need to split
-                    node_a, node_b = self.split_leaf()
-                    self.children.extend([node_a, node_b])
-                return
-            pass
+            self.children.remove(child)
+            for node in split_nodes:
+                self.place(node, leaf=False)
+            if len(self.children) > self.maximum_order:
+                return self._overflow(False, reinsertion)
+            return None
+
+        def _overflow(self, leaf: bool, reinsertion: ForcedReinsertion):
+            """
+            Handles a node with more than maximum_order items, by either evicting some of them for reinsertion or splitting
+            """
+            if reinsertion is not None and reinsertion.evict(self, leaf):
+                return None
+            return self.split_leaf() if leaf else self.split_node()
+
+        def height(self) -> int:
+            """
+            :return: The number of levels below this node, 0 for a leaf
+            """
+            height, node = 0, self
+            while not node.is_leaf():
+                height, node = height + 1, node.children[0]
+            return height
+
+        def is_leaf(self) -> bool:
+            return len(self.children) == 0
+
+        def expand_mbr(self, rectangle: Rectangle):
+            """
+            Expands this node's MBR to cover the given rectangle, if it does not already.
+                MBRs are exact - they grow just up to the edges of what they cover
+            """
+            if not self.mbr.is_covering(rectangle):
+                self.mbr.expand_to_cover(rectangle)
 
         def split_leaf(self):
             """
             Splits the given RTreeNode into 2 separate Nodes
             Then moves its entries into one of the two nodes
             """
-            if len(self.children) > 0:
-                raise NotImplementedError('[DEBUG] Unexpected behavior')
-            # 1. Find the two most far-apart objects
-            max_distance = -1
-            max_obj_a, max_obj_b = None, None
-            for idx, entry in enumerate(self.entries):
-                for idx_2 in range(len(self.entries)):
-                    if idx == idx_2:
-                        continue
-                    other_entry = self.entries[idx_2]
-
-                    dist = entry.mbr.distance_between(other_entry.mbr)
-                    if dist > max_distance:
-                        max_distance = dist
-                        max_obj_a = entry
-                        max_obj_b = other_entry
-
-            # 2. Create two new nodes to accommodate the new objects
-            node_a = self.__class__(min_order=self.minimum_order, max_order=self.maximum_order,
-                                    mbr=Rectangle.containing(max_obj_a.mbr))
-            node_a.add(max_obj_a)
-            node_b = self.__class__(min_order=self.minimum_order, max_order=self.maximum_order,
-                                    mbr=Rectangle.containing(max_obj_b.mbr))
-            node_b.add(max_obj_b)
-
-            # 3. Move rest of entries to appropriate nodes
-            rest_entries = [entry for entry in self.entries if entry != max_obj_a and entry != max_obj_b]
-            for idx, entry in enumerate(rest_entries):
-                rest_entry_count = len(rest_entries) - idx
-                needed_a_entries = node_a.minimum_order - len(node_a.entries)
-                needed_b_entries = node_b.minimum_order - len(node_b.entries)
-                if rest_entry_count == needed_a_entries:
-                    node_a.add(entry)  # All the rest should go to A
-                elif rest_entry_count == needed_b_entries:
-                    node_b.add(entry)  # All the rest should go to B
-                else:
-                    # Put it in the one whose MBR requires least expansion
-                    # TODO: Handle case where both bound entry
-                    node: 'RTreeNode' = self.find_min_expansion_node([node_a, node_b], entry)
-                    node.add(entry)
+            assert self.is_leaf(), 'Only leaves hold Entries, internal nodes are split with split_node()'
+            return self._split(self.entries, leaf=True)
+
+        def split_node(self):
+            """
+            Splits the given internal RTreeNode into 2 separate Nodes
+            Then moves its children into one of the two nodes
+            """
+            assert not self.is_leaf(), 'Leaves hold no children, they are split with split_leaf()'
+            return self._split(self.children, leaf=False)
+
+        def _split(self, items: list, leaf: bool):
+            """
+            Distributes the given items (Entries or RTreeNodes) between two new nodes, as chosen by the split strategy
+            """
+            if self.statistics is not None:
+                start = perf_counter()
+            group_a, group_b = self.split_strategy.split(items, self.minimum_order)
+            split_nodes = self.new_node_of(group_a, leaf), self.new_node_of(group_b, leaf)
+            if self.statistics is not None:
+                self.statistics.record_split(0 if leaf else self.height(), len(items), perf_counter() - start)
+            return split_nodes
+
+        def new_node_of(self, items: list, leaf: bool) -> 'RTreeNode':
+            """
+            Creates a node with this node's orders, split strategy, locator and statistics,
+                directly holding the given Entries (leaf=True) or RTreeNodes (leaf=False)
+            """
+            node = self.__class__(min_order=self.minimum_order, max_order=self.maximum_order,
+                                  mbr=Rectangle.covering(items[0].mbr), split_strategy=self.split_strategy,
+                                  locator=self.locator, statistics=self.statistics)
+            for item in items:
+                node.place(item, leaf)
+            return node
+
+        def recalculate_mbr(self):
+            """
+            Recalculates this node's MBR from scratch, shrinking it to its current items
+            """
+            leaf = self.is_leaf()
+            items = self.entries if leaf else self.children
+            self.mbr = Rectangle.covering(items[0].mbr)
+            for item in items:
+                self.expand_mbr(item.mbr)
+
+        def place(self, item, leaf: bool):
+            """
+            Directly appends an Entry (leaf=True) or a child RTreeNode (leaf=False) to this node,
+                expanding its MBR. Does not descend or split
+            """
+            if leaf:
+                self.entries.append(item)
+                if self.locator is not None:
+                    self.locator[item.name] = self
+            else:
+                self.children.append(item)
+            self.items_changed()
+            self.expand_mbr(item.mbr)
+
+        def items_changed(self):
+            """
+            Called whenever this node's entries or children, or their MBRs, change.
+                A hook for node layouts which keep derived state about their items, see packed_node
+            """
+            pass
+
+        def intersecting_items(self, window: Rectangle) -> list:
+            """
+            :return: This node's Entries (if it is a leaf) or children whose MBR intersects the given window
+            """
+            items = self.entries if self.is_leaf() else self.children
+            return [item for item in items if item.mbr.is_intersecting(window)]
 
-            # 4. Expand node's MBR to fir their biggest
-            for node in [node_a, node_b]:
-                for entry in node.entries:
-                    entry: Entry
-                    if not node.mbr.is_bounding(entry.mbr):
-                        node.mbr.expand_to(entry.mbr)
+        def covered_items(self, window: Rectangle) -> list:
+            """
+            :return: This node's Entries (if it is a leaf) or children whose MBR lies inside the given window,
+                edges included
+            """
+            items = self.entries if self.is_leaf() else self.children
+            return [item for item in items if item.mbr.is_covered_by(window)]
 
-            return node_a, node_b
+        def covering_items(self, query: Rectangle) -> list:
+            """
+            :return: This node's Entries (if it is a leaf) or children whose MBR covers the given query, edges included
+            """
+            items = self.entries if self.is_leaf() else self.children
+            return [item for item in items if item.mbr.is_covering(query)]
+
+        def entry_distances(self, query) -> [(float, Entry)]:
+            """
+            :return: The distance of every Entry of this leaf from the given Point or Rectangle, along with the Entry
+            """
+            if isinstance(query, Point):
+                return [(entry.mbr.distance_to_point(query), entry) for entry in self.entries]
+            return [(query.distance_between(entry.mbr), entry) for entry in self.entries]
+
+        def choose_subtree(self, object) -> 'RTreeNode':
+            """
+            :return: The child the object should be inserted into
+            """
+            return self.find_min_expansion_node(self.children, object)
+
+        def copy(self) -> 'RTreeNode':
+            """
+            :return: A shallow copy of this node - with its own MBR and item lists, but sharing the items themselves
+            """
+            mbr = Rectangle(Point(self.mbr.top_left.x, self.mbr.top_left.y),
+                            Point(self.mbr.bottom_right.x, self.mbr.bottom_right.y))
+            node = self.__class__(min_order=self.minimum_order, max_order=self.maximum_order, mbr=mbr,
+                                  split_strategy=self.split_strategy, locator=self.locator,
+                                  statistics=self.statistics)
+            node.entries = list(self.entries)
+            node.children = list(self.children)
+            return node
+
+        def iter_entries(self):
+            """
+            Yields every Entry in the subtree rooted at this node
+            """
+            nodes = [self]
+            while nodes:
+                node = nodes.pop()
+                yield from node.entries
+                nodes.extend(node.children)
+
+        def item_count(self) -> int:
+            return len(self.entries) + len(self.children)
 
         @staticmethod
         def find_min_expansion_node(rt_nodes: ['RTreeNode'], entry: Entry) -> 'RTreeNode':
             """
             Given N RTreeNodes and one Entry,
-                find the RTreeNode which requires the least expansion to accommodate the Entry
+                find the RTreeNode which requires the least expansion to accommodate the Entry.
+                Ties go to the node with the smallest area, then to the one with the fewest items
+            Works on the raw coordinates, without creating any Rectangles
             """
-            expansions = []
+            entry_top_left, entry_bottom_right = entry.mbr.top_left, entry.mbr.bottom_right
+            best_node, best_expansion, best_area, best_count = None, None, None, None
             for node in rt_nodes:
-                if node.mbr.is_bounding(entry.mbr):
-                    expanded = 0
-                else:
-                    expanded = RectangleResizer.rectangle_expanded_to(node.mbr, entry.mbr).area - node.mbr.area
-                expansions.append({'node': node, 'expanded': expanded})
+                top_left, bottom_right = node.mbr.top_left, node.mbr.bottom_right
+                area = (bottom_right.x - top_left.x) * (top_left.y - bottom_right.y)
+                expanded_area = ((max(bottom_right.x, entry_bottom_right.x) - min(top_left.x, entry_top_left.x))
+                                 * (max(top_left.y, entry_top_left.y) - min(bottom_right.y, entry_bottom_right.y)))
+                expansion = expanded_area - area
 
-            return min(expansions, key=lambda x: x['expanded'])['node']
+                if best_node is not None:
+                    if expansion > best_expansion:
+                        continue
+                    if expansion == best_expansion:
+                        if area > best_area:
+                            continue
+                        if area == best_area and node.item_count() >= best_count:
+                            continue
+                best_node, best_expansion, best_area, best_count = node, expansion, area, node.item_count()
+
+            return best_node
 
-    def __init__(self, min_order: int, max_order: int):
+    def __init__(self, min_order: int, max_order: int, split_strategy=QuadraticSplit, locate_entries: bool = False,
+                 cache_size: int = 0, collect_statistics: bool = False):
+        """
+        :param split_strategy: How overflowing nodes are split, one of the split_strategies module's
+            LinearSplit, QuadraticSplit (default) or RStarSplit
+        :param locate_entries: Whether to keep an index from every Entry's name to its leaf,
+            making get() and `in` constant-time. remove(), delete() and move() then find the Entry's leaf directly,
+            but still walk down to it from the root (only through the nodes covering it) to update its ancestors.
+            Entry names are then expected to be unique
+        :param cache_size: How many search() and nearest() results to cache, 0 (default) disables the cache.
+            Writes only drop the cached results they can change, see the query_cache module
+        :param collect_statistics: Whether to count the work done by inserts and queries into a TreeStatistics,
+            kept as the tree's `statistics`, which also notifies its subscribers of every insert, split and query
+        """
         self.root: self.RTreeNode = None
         self.minimum_order = min_order
         self.maximum_order = max_order
+        self.split_strategy = split_strategy
+        self.locator = {} if locate_entries else None
+        self.query_cache = QueryCache(cache_size) if cache_size else None
+        self.statistics = TreeStatistics() if collect_statistics else None
+
+    def __contains__(self, name: str) -> bool:
+        return self.get(name) is not None
+
+    def get(self, name: str) -> Entry:
+        """
+        :return: The Entry with the given name, None if there is no such Entry.
+            Constant-time if the tree locates entries, a full scan otherwise
+        """
+        if self.root is None:
+            return None
+        if self.locator is not None:
+            leaf = self.locator.get(name)
+            entries = leaf.entries if leaf is not None else []
+        else:
+            entries = self.root.iter_entries()
+        return next((entry for entry in entries if entry.name == name), None)
+
+    def remove(self, name: str) -> bool:
+        """
+        Removes the Entry with the given name from the tree
+        :return: Boolean, indicating if the Entry was found
+        """
+        entry = self.get(name)
+        return entry is not None and self.delete(entry)
+
+    def entry_of(self, name: str, bounds: tuple) -> Entry:
+        """
+        :return: A new Entry of the kind this tree holds, with the given name and (min x, min y, max x, max y) bounds
+        """
+        return Entry(name, bounds=rectangle_of(bounds))
+
+    def _new_node(self, mbr: Rectangle) -> 'RTreeNode':
+        return self.RTreeNode(mbr=mbr, min_order=self.minimum_order, max_order=self.maximum_order,
+                              split_strategy=self.split_strategy, locator=self.locator, statistics=self.statistics)
 
     def add(self, object: Entry):
+        if self.query_cache is not None:
+            self.query_cache.invalidate(bounds_of(object.mbr))
+        if self.statistics is None:
+            self._add(object)
+        else:
+            start = perf_counter()
+            self._add(object)
+            self.statistics.record_insert(object, perf_counter() - start)
+
+    def _add(self, object: Entry):
+        """
+        Inserts the Entry without touching the query cache, for Entries which only move around inside the tree
+        """
+        if self.root is None:
+            self.root: self.RTreeNode = self._new_node(Rectangle.covering(object.mbr))
+        reinsertion = None
+        if self.split_strategy.forced_reinsert:
+            reinsertion = ForcedReinsertion(self.split_strategy.REINSERT_FRACTION, self.root.height())
+
+        self._insert(object, 0, reinsertion)
+        while reinsertion is not None and reinsertion.orphans:
+            orphan, level = reinsertion.orphans.pop(0)
+            self._insert(orphan, level, reinsertion)
+
+    def _insert(self, object, level: int, reinsertion: ForcedReinsertion = None):
+        """
+        Inserts the Entry (level=0) or subtree into the node at the given height, growing the root if it splits
+        """
+        split_nodes = self.root.add(object, level, reinsertion)
+        if split_nodes is not None:
+            # The root overflowed - grow the tree by one level
+            self.root = self.root.new_node_of(list(split_nodes), leaf=False)
+            if reinsertion is not None:
+                reinsertion.levels.add(self.root.height())
+
+    def delete(self, object: Entry) -> bool:
+        """
+        Removes the Entry from the tree. Nodes left with less than minimum_order items are removed
+            and their items re-added (CondenseTree), MBRs on the way up are shrunk
+            and a root left with a single child is replaced by it
+        :return: Boolean, indicating if the Entry was found
+        """
+        if self.root is None:
+            return False
+        path = self._locate_path(object)
+        if path is None:
+            return False
+        self._delete_from_path(path, object)
+        return True
+
+    def _delete_from_path(self, path: ['RTreeNode'], object: Entry):
+        """
+        Removes the Entry from the last node of the path (from the root to its leaf) and condenses the tree
+        """
+        if self.query_cache is not None:
+            self.query_cache.invalidate(bounds_of(object.mbr))
+        path[-1].entries.remove(object)
+        path[-1].items_changed()
+        if self.locator is not None:
+            del self.locator[object.name]
+        orphans = self._condense(path)
+        if self.root.item_count() == 0:
+            self.root = None
+
+        for orphan, height in orphans:
+            if height == 0:
+                for entry in orphan.entries:
+                    self._add(entry)
+            elif self.root is not None and self.root.height() >= height:
+                for child in orphan.children:
+                    self._insert(child, height)
+            else:
+                # The tree became too short to hold the subtrees at their level
+                for entry in orphan.iter_entries():
+                    self._add(entry)
+
+        while self.root is not None and not self.root.is_leaf() and len(self.root.children) == 1:
+            self.root = self.root.children[0]
+
+    def move(self, object: Entry, new_bounds: Rectangle, slack: float = 0) -> bool:
+        """
+        Changes the bounds of an Entry in the tree, e.g one tracking a moving object.
+            If the new bounds still fit inside the Entry's leaf, the Entry is updated in place.
+            If they fit inside the leaf's MBR grown by `slack` on every side, the leaf and its ancestors are expanded to them.
+            Only otherwise is the Entry deleted and re-added with the new bounds.
+            MBRs the old bounds reached the edge of are shrunk back to their items, so they keep fitting tightly
+        :return: Boolean, indicating if the Entry was found
+        """
+        if self.root is None:
+            return False
+        path = None
+        leaf = self.locator.get(object.name) if self.locator is not None else None
+        if leaf is None or object not in leaf.entries:
+            path = self._find_leaf_path(self.root, object)
+            if path is None:
+                return False
+            leaf = path[-1]
+        stored = leaf.entries[leaf.entries.index(object)]
+
+        if self.query_cache is not None:
+            self.query_cache.invalidate(bounds_of(stored.mbr))
+            self.query_cache.invalidate(bounds_of(new_bounds))
+        if leaf.mbr.is_covering(new_bounds):
+            if self._is_on_edge(stored.mbr, leaf.mbr):
+                if path is None:
+                    path = self._locate_path(stored)
+                stored.mbr = new_bounds
+                self._refit_path(path)
+            else:
+                stored.mbr = new_bounds
+                leaf.items_changed()
+            return True
+
+        if slack > 0 and self._is_within(new_bounds, leaf.mbr, slack):
+            if path is None:
+                path = self._locate_path(stored)
+            stored.mbr = new_bounds
+            self._refit_path(path)
+            return True
+
+        self.delete(stored)
+        stored.mbr = new_bounds
+        self._add(stored)
+        return True
+
+    @staticmethod
+    def _is_on_edge(rectangle: Rectangle, bounds: Rectangle) -> bool:
+        """
+        :return: Boolean, indicating if the rectangle reaches an edge of the bounds it lies in,
+            i.e whether the bounds could shrink without it
+        """
+        return any(coordinate == bound for coordinate, bound in zip(bounds_of(rectangle), bounds_of(bounds)))
+
+    @staticmethod
+    def _refit_path(path: ['RTreeNode']):
+        """
+        Recalculates the MBRs along the path (from the root) from its leaf up,
+            stopping at the first node whose MBR stays the same
+        """
+        for depth in range(len(path) - 1, -1, -1):
+            node = path[depth]
+            node.items_changed()
+            old_mbr = node.mbr
+            node.recalculate_mbr()
+            if node.mbr == old_mbr:
+                break
+
+    @staticmethod
+    def _is_within(rectangle: Rectangle, bounds: Rectangle, slack: float) -> bool:
+        """
+        :return: Boolean, indicating if the rectangle lies inside the bounds grown by slack on every side
+        """
+        return (rectangle.top_left.x >= bounds.top_left.x - slack
+                and rectangle.top_left.y <= bounds.top_left.y + slack
+                and rectangle.bottom_right.x <= bounds.bottom_right.x + slack
+                and rectangle.bottom_right.y >= bounds.bottom_right.y - slack)
+
+    def _locate_path(self, object: Entry) -> ['RTreeNode']:
+        """
+        :return: The nodes from the root down to the leaf holding the Entry, None if the Entry is not in the tree.
+            If the tree locates entries, only the nodes whose MBR covers the Entry's leaf are descended into
+        """
+        leaf = self.locator.get(object.name) if self.locator is not None else None
+        if leaf is not None and object in leaf.entries:
+            path = self._find_node_path(self.root, leaf)
+            if path is not None:
+                return path
+        return self._find_leaf_path(self.root, object)
+
+    def _find_node_path(self, node: 'RTreeNode', target: 'RTreeNode') -> ['RTreeNode']:
+        """
+        :return: The nodes from the given one down to the target node,
+            only descending into nodes whose MBR covers the target's. None if the target is not in the subtree
+        """
+        if node is target:
+            return [node]
+        if node.is_leaf():
+            return None
+        for child in node.covering_items(target.mbr):
+            path = self._find_node_path(child, target)
+            if path is not None:
+                return [node] + path
+        return None
+
+    def _find_leaf_path(self, node: 'RTreeNode', object: Entry) -> ['RTreeNode']:
+        """
+        :return: The nodes from the given one down to the leaf holding the Entry,
+            only descending into nodes whose MBR intersects it. None if the Entry is not in the subtree
+        """
+        if node.is_leaf():
+            return [node] if object in node.entries else None
+        for child in node.intersecting_items(object.mbr):
+            path = self._find_leaf_path(child, object)
+            if path is not None:
+                return [node] + path
+        return None
+
+    def _condense(self, path: ['RTreeNode']) -> [('RTreeNode', int)]:
+        """
+        Walks up the path from a leaf an Entry was removed from, detaching the nodes left with too few items
+            and shrinking the MBRs of the rest
+        :return: The detached nodes along with their height, their items are to be re-added
+        """
+        orphans = []
+        for depth in range(len(path) - 1, 0, -1):
+            node, parent = path[depth], path[depth - 1]
+            height = len(path) - 1 - depth
+            if node.item_count() < self.minimum_order:
+                parent.children.remove(node)
+                orphans.append((node, height))
+            else:
+                node.recalculate_mbr()
+            parent.items_changed()
+        if self.root.item_count() > 0:
+            self.root.recalculate_mbr()
+        return orphans
+
+    def save(self, path: str):
+        """
+        Writes the tree into a binary snapshot file, see the snapshot module for its layout
+        """
+        from snapshot import save
+
+        save(self, path)
+
+    @classmethod
+    def load(cls, path: str, **kwargs) -> 'RTree':
+        """
+        Reads a tree back from a snapshot file written by save(), without reinserting anything
+        :param kwargs: Passed on to the RTree's constructor, along with the saved orders
+        """
+        from snapshot import load
+
+        return load(path, cls, **kwargs)
+
+    def insert_many(self, entries: [Entry]):
+        """
+        Adds a batch of entries, in the order of the Hilbert value of their centers.
+            Consecutive inserts are then spatially close and keep descending through the same nodes
+        """
+        for entry in hilbert_sorted(entries):
+            self.add(entry)
+
+    @classmethod
+    def bulk_load(cls, entries: [Entry], min_order: int, max_order: int, packer=sort_tile_recursive, **kwargs) -> 'RTree':
+        """
+        Builds a new RTree out of the given entries by packing them bottom-up,
+            which produces full, barely overlapping nodes without going through add() and its splits
+        :param packer: The packing order - packing.sort_tile_recursive (default) or packing.hilbert_pack
+        :param kwargs: Passed on to the RTree's constructor
+        """
+        r_tree = cls(min_order, max_order, **kwargs)
+        r_tree.root = r_tree._pack(entries, packer)
+        return r_tree
+
+    def _pack(self, items: list, packer, leaf: bool = True) -> 'RTreeNode':
+        """
+        Packs the Entries into leaves (or the equally tall RTreeNodes into parents when leaf=False),
+            then packs every level's nodes into parents until a single root is left
+        :param packer: A function grouping a level's items into nodes, see the packing module
+        """
+        items = list(items)
+        if not items:
+            return None
+
+        node_of = self._new_node(None).new_node_of  # makes nodes sharing the tree's settings
+        while True:
+            nodes = [node_of(group, leaf) for group in packer(items, self.minimum_order, self.maximum_order)]
+            if len(nodes) == 1:
+                return nodes[0]
+            items, leaf = nodes, False
+
+    def analyze(self) -> dict:
+        """
+        Reports how well the tree's nodes can prune queries
+        :return: The tree's height, Entry and node counts, along with per-level metrics ('levels', leaves first):
+            node count, fill factor (the mean share of max_order a node holds), total MBR area,
+            overlap area between siblings, dead space (node area not covered by its items - a lower bound,
+            as it subtracts the area of overlapping items twice) and the count of underfull nodes
+            (less than min_order items, not counting the root). Everything but the height and fill factor is also totaled
+        """
         if self.root is None:
-            self.root: self.RTreeNode = self.RTreeNode(mbr=Rectangle.containing(object.mbr),
-                                                       min_order=self.minimum_order, max_order=self.maximum_order)
-        self.root.add(object)
+            return {'height': None, 'entries': 0, 'nodes': 0, 'area': 0, 'overlap': 0, 'dead_space': 0,
+                    'underfull': 0, 'levels': []}
+
+        height = self.root.height()
+        levels = [{'nodes': 0, 'items': 0, 'area': 0, 'overlap': 0, 'dead_space': 0, 'underfull': 0}
+                  for _ in range(height + 1)]
+        for node in self._nodes_breadth_first(self.root):
+            leaf = node.is_leaf()
+            level = node.height()
+            node_bounds = bounds_of(node.mbr)
+            item_bounds = [bounds_of(item.mbr) for item in (node.entries if leaf else node.children)]
+            level_metrics = levels[level]
+            level_metrics['nodes'] += 1
+            level_metrics['items'] += len(item_bounds)
+            level_metrics['area'] += area(node_bounds)
+            level_metrics['dead_space'] += max(0, area(node_bounds) - sum(area(bounds) for bounds in item_bounds))
+            if node is not self.root and len(item_bounds) < self.minimum_order:
+                level_metrics['underfull'] += 1
+            if not leaf:
+                levels[level - 1]['overlap'] += self._sibling_overlap(item_bounds)
+
+        for level_metrics in levels:
+            level_metrics['fill'] = level_metrics['items'] / (level_metrics['nodes'] * self.maximum_order)
+        report = {'height': height, 'entries': levels[0]['items']}
+        for metric in ('nodes', 'area', 'overlap', 'dead_space', 'underfull'):
+            report[metric] = sum(level_metrics[metric] for level_metrics in levels)
+        report['levels'] = levels
+        return report
+
+    @staticmethod
+    def _sibling_overlap(sibling_bounds: [tuple]):
+        """
+        :return: The summed overlap area of every pair of the given bounds
+        """
+        return sum(overlap(bounds, other_bounds) for idx, bounds in enumerate(sibling_bounds)
+                   for other_bounds in sibling_bounds[idx + 1:])
+
+    def reorganize(self, overlap_threshold: float = 0.1, max_subtrees: int = None, packer=sort_tile_recursive) -> int:
+        """
+        Repacks the subtrees whose children overlap the most, like bulk_load() would, leaving the rest of the tree as it is.
+            A subtree is a candidate when the overlap area between its root's children exceeds overlap_threshold
+            of its root's area. Candidates are searched for top-down below the tree's root, so no candidate contains another.
+            The repacked subtrees keep their height, so the tree stays balanced. The tree's root is never repacked -
+            bulk_load() the Entries instead to rebuild the whole tree
+        :param max_subtrees: How many of the worst candidates to repack, all of them if None
+        :param packer: The packing order - packing.sort_tile_recursive (default) or packing.hilbert_pack
+        :return: The number of subtrees repacked
+        """
+        if self.root is None or self.root.is_leaf():
+            return 0
+
+        candidates = []  # (overlap ratio, child indexes leading from the root to the subtree)
+        nodes = [(child, (idx,)) for idx, child in enumerate(self.root.children)]
+        while nodes:
+            node, child_idxs = nodes.pop()
+            if node.is_leaf():
+                continue
+            node_area = area(bounds_of(node.mbr))
+            sibling_overlap = self._sibling_overlap([bounds_of(child.mbr) for child in node.children])
+            ratio = sibling_overlap / node_area if node_area else 0
+            if ratio > overlap_threshold:
+                candidates.append((ratio, child_idxs))
+            else:
+                nodes.extend((child, child_idxs + (idx,)) for idx, child in enumerate(node.children))
+
+        candidates.sort(key=lambda candidate: candidate[0], reverse=True)
+        repacked = 0
+        for _, child_idxs in candidates[:max_subtrees]:
+            path = [self.root]
+            for idx in child_idxs:
+                path.append(path[-1].children[idx])
+            repacked += self._repack(path, packer)
+        return repacked
+
+    def _repack(self, path: ['RTreeNode'], packer) -> bool:
+        """
+        Replaces the children of the last node of the path (from the root) with new ones of the same height,
+            packed out of the node's Entries. Every level is packed as full as it can be
+            while leaving enough nodes for the node to end up with at least min_order children
+        :return: Boolean, indicating if the node could be repacked without leaving any node underfull or overflowing
+        """
+        node = path[-1]
+        height = node.height()
+        items, leaf = list(node.iter_entries()), True
+        packed = True
+        for level in range(height):
+            # Every level above needs at least min_order times fewer nodes. The packers only fill the last node
+            # up to min_order when the runs are at least 2 * min_order - 1 long
+            fan_out = min(self.maximum_order,
+                          max(2 * self.minimum_order - 1, len(items) // self.minimum_order ** (height - level)))
+            groups = packer(items, self.minimum_order, fan_out)
+            packed = packed and all(len(group) >= self.minimum_order for group in groups)
+            items = [node.new_node_of(group, leaf) for group in groups]
+            leaf = False
+
+        if not packed or not self.minimum_order <= len(items) <= self.maximum_order:
+            if self.locator is not None:  # point the Entries back to their old leaves
+                for old_node in self._nodes_below(node):
+                    self.locator.update((entry.name, old_node) for entry in old_node.entries)
+            return False
+
+        node.children = items
+        node.items_changed()
+        node.recalculate_mbr()
+        for parent, child in zip(reversed(path[:-1]), reversed(path[1:])):
+            parent.items_changed()
+            parent.expand_mbr(child.mbr)
+        return True
+
+    @staticmethod
+    def _nodes_breadth_first(root: 'RTreeNode') -> ['RTreeNode']:
+        """
+        :return: Every node of the subtree rooted at the given node (none if it is None), level by level from the top
+        """
+        nodes = [root] if root is not None else []
+        for node in nodes:  # grows while iterating
+            nodes.extend(node.children)
+        return nodes
+
+    @staticmethod
+    def _nodes_below(node: 'RTreeNode'):
+        nodes = list(node.children)
+        while nodes:
+            node = nodes.pop()
+            yield node
+            nodes.extend(node.children)
+
+    def search(self, window: Rectangle) -> [Entry]:
+        """
+        Returns every Entry whose MBR intersects the given window,
+            skipping the subtrees whose MBR does not intersect it
+        """
+        if self.statistics is not None:
+            return self.statistics.measure_query('search', window, self._cached_search)
+        return self._cached_search(window)
+
+    def _cached_search(self, window: Rectangle) -> [Entry]:
+        return self._cached_window_query('search', window, self._search)
+
+    def _cached_window_query(self, kind: str, window: Rectangle, run) -> [Entry]:
+        """
+        Answers a query only Entries intersecting the window can change the results of, from the cache if possible
+        :param run: The function answering the query, called with the window
+        """
+        if self.query_cache is None:
+            return run(window)
+
+        window_bounds = bounds_of(window)
+        results = self.query_cache.get((kind, window_bounds))
+        if results is None:
+            results = run(window)
+            self.query_cache.put((kind, window_bounds), window_bounds, results)
+        return results
+
+    def _search(self, window: Rectangle) -> [Entry]:
+        return list(self.iter_search(window))
+
+    def iter_search(self, window: Rectangle):
+        """
+        Lazily yields every Entry whose MBR intersects the given window, see search()
+        """
+        if self.root is None or not self.root.mbr.is_intersecting(window):
+            return
+
+        statistics = self.statistics
+        nodes = [self.root]
+        while nodes:
+            node: self.RTreeNode = nodes.pop()
+            if statistics is not None:
+                statistics.visit(node, node.item_count())
+            if node.is_leaf():
+                yield from node.intersecting_items(window)
+            else:
+                nodes.extend(node.intersecting_items(window))
+
+    def contained_in(self, window: Rectangle) -> [Entry]:
+        """
+        Returns every Entry whose MBR lies inside the given window, edges included.
+            Subtrees whose MBR intersects the window are searched, and those whose MBR lies inside it
+            are taken whole, without testing their Entries
+        """
+        if self.statistics is not None:
+            return self.statistics.measure_query('contained_in', window, self._cached_contained_in)
+        return self._cached_contained_in(window)
+
+    def _cached_contained_in(self, window: Rectangle) -> [Entry]:
+        return self._cached_window_query('contained_in', window, self._contained_in)
+
+    def _contained_in(self, window: Rectangle) -> [Entry]:
+        if self.root is None or not self.root.mbr.is_intersecting(window):
+            return []
+
+        statistics = self.statistics
+        results = []
+        nodes = [self.root]
+        while nodes:
+            node: self.RTreeNode = nodes.pop()
+            if node.mbr.is_covered_by(window):
+                if statistics is not None:
+                    statistics.visit(node, 0)
+                results.extend(node.iter_entries())
+                continue
+            if statistics is not None:
+                statistics.visit(node, node.item_count())
+            if node.is_leaf():
+                results.extend(node.covered_items(window))
+            else:
+                nodes.extend(node.intersecting_items(window))
+        return results
+
+    def containing(self, query) -> [Entry]:
+        """
+        Returns every Entry whose MBR covers the given Point or Rectangle, edges included.
+            Only the subtrees whose MBR covers the query are searched
+        """
+        if isinstance(query, Point):
+            query = Rectangle(query, query)
+        if self.statistics is not None:
+            return self.statistics.measure_query('containing', query, self._cached_containing)
+        return self._cached_containing(query)
+
+    def _cached_containing(self, query: Rectangle) -> [Entry]:
+        return self._cached_window_query('containing', query, self._containing)
+
+    def _containing(self, query: Rectangle) -> [Entry]:
+        if self.root is None or not self.root.mbr.is_covering(query):
+            return []
+
+        statistics = self.statistics
+        results = []
+        nodes = [self.root]
+        while nodes:
+            node: self.RTreeNode = nodes.pop()
+            if statistics is not None:
+                statistics.visit(node, node.item_count())
+            if node.is_leaf():
+                results.extend(node.covering_items(query))
+            else:
+                nodes.extend(node.covering_items(query))
+        return results
+
+    JOIN_PREDICATES = {
+        'intersects': lambda mbr_a, mbr_b: True,  # the sweep only pairs up intersecting MBRs
+        'contains': lambda mbr_a, mbr_b: mbr_a.is_covering(mbr_b),
+        'within': lambda mbr_a, mbr_b: mbr_a.is_covered_by(mbr_b),
+    }
+
+    def join(self, other: 'RTree', predicate: str = 'intersects'):
+        """
+        Yields every (Entry of this tree, Entry of the other tree) pair whose MBRs intersect,
+            or where the first one covers ('contains') or is covered by ('within') the second, edges included.
+            Both trees are traversed together, only descending into node pairs whose MBRs intersect.
+            The items of every such pair are matched with a plane sweep over their X coordinates
+        """
+        if predicate not in self.JOIN_PREDICATES:
+            raise ValueError(f'Unknown join predicate {predicate}, expected one of {", ".join(self.JOIN_PREDICATES)}')
+        if self.root is None or other.root is None or not self.root.mbr.is_intersecting(other.root.mbr):
+            return
+        matches = self.JOIN_PREDICATES[predicate]
+
+        node_pairs = [(self.root, other.root)]
+        while node_pairs:
+            node_a, node_b = node_pairs.pop()
+            if node_a.is_leaf() and node_b.is_leaf():
+                for entry_a, entry_b in self._sweep(node_a.intersecting_items(node_b.mbr),
+                                                    node_b.intersecting_items(node_a.mbr)):
+                    if matches(entry_a.mbr, entry_b.mbr):
+                        yield entry_a, entry_b
+            elif node_b.is_leaf():
+                # Trees of different heights - keep descending on the taller side only
+                node_pairs.extend((child, node_b) for child in node_a.intersecting_items(node_b.mbr))
+            elif node_a.is_leaf():
+                node_pairs.extend((node_a, child) for child in node_b.intersecting_items(node_a.mbr))
+            else:
+                node_pairs.extend(self._sweep(node_a.intersecting_items(node_b.mbr),
+                                              node_b.intersecting_items(node_a.mbr)))
+
+    @staticmethod
+    def _sweep(items_a: list, items_b: list):
+        """
+        Yields every (item of items_a, item of items_b) pair whose MBRs intersect,
+            by sweeping a line over both lists sorted by their MBR's min X
+        """
+        sorted_a = sorted(((bounds_of(item.mbr), item) for item in items_a), key=lambda pair: pair[0][0])
+        sorted_b = sorted(((bounds_of(item.mbr), item) for item in items_b), key=lambda pair: pair[0][0])
+
+        idx_a, idx_b = 0, 0
+        while idx_a < len(sorted_a) and idx_b < len(sorted_b):
+            bounds_a, item_a = sorted_a[idx_a]
+            bounds_b, item_b = sorted_b[idx_b]
+            if bounds_a[0] <= bounds_b[0]:
+                # item_a starts first - pair it with every item of b starting before it ends
+                for other_bounds, other_item in sorted_b[idx_b:]:
+                    if other_bounds[0] > bounds_a[2]:
+                        break
+                    if other_bounds[1] <= bounds_a[3] and other_bounds[3] >= bounds_a[1]:
+                        yield item_a, other_item
+                idx_a += 1
+            else:
+                for other_bounds, other_item in sorted_a[idx_a:]:
+                    if other_bounds[0] > bounds_b[2]:
+                        break
+                    if other_bounds[1] <= bounds_b[3] and other_bounds[3] >= bounds_b[1]:
+                        yield other_item, item_b
+                idx_b += 1
+
+    def nearest(self, query, k: int = 1) -> [Entry]:
+        """
+        Returns the k Entries closest to the given Point or Rectangle, closest first
+        """
+        if self.statistics is not None:
+            return self.statistics.measure_query('nearest', query, self._cached_nearest, k)
+        return self._cached_nearest(query, k)
+
+    def _cached_nearest(self, query, k: int) -> [Entry]:
+        if self.query_cache is None:
+            return self._nearest(query, k)
+
+        query_bounds = (query.x, query.y, query.x, query.y) if isinstance(query, Point) else bounds_of(query)
+        key = ('nearest', isinstance(query, Point), query_bounds, k)
+        results = self.query_cache.get(key)
+        if results is None:
+            results = self._nearest(query, k)
+            reach = None  # with less than k results, any added Entry becomes one of them
+            if len(results) == k:
+                # Only Entries at most as far as the k-th one can change the results
+                radius = distance_between(bounds_of(results[-1].mbr), query_bounds)
+                reach = (query_bounds[0] - radius, query_bounds[1] - radius,
+                         query_bounds[2] + radius, query_bounds[3] + radius)
+            self.query_cache.put(key, reach, results)
+        return results
+
+    def _nearest(self, query, k: int) -> [Entry]:
+        # islice stops right after the k-th Entry, without expanding the nodes the next one would need
+        return list(islice(self.iter_nearest(query), k))
+
+    def iter_nearest(self, query):
+        """
+        Lazily yields every Entry in increasing distance from the given Point or Rectangle.
+            Nodes are kept in a priority queue keyed on their MBR's distance to the query,
+            so a node is only expanded once it is closer than every Entry yielded after it
+        """
+        if self.root is None:
+            return
+
+        if isinstance(query, Point):
+            distance_to = lambda rectangle: rectangle.distance_to_point(query)
+        else:
+            distance_to = query.distance_between
+
+        statistics = self.statistics
+        tiebreaker = count()  # keeps the heap from ever comparing two nodes/entries
+        queue = [(distance_to(self.root.mbr), next(tiebreaker), self.root)]
+        while queue:
+            _, _, item = heappop(queue)
+            if not isinstance(item, RTree.RTreeNode):
+                yield item
+                continue
+            if statistics is not None:
+                statistics.visit(item, item.item_count())
+            if item.is_leaf():
+                for distance, entry in item.entry_distances(query):
+                    heappush(queue, (distance, next(tiebreaker), entry))
+            else:
+                for child in item.children:
+                    heappush(queue, (distance_to(child.mbr), next(tiebreaker), child))
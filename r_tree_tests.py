@@ -1,13 +1,54 @@
+import random
 import unittest
 
+from bounds import bounds_of
+from entry_fixtures import grid_entries
+from packing import hilbert_pack
 from r_tree import RTree, Entry
+from split_strategies import LinearSplit, QuadraticSplit, RStarSplit
 from rectangle import Rectangle, Point
 
 RTreeNode = RTree.RTreeNode
-POINT_OFFSET = Point.MOVE_DISTANCE
 
 
 class RTreeTests(unittest.TestCase):
+    def assert_valid_tree(self, r_tree: RTree, entries: [Entry]) -> int:
+        """
+        Asserts that the tree holds exactly the given entries, that all of its leaves are on the same level,
+            that every node's MBR bounds its items and that every node except the root is filled between the orders
+        :return: The height of the tree
+        """
+        leaf_depths = set()
+        found_entries = []
+
+        def walk(node: RTreeNode, depth: int):
+            if node is not r_tree.root:
+                self.assertGreaterEqual(node.item_count(), r_tree.minimum_order)
+            self.assertLessEqual(node.item_count(), r_tree.maximum_order)
+            if node.is_leaf():
+                leaf_depths.add(depth)
+                found_entries.extend(node.entries)
+                for entry in node.entries:
+                    self.assertTrue(node.mbr.is_covering(entry.mbr))
+                return
+            self.assertEqual(node.entries, [])
+            for child in node.children:
+                self.assertTrue(node.mbr.is_covering(child.mbr))
+                walk(child, depth + 1)
+
+        walk(r_tree.root, 0)
+        self.assertEqual(len(leaf_depths), 1)
+        self.assertCountEqual(found_entries, entries)
+        return leaf_depths.pop()
+
+    @staticmethod
+    def iter_nodes(root: RTreeNode):
+        nodes = [root]
+        while nodes:
+            node = nodes.pop()
+            yield node
+            nodes.extend(node.children)
+
     def test_add_without_root_should_add_root(self):
         entry_bounds = Rectangle(Point(10, 10), Point(20, 0))
         entry = Entry(name='Tank', bounds=entry_bounds)
@@ -16,19 +57,20 @@ class RTreeTests(unittest.TestCase):
 
         self.assertIsNotNone(r_tree.root)
         self.assertIsInstance(r_tree.root, RTree.RTreeNode)
-        self.assertEqual(r_tree.root.mbr, Rectangle.containing(entry_bounds))
+        self.assertEqual(r_tree.root.mbr, entry_bounds)
+        self.assertIsNot(r_tree.root.mbr, entry_bounds)
         self.assertEqual(len(r_tree.root.entries), 1)
         self.assertEqual(r_tree.root.entries[0], entry)
 
     def test_add_bigger_mbr_entry_expands_root(self):
         r_tree = RTree(2, 4)
         s_entry = Entry('SMALL_MAN', bounds=Rectangle(Point(52, 43), Point(68, 22)))
-        expected_root_mbr = Rectangle(Point(52 - POINT_OFFSET, 43 + POINT_OFFSET), Point(68 + POINT_OFFSET, 22 - POINT_OFFSET))
+        expected_root_mbr = Rectangle(Point(52, 43), Point(68, 22))
         r_tree.add(s_entry)
         self.assertEqual(r_tree.root.mbr, expected_root_mbr)
 
         # Add a bigger entry
-        expected_root_mbr = Rectangle(Point(20 - POINT_OFFSET, 45 + POINT_OFFSET), Point(70 + POINT_OFFSET, 20 - POINT_OFFSET))
+        expected_root_mbr = Rectangle(Point(20, 45), Point(70, 20))
         b_entry = Entry('BIG_MAN', Rectangle(Point(20, 45), Point(70, 20)))
         r_tree.add(b_entry)
 
@@ -93,7 +135,7 @@ class RTreeTests(unittest.TestCase):
         |                                         --------------------------------------------------------- |
         ____________________________________________________________________________________________________|
 
-       Both nodes should be 1 point bigger than the nodes
+       Both nodes' MBRs should exactly cover their entries
         """
         root = RTreeNode(2, 4, Rectangle(Point(20, 45), Point(70, 20)))
         entry_a = Entry('A', bounds=Rectangle(Point(22, 40), Point(30, 30)))
@@ -102,10 +144,8 @@ class RTreeTests(unittest.TestCase):
         entry_d = Entry('D', bounds=Rectangle(Point(52, 43), Point(68, 22)))
         root.entries = [entry_a, entry_b, entry_c, entry_d]
 
-        expected_node_a_mbr = Rectangle(Point(22 - POINT_OFFSET, 40 + POINT_OFFSET),
-                                        Point(40 + POINT_OFFSET, 25 - POINT_OFFSET))
-        expected_node_b_mbr = Rectangle(Point(44 - POINT_OFFSET, 43 + POINT_OFFSET),
-                                        Point(68 + POINT_OFFSET, 22 - POINT_OFFSET))
+        expected_node_a_mbr = Rectangle(Point(22, 40), Point(40, 25))
+        expected_node_b_mbr = Rectangle(Point(44, 43), Point(68, 22))
 
         node_a, node_b = root.split_leaf()
 
@@ -191,6 +231,624 @@ class RTreeTests(unittest.TestCase):
         min_expansion_node = RTreeNode.find_min_expansion_node([rtn_a, rtn_b, rtn_c, rtn_d], entry_e)
         self.assertEqual(min_expansion_node, rtn_d)
 
+    def test_find_min_expansion_node_breaks_ties_by_smallest_area(self):
+        """
+        The Entry lies inside both nodes, so neither needs to expand - the smaller one should be chosen
+        """
+        rtn_big = RTreeNode(2, 4, mbr=Rectangle(Point(0, 100), Point(100, 0)))
+        rtn_small = RTreeNode(2, 4, mbr=Rectangle(Point(10, 40), Point(40, 10)))
+        entry_e = Entry('E', bounds=Rectangle(Point(20, 30), Point(30, 20)))
+
+        min_expansion_node = RTreeNode.find_min_expansion_node([rtn_big, rtn_small], entry_e)
+        self.assertEqual(min_expansion_node, rtn_small)
+
+    def test_find_min_expansion_node_breaks_ties_by_fewest_items(self):
+        rtn_full = RTreeNode(2, 4, mbr=Rectangle(Point(10, 40), Point(40, 10)))
+        rtn_full.entries = [Entry(str(idx), bounds=Rectangle(Point(11, 39), Point(12, 38))) for idx in range(3)]
+        rtn_empty = RTreeNode(2, 4, mbr=Rectangle(Point(10, 40), Point(40, 10)))
+        entry_e = Entry('E', bounds=Rectangle(Point(20, 30), Point(30, 20)))
+
+        min_expansion_node = RTreeNode.find_min_expansion_node([rtn_full, rtn_empty], entry_e)
+        self.assertIs(min_expansion_node, rtn_empty)
+
+    def test_add_splits_root_into_two_children_when_it_overflows(self):
+        r_tree = RTree(2, 4)
+        entries = [Entry(str(idx), bounds=Rectangle(Point(idx * 10, 10), Point(idx * 10 + 5, 0))) for idx in range(5)]
+        for entry in entries:
+            r_tree.add(entry)
+
+        self.assertEqual(len(r_tree.root.children), 2)
+        self.assertEqual(r_tree.root.entries, [])
+        self.assertCountEqual([entry for child in r_tree.root.children for entry in child.entries], entries)
+        for child in r_tree.root.children:
+            self.assertTrue(child.is_leaf())
+            self.assertTrue(r_tree.root.mbr.is_covering(child.mbr))
+
+    def test_add_grows_a_balanced_tree(self):
+        r_tree = RTree(2, 4)
+        entries = grid_entries(10, 10)
+        for entry in entries:
+            r_tree.add(entry)
+
+        height = self.assert_valid_tree(r_tree, entries)
+        self.assertGreater(height, 1)
+
+    def test_search_returns_entries_intersecting_window(self):
+        r_tree = RTree(2, 4)
+        entries = grid_entries(10, 10)
+        for entry in entries:
+            r_tree.add(entry)
+        window = Rectangle(Point(12, 38), Point(33, 18))
+
+        expected = [entry for entry in entries if entry.mbr.is_intersecting(window)]
+        self.assertEqual(len(expected), 6)
+        self.assertCountEqual(r_tree.search(window), expected)
+
+    def test_search_returns_nothing_outside_tree(self):
+        r_tree = RTree(2, 4)
+        self.assertEqual(r_tree.search(Rectangle(Point(0, 10), Point(10, 0))), [])
+
+        r_tree.add(Entry('A', bounds=Rectangle(Point(0, 10), Point(10, 0))))
+        self.assertEqual(r_tree.search(Rectangle(Point(50, 60), Point(60, 50))), [])
+
+    def test_iter_search_yields_search_results(self):
+        r_tree = RTree(2, 4)
+        self.assertEqual(list(r_tree.iter_search(Rectangle(Point(0, 10), Point(10, 0)))), [])
+
+        r_tree.insert_many(grid_entries(10, 10))
+        window = Rectangle(Point(12, 38), Point(33, 18))
+        self.assertCountEqual(list(r_tree.iter_search(window)), r_tree.search(window))
+
+    def test_contained_in_returns_entries_inside_window(self):
+        r_tree = RTree(2, 4)
+        self.assertEqual(r_tree.contained_in(Rectangle(Point(0, 10), Point(10, 0))), [])
+
+        entries = grid_entries(10, 10)
+        r_tree.insert_many(entries)
+        # Its edges touch the 10-15, 20-25 and 30-35 squares, and cut through the 40-45 ones
+        window = Rectangle(Point(10, 42), Point(42, 10))
+
+        expected = [entry for entry in entries if entry.mbr.is_covered_by(window)]
+        self.assertEqual(len(expected), 9)
+        self.assertCountEqual(r_tree.contained_in(window), expected)
+        self.assertCountEqual(r_tree.contained_in(Rectangle(Point(-1, 100), Point(100, -1))), entries)
+
+    def test_contained_in_takes_covered_subtrees_whole(self):
+        r_tree = RTree(2, 4, collect_statistics=True)
+        r_tree.insert_many(grid_entries(20, 20))
+
+        r_tree.contained_in(Rectangle(Point(-1, 200), Point(200, -1)))
+
+        self.assertEqual(r_tree.statistics.nodes_visited, 1)
+        self.assertEqual(r_tree.statistics.entries_tested, 0)
+
+    def test_containing_returns_entries_covering_query(self):
+        r_tree = RTree(2, 4)
+        entries = [Entry(f'zone-{size}', bounds=Rectangle(Point(50 - size, 50 + size), Point(50 + size, 50 - size)))
+                   for size in range(1, 40)] + grid_entries(10, 10)
+        r_tree.insert_many(entries)
+
+        for query in (Point(50, 50), Point(10, 15), Point(57.5, 20), Rectangle(Point(40, 60), Point(55, 45))):
+            query_rect = Rectangle(query, query) if isinstance(query, Point) else query
+            expected = [entry for entry in entries if entry.mbr.is_covering(query_rect)]
+            self.assertCountEqual(r_tree.containing(query), expected)
+        self.assertEqual(len(r_tree.containing(Point(50, 50))), 40)  # every zone and the corner of the 5-5 square
+        self.assertEqual(r_tree.containing(Point(500, 500)), [])
+
+    def test_containing_only_descends_into_covering_nodes(self):
+        r_tree = RTree(2, 4, collect_statistics=True)
+        r_tree.insert_many(grid_entries(20, 20))
+
+        # Spans the 4-6 and 5-6 squares, so no Entry covers it
+        query = Rectangle(Point(41, 64), Point(54, 61))
+        covering_nodes = [node for node in [r_tree.root, *RTree._nodes_below(r_tree.root)]
+                          if node.mbr.is_covering(query)]
+
+        self.assertEqual(r_tree.containing(query), [])
+        self.assertEqual(r_tree.statistics.nodes_visited, len(covering_nodes))
+        r_tree.statistics.reset()
+        self.assertEqual(len(r_tree.search(query)), 2)
+        self.assertGreater(r_tree.statistics.nodes_visited, len(covering_nodes))
+
+    def test_containment_queries_are_cached_until_changed(self):
+        r_tree = RTree(2, 4, cache_size=8)
+        r_tree.insert_many(grid_entries(10, 10))
+        window = Rectangle(Point(10, 42), Point(42, 10))
+        self.assertEqual(len(r_tree.contained_in(window)), 9)
+        self.assertEqual(len(r_tree.containing(Point(12, 12))), 1)
+        self.assertEqual(len(r_tree.contained_in(window)), 9)
+        self.assertEqual(r_tree.query_cache.hits, 1)
+
+        r_tree.add(Entry('new', bounds=Rectangle(Point(11, 14), Point(14, 11))))
+
+        self.assertEqual(len(r_tree.contained_in(window)), 10)
+        self.assertEqual(len(r_tree.containing(Point(12, 12))), 2)
+
+    def test_nearest_stops_expanding_after_the_kth_entry(self):
+        r_tree = RTree(2, 4, collect_statistics=True)
+        r_tree.insert_many(grid_entries(10, 10))
+        query = Point(47, 63)
+
+        for k in (1, 5, 20):
+            r_tree.statistics.reset()
+            r_tree.nearest(query, k)
+            nodes_visited = r_tree.statistics.nodes_visited
+            r_tree.statistics.reset()
+            iterator = r_tree.iter_nearest(query)
+            for _ in range(k):
+                next(iterator)
+            self.assertEqual(nodes_visited, r_tree.statistics.nodes_visited)
+
+    def test_nearest_returns_k_closest_entries_in_order(self):
+        r_tree = RTree(2, 4)
+        entries = grid_entries(10, 10)
+        for entry in entries:
+            r_tree.add(entry)
+        query = Point(47, 63)
+
+        expected = sorted(entries, key=lambda entry: entry.mbr.distance_to_point(query))[:5]
+        nearest = r_tree.nearest(query, k=5)
+
+        self.assertEqual([entry.mbr.distance_to_point(query) for entry in nearest],
+                         [entry.mbr.distance_to_point(query) for entry in expected])
+        self.assertEqual(nearest[0].name, '4-6')
+
+    def test_iter_nearest_yields_every_entry_by_distance_to_rectangle(self):
+        r_tree = RTree(2, 4)
+        entries = [Entry(str(idx), bounds=Rectangle(Point(idx * 7, (idx % 5) * 9 + 4), Point(idx * 7 + 3, (idx % 5) * 9)))
+                   for idx in range(30)]
+        for entry in entries:
+            r_tree.add(entry)
+        query = Rectangle(Point(100, 30), Point(110, 20))
+
+        distances = [entry.mbr.distance_between(query) for entry in r_tree.iter_nearest(query)]
+
+        self.assertEqual(len(distances), len(entries))
+        self.assertEqual(distances, sorted(distances))
+
+    def test_nearest_on_empty_tree_returns_nothing(self):
+        self.assertEqual(RTree(2, 4).nearest(Point(0, 0), k=3), [])
+
+    def test_mbrs_exactly_cover_float_coordinates(self):
+        # Geographic coordinates, where any fixed padding would dwarf the entries
+        entries = [Entry(f'{x}-{y}', bounds=Rectangle(Point(13.4 + x * 0.001, 52.5 + y * 0.001 + 0.0002),
+                                                      Point(13.4 + x * 0.001 + 0.0002, 52.5 + y * 0.001)))
+                   for x in range(10) for y in range(10)]
+        r_tree = RTree(2, 4)
+        r_tree.insert_many(entries)
+        self.assert_valid_tree(r_tree, entries)
+
+        for node in self.iter_nodes(r_tree.root):
+            item_bounds = [bounds_of(item.mbr) for item in (node.entries if node.is_leaf() else node.children)]
+            self.assertEqual(bounds_of(node.mbr), (min(bounds[0] for bounds in item_bounds),
+                                                   min(bounds[1] for bounds in item_bounds),
+                                                   max(bounds[2] for bounds in item_bounds),
+                                                   max(bounds[3] for bounds in item_bounds)))
+        self.assertEqual(r_tree.search(Rectangle(Point(13.4003, 52.5009), Point(13.4009, 52.5003))), [])
+        self.assertEqual(r_tree.search(Rectangle(Point(13.4019, 52.5021), Point(13.4021, 52.5019))),
+                         [entries[2 * 10 + 2]])
+
+    def test_bulk_load_packs_full_balanced_tree(self):
+        entries = grid_entries(13, 11)
+        r_tree = RTree.bulk_load(entries, 2, 4)
+
+        self.assert_valid_tree(r_tree, entries)
+
+        window = Rectangle(Point(33, 78), Point(71, 41))
+        self.assertCountEqual(r_tree.search(window), [entry for entry in entries if entry.mbr.is_intersecting(window)])
+
+    def test_bulk_load_without_entries_leaves_tree_empty(self):
+        r_tree = RTree.bulk_load([], 2, 4)
+        self.assertIsNone(r_tree.root)
+
+    def test_bulk_load_with_hilbert_packing(self):
+        entries = grid_entries(13, 11)
+        r_tree = RTree.bulk_load(entries, 2, 4, packer=hilbert_pack)
+
+        window = Rectangle(Point(33, 78), Point(71, 41))
+        self.assertCountEqual(r_tree.search(window), [entry for entry in entries if entry.mbr.is_intersecting(window)])
+        self.assertCountEqual(r_tree.nearest(Point(-100, -100), k=len(entries)), entries)
+
+    def test_insert_many_adds_every_entry(self):
+        r_tree = RTree(2, 4)
+        first_batch = [Entry(f'{x}-{y}', bounds=Rectangle(Point(x * 10, y * 10 + 5), Point(x * 10 + 5, y * 10)))
+                       for x in range(5) for y in range(5)]
+        second_batch = [Entry(f'{x}-{y}', bounds=Rectangle(Point(x * 10, y * 10 + 5), Point(x * 10 + 5, y * 10)))
+                        for x in range(5, 8) for y in range(5)]
+        r_tree.insert_many(first_batch)
+        r_tree.insert_many(second_batch)
+
+        window = Rectangle(Point(-10, 100), Point(100, -10))
+        self.assertCountEqual(r_tree.search(window), first_batch + second_batch)
+
+
+    def test_add_with_every_split_strategy(self):
+        entries = [Entry(str(idx), bounds=Rectangle(Point((idx * 37) % 101, (idx * 53) % 97 + 3),
+                                                    Point((idx * 37) % 101 + 2, (idx * 53) % 97)))
+                   for idx in range(150)]
+        window = Rectangle(Point(20, 70), Point(55, 30))
+        for split_strategy in (LinearSplit, QuadraticSplit, RStarSplit):
+            r_tree = RTree(2, 6, split_strategy=split_strategy)
+            for entry in entries:
+                r_tree.add(entry)
+
+            self.assert_valid_tree(r_tree, entries)
+            self.assertCountEqual(r_tree.search(window),
+                                  [entry for entry in entries if entry.mbr.is_intersecting(window)])
+
+    def test_r_star_reinsertion_keeps_mbrs_tight(self):
+        r_tree = RTree(2, 4, split_strategy=RStarSplit)
+        for entry in grid_entries(20, 20):
+            r_tree.add(entry)
+
+        for node in self.iter_nodes(r_tree.root):
+            items = node.entries if node.is_leaf() else node.children
+            union = Rectangle.covering(items[0].mbr)
+            for item in items[1:]:
+                union.expand_to_cover(item.mbr)
+            self.assertEqual(node.mbr, union)
+
+    def test_split_nodes_keep_the_split_strategy(self):
+        r_tree = RTree(2, 4, split_strategy=LinearSplit)
+        for entry in grid_entries(5, 5):
+            r_tree.add(entry)
+
+        self.assertIs(r_tree.root.split_strategy, LinearSplit)
+        self.assertTrue(all(child.split_strategy is LinearSplit for child in r_tree.root.children))
+
+
+    def test_delete_removes_entry_and_keeps_tree_valid(self):
+        entries = grid_entries(10, 10)
+        r_tree = RTree(2, 4)
+        for entry in entries:
+            r_tree.add(entry)
+
+        for entry in entries[::3]:
+            self.assertTrue(r_tree.delete(entry))
+        remaining = [entry for idx, entry in enumerate(entries) if idx % 3 != 0]
+
+        self.assert_valid_tree(r_tree, remaining)
+        window = Rectangle(Point(12, 78), Point(63, 21))
+        self.assertCountEqual(r_tree.search(window),
+                              [entry for entry in remaining if entry.mbr.is_intersecting(window)])
+
+    def test_delete_shrinks_mbrs(self):
+        r_tree = RTree(2, 4)
+        entries = grid_entries(1, 3)
+        for entry in entries:
+            r_tree.add(entry)
+
+        r_tree.delete(entries[2])
+
+        self.assertEqual(r_tree.root.mbr, Rectangle(Point(0, 15), Point(5, 0)))
+
+    def test_delete_collapses_root(self):
+        entries = grid_entries(10, 10)
+        r_tree = RTree(2, 4)
+        for entry in entries:
+            r_tree.add(entry)
+
+        for entry in entries[:-1]:
+            r_tree.delete(entry)
+
+        self.assertTrue(r_tree.root.is_leaf())
+        self.assertEqual(r_tree.root.entries, entries[-1:])
+
+        r_tree.delete(entries[-1])
+        self.assertIsNone(r_tree.root)
+
+    def test_delete_unknown_entry_returns_false(self):
+        r_tree = RTree(2, 4)
+        self.assertFalse(r_tree.delete(Entry('A', bounds=Rectangle(Point(0, 10), Point(10, 0)))))
+
+        r_tree.add(Entry('A', bounds=Rectangle(Point(0, 10), Point(10, 0))))
+        self.assertFalse(r_tree.delete(Entry('B', bounds=Rectangle(Point(0, 10), Point(10, 0)))))
+
+
+    def test_locator_follows_entries_through_splits_and_deletes(self):
+        entries = grid_entries(10, 10)
+        for split_strategy in (QuadraticSplit, RStarSplit):
+            r_tree = RTree(2, 4, split_strategy=split_strategy, locate_entries=True)
+            for entry in entries:
+                r_tree.add(entry)
+            for entry in entries[::4]:
+                r_tree.delete(entry)
+
+            leaves = [node for node in self.iter_nodes(r_tree.root) if node.is_leaf()]
+            expected_locator = {entry.name: leaf for leaf in leaves for entry in leaf.entries}
+            self.assertEqual(r_tree.locator, expected_locator)
+            self.assertEqual(len(r_tree.locator), len(entries) - len(entries[::4]))
+
+    def test_get_and_remove_by_name(self):
+        entries = grid_entries(6, 6)
+        for locate_entries in (True, False):
+            r_tree = RTree(2, 4, locate_entries=locate_entries)
+            r_tree.insert_many(entries)
+
+            self.assertIs(r_tree.get('3-4'), entries[3 * 6 + 4])
+            self.assertIn('3-4', r_tree)
+            self.assertTrue(r_tree.remove('3-4'))
+            self.assertIsNone(r_tree.get('3-4'))
+            self.assertNotIn('3-4', r_tree)
+            self.assertFalse(r_tree.remove('3-4'))
+            self.assert_valid_tree(r_tree, [entry for entry in entries if entry.name != '3-4'])
+
+    def test_located_entries_are_removed_through_their_leaf(self):
+        # Entries sharing the same bounds end up in many overlapping leaves
+        entries = [Entry(f'same-{idx}', bounds=Rectangle(Point(0, 10), Point(10, 0))) for idx in range(40)]
+        r_tree = RTree(2, 4, locate_entries=True)
+        r_tree.insert_many(entries)
+
+        for entry in entries[::3]:
+            path = r_tree._locate_path(entry)
+            self.assertIs(path[0], r_tree.root)
+            self.assertIs(path[-1], r_tree.locator[entry.name])
+            self.assertTrue(r_tree.remove(entry.name))
+        self.assert_valid_tree(r_tree, [entry for entry in entries if entry not in entries[::3]])
+
+    def test_bulk_load_locates_entries(self):
+        entries = grid_entries(7, 7)
+        r_tree = RTree.bulk_load(entries, 2, 4, locate_entries=True)
+
+        for entry in entries:
+            self.assertIn(entry, r_tree.locator[entry.name].entries)
+
+    def test_entry_hash_is_based_on_name_and_bounds(self):
+        entry = Entry('A', bounds=Rectangle(Point(0, 10), Point(10, 0)))
+        same_entry = Entry('A', bounds=Rectangle(Point(0, 10), Point(10, 0)))
+
+        self.assertEqual(hash(entry), hash(same_entry))
+        self.assertEqual(len({entry, same_entry}), 1)
+
+
+    def test_move_inside_leaf_updates_entry_in_place(self):
+        entries = grid_entries(6, 6)
+        r_tree = RTree(2, 4, locate_entries=True)
+        r_tree.insert_many(entries)
+        entry = entries[0]
+        leaf = r_tree.locator[entry.name]
+        leaf_mbr = leaf.mbr
+
+        self.assertTrue(r_tree.move(entry, Rectangle(Point(1, 5), Point(4, 1))))
+
+        self.assertIs(r_tree.locator[entry.name], leaf)
+        self.assertEqual(entry.mbr, Rectangle(Point(1, 5), Point(4, 1)))
+        self.assert_valid_tree(r_tree, entries)
+
+    def test_move_inside_leaf_away_from_its_edges_keeps_leaf_mbr(self):
+        entries = [Entry('A', bounds=Rectangle(Point(0, 2), Point(2, 0))),
+                   Entry('B', bounds=Rectangle(Point(8, 10), Point(10, 8))),
+                   Entry('C', bounds=Rectangle(Point(4, 6), Point(6, 4)))]
+        r_tree = RTree(2, 4)
+        r_tree.insert_many(entries)
+        leaf_mbr = r_tree.root.mbr
+
+        self.assertTrue(r_tree.move(entries[2], Rectangle(Point(4.5, 5.5), Point(5.5, 4.5))))
+
+        self.assertIs(r_tree.root.mbr, leaf_mbr)
+        self.assertEqual(leaf_mbr, Rectangle(Point(0, 10), Point(10, 0)))
+        self.assert_valid_tree(r_tree, entries)
+
+    def test_moves_inside_leaves_keep_mbrs_tight(self):
+        entries = grid_entries(8, 8)
+        r_tree = RTree(2, 4, locate_entries=True)
+        r_tree.insert_many(entries)
+
+        # Shrink every Entry towards its center, most of them touch their leaf's edges
+        for entry in entries:
+            top_left, bottom_right = entry.mbr.top_left, entry.mbr.bottom_right
+            self.assertTrue(r_tree.move(entry, Rectangle(Point(top_left.x + 2, top_left.y - 2),
+                                                         Point(bottom_right.x - 2, bottom_right.y + 2))))
+
+        self.assert_valid_tree(r_tree, entries)
+        for node in self.iter_nodes(r_tree.root):
+            items = node.entries if node.is_leaf() else node.children
+            expected_mbr = Rectangle.covering(items[0].mbr)
+            for item in items:
+                expected_mbr.expand_to_cover(item.mbr)
+            self.assertEqual(node.mbr, expected_mbr)
+
+    def test_move_within_slack_expands_leaf_and_ancestors(self):
+        entries = grid_entries(6, 6)
+        r_tree = RTree(2, 4)
+        r_tree.insert_many(entries)
+        entry = entries[0]
+        leaf = r_tree._find_leaf_path(r_tree.root, entry)[-1]
+
+        self.assertTrue(r_tree.move(entry, Rectangle(Point(-3, 5), Point(2, 0)), slack=5))
+
+        self.assertIn(entry, leaf.entries)
+        self.assertEqual(entry.mbr, Rectangle(Point(-3, 5), Point(2, 0)))
+        self.assert_valid_tree(r_tree, entries)
+
+    def test_move_far_reinserts_entry(self):
+        entries = grid_entries(6, 6)
+        for locate_entries in (True, False):
+            r_tree = RTree(2, 4, locate_entries=locate_entries)
+            r_tree.insert_many(entries)
+            entry = next(entry for entry in entries if entry.name == '0-0')
+
+            self.assertTrue(r_tree.move(entry, Rectangle(Point(200, 205), Point(205, 200))))
+            self.assertEqual(entry.mbr, Rectangle(Point(200, 205), Point(205, 200)))
+            self.assert_valid_tree(r_tree, entries)
+            self.assertEqual(r_tree.search(Rectangle(Point(190, 210), Point(210, 190))), [entry])
+
+            # Move it back
+            self.assertTrue(r_tree.move(entry, Rectangle(Point(0, 5), Point(5, 0))))
+            self.assert_valid_tree(r_tree, entries)
+
+    def test_move_unknown_entry_returns_false(self):
+        r_tree = RTree(2, 4)
+        r_tree.add(Entry('A', bounds=Rectangle(Point(0, 10), Point(10, 0))))
+
+        self.assertFalse(r_tree.move(Entry('B', bounds=Rectangle(Point(0, 10), Point(10, 0))),
+                                     Rectangle(Point(1, 9), Point(9, 1))))
+
+
+    def test_join_yields_intersecting_pairs(self):
+        parcels = grid_entries(12, 12)
+        zones = [Entry(f'zone-{idx}', bounds=Rectangle(Point(idx * 23, idx * 17 + 12), Point(idx * 23 + 9, idx * 17)))
+                 for idx in range(8)]
+        parcel_tree = RTree(2, 4)
+        parcel_tree.insert_many(parcels)
+        zone_tree = RTree.bulk_load(zones, 2, 3)
+
+        pairs = list(parcel_tree.join(zone_tree))
+
+        expected = [(parcel, zone) for parcel in parcels for zone in zones if parcel.mbr.is_intersecting(zone.mbr)]
+        self.assertGreater(len(expected), 0)
+        self.assertCountEqual(pairs, expected)
+
+    def test_join_with_containment_predicates(self):
+        small = [Entry(f's-{idx}', bounds=Rectangle(Point(idx * 10 + 1, 4), Point(idx * 10 + 3, 1))) for idx in range(20)]
+        big = [Entry(f'b-{idx}', bounds=Rectangle(Point(idx * 40, 5), Point(idx * 40 + 25, 0))) for idx in range(5)]
+        small_tree, big_tree = RTree.bulk_load(small, 2, 4), RTree.bulk_load(big, 2, 4)
+
+        expected = [(entry_b, entry_s) for entry_b in big for entry_s in small if entry_b.mbr.is_covering(entry_s.mbr)]
+        self.assertGreater(len(expected), 0)
+        self.assertCountEqual(list(big_tree.join(small_tree, predicate='contains')), expected)
+        for entry_b, entry_s in expected:
+            self.assertIn(entry_s, small_tree.contained_in(entry_b.mbr))
+        self.assertCountEqual(list(small_tree.join(big_tree, predicate='within')),
+                              [(entry_s, entry_b) for entry_b, entry_s in expected])
+
+    def test_join_containment_includes_shared_edges(self):
+        zone = Entry('zone', bounds=Rectangle(Point(0, 10), Point(10, 0)))
+        parcels = [Entry('corner', bounds=Rectangle(Point(0, 5), Point(5, 0))),
+                   Entry('same', bounds=Rectangle(Point(0, 10), Point(10, 0))),
+                   Entry('outside', bounds=Rectangle(Point(8, 5), Point(12, 0)))]
+        zone_tree, parcel_tree = RTree.bulk_load([zone], 2, 4), RTree.bulk_load(parcels, 2, 4)
+
+        self.assertCountEqual(list(zone_tree.join(parcel_tree, predicate='contains')),
+                              [(zone, parcels[0]), (zone, parcels[1])])
+        self.assertCountEqual(list(parcel_tree.join(zone_tree, predicate='within')),
+                              [(parcels[0], zone), (parcels[1], zone)])
+        self.assertCountEqual(parcel_tree.contained_in(zone.mbr), parcels[:2])
+
+    def test_join_with_empty_tree_or_unknown_predicate(self):
+        r_tree = RTree.bulk_load(grid_entries(3, 3), 2, 4)
+        self.assertEqual(list(r_tree.join(RTree(2, 4))), [])
+        with self.assertRaises(ValueError):
+            list(r_tree.join(r_tree, predicate='touches'))
+
+
+    def test_analyze_reports_levels(self):
+        self.assertEqual(RTree(2, 4).analyze()['nodes'], 0)
+
+        r_tree = RTree.bulk_load(grid_entries(8, 8), 2, 4)
+        report = r_tree.analyze()
+        nodes = list(self.iter_nodes(r_tree.root))
+        self.assertEqual(report['height'], r_tree.root.height())
+        self.assertEqual(report['entries'], 64)
+        self.assertEqual(report['nodes'], len(nodes))
+        self.assertEqual(len(report['levels']), report['height'] + 1)
+        self.assertEqual(report['levels'][0]['nodes'], 16)
+        self.assertEqual(report['levels'][0]['fill'], 1)
+        self.assertEqual(report['underfull'], 0)
+        self.assertEqual(report['area'], sum(node.mbr.area for node in nodes))
+        self.assertGreaterEqual(report['dead_space'], 0)
+        self.assertEqual(report['overlap'], sum(level['overlap'] for level in report['levels']))
+
+    def test_analyze_counts_sibling_overlap_and_underfull_nodes(self):
+        r_tree = RTree(2, 4)
+        node_of = r_tree._new_node(None).new_node_of
+        leaves = [node_of([Entry('a', bounds=Rectangle(Point(0, 10), Point(10, 0)))], leaf=True),
+                  node_of([Entry('b', bounds=Rectangle(Point(5, 10), Point(15, 0)))], leaf=True)]
+        r_tree.root = node_of(leaves, leaf=False)
+
+        report = r_tree.analyze()
+        self.assertEqual(report['underfull'], 2)
+        self.assertEqual(report['levels'][0]['overlap'], 5 * 10)
+        self.assertEqual(report['levels'][1]['overlap'], 0)
+        self.assertEqual(report['levels'][0]['dead_space'], 0)
+        # A lower bound - the overlapping leaves' areas add up to more than the root's
+        self.assertEqual(report['levels'][1]['dead_space'], 0)
+
+    def degraded_tree(self, cluster_count: int = 1, **kwargs) -> (RTree, [Entry]):
+        """
+        :param cluster_count: How many far apart 1000x1000 squares (up to 4) to spread the entries over
+        :return: A tree built by adding randomly placed entries one by one and deleting half of them,
+            along with the entries left in it
+        """
+        generator = random.Random(0)
+        entries = []
+        for idx in range(600):
+            cluster = idx // 2 % cluster_count  # so that deleting every other entry leaves half of every cluster
+            offset_x, offset_y = cluster % 2 * 10_000, cluster // 2 * 10_000
+            x, y = offset_x + generator.uniform(0, 1000), offset_y + generator.uniform(0, 1000)
+            entries.append(Entry(str(idx), bounds=Rectangle(Point(x, y + generator.uniform(1, 20)),
+                                                            Point(x + generator.uniform(1, 20), y))))
+        r_tree = RTree(2, 6, split_strategy=LinearSplit, **kwargs)
+        for entry in entries:
+            r_tree.add(entry)
+        for entry in entries[::2]:
+            r_tree.delete(entry)
+        return r_tree, entries[1::2]
+
+    def test_reorganize_repacks_overlapping_subtrees(self):
+        r_tree = RTree(2, 4, collect_statistics=True)
+        node_of = r_tree._new_node(None).new_node_of
+        row = [Entry(f'row-{x}', bounds=Rectangle(Point(x * 10, 5), Point(x * 10 + 5, 0))) for x in range(12)]
+        # Every leaf spans the whole row
+        interleaved = node_of([node_of(row[offset::3], leaf=True) for offset in range(3)], leaf=False)
+        far = grid_entries(3, 4)
+        for entry in far:
+            entry.mbr = Rectangle(Point(entry.mbr.top_left.x + 500, entry.mbr.top_left.y + 500),
+                                  Point(entry.mbr.bottom_right.x + 500, entry.mbr.bottom_right.y + 500))
+        packed = node_of([node_of(far[idx:idx + 4], leaf=True) for idx in range(0, 12, 4)], leaf=False)
+        r_tree.root = node_of([interleaved, packed], leaf=False)
+        window = Rectangle(Point(48, 4), Point(52, 1))
+
+        self.assertEqual(r_tree.search(window), [row[5]])
+        self.assertEqual(r_tree.statistics.nodes_visited, 5)
+        self.assertEqual(r_tree.reorganize(overlap_threshold=0.1), 1)
+        self.assert_valid_tree(r_tree, row + far)
+        self.assertIs(r_tree.root.children[0], interleaved)
+        self.assertEqual(r_tree.analyze()['levels'][0]['overlap'], 0)
+
+        r_tree.statistics.reset()
+        self.assertEqual(r_tree.search(window), [row[5]])
+        self.assertEqual(r_tree.statistics.nodes_visited, 3)
+
+    def test_reorganize_keeps_entries_and_locator(self):
+        # The clusters keep the root's children apart, so the overlapping subtrees inside them are repacked one by one
+        r_tree, entries = self.degraded_tree(cluster_count=4, locate_entries=True)
+        windows = [Rectangle(Point(x + offset, x + 50), Point(x + offset + 50, x))
+                   for x in range(0, 950, 10) for offset in (0, 10_000)]
+        results = [r_tree.search(window) for window in windows]
+
+        self.assertGreater(r_tree.reorganize(overlap_threshold=0.05), 1)
+        self.assert_valid_tree(r_tree, entries)
+        for window, window_results in zip(windows, results):
+            self.assertCountEqual(r_tree.search(window), window_results)
+        for entry in entries:
+            self.assertIn(entry, r_tree.locator[entry.name].entries)
+
+    def test_reorganize_never_repacks_root(self):
+        r_tree = RTree(2, 4)
+        node_of = r_tree._new_node(None).new_node_of
+        row = [Entry(f'row-{x}', bounds=Rectangle(Point(x * 10, 5), Point(x * 10 + 5, 0))) for x in range(24)]
+        # Both of the root's children, and every leaf below them, span the whole row
+        halves = [node_of([node_of(half[offset::3], leaf=True) for offset in range(3)], leaf=False)
+                  for half in (row[0::2], row[1::2])]
+        root = r_tree.root = node_of(halves, leaf=False)
+        root_overlap = r_tree.analyze()['levels'][1]['overlap']
+        self.assertGreater(root_overlap, 0)
+
+        self.assertEqual(r_tree.reorganize(overlap_threshold=0), 2)
+        self.assert_valid_tree(r_tree, row)
+        self.assertIs(r_tree.root, root)
+        self.assertEqual(r_tree.root.children, halves)
+        self.assertEqual(r_tree.analyze()['levels'][1]['overlap'], root_overlap)
+        self.assertEqual(r_tree.analyze()['levels'][0]['overlap'], 0)
+        self.assertEqual(r_tree.reorganize(overlap_threshold=0), 0)
+
+    def test_reorganize_limits_repacked_subtrees(self):
+        r_tree, entries = self.degraded_tree()
+        self.assertEqual(r_tree.reorganize(overlap_threshold=1_000_000), 0)
+        self.assertEqual(r_tree.reorganize(overlap_threshold=0.05, max_subtrees=1), 1)
+        self.assert_valid_tree(r_tree, entries)
+        self.assertEqual(RTree(2, 4).reorganize(), 0)
 
 if __name__ == '__main__':
     unittest.main()
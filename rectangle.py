@@ -1,4 +1,5 @@
 from copy import deepcopy
+from math import sqrt
 
 from point import Point
 
@@ -7,16 +8,38 @@ class Rectangle:
     class InvalidRectangleError(Exception):
         pass
 
+    __slots__ = ('top_left', 'bottom_right', 'height', 'width', 'area')
+
     def __init__(self, top_left: Point, bottom_right: Point):
         self._check_contraints(top_left, bottom_right)
-        self.resizer = RectangleResizer(self)
         self.top_left = top_left
         self.bottom_right = bottom_right
         self.height, self.width, self.area = self.calculate_area(top_left, bottom_right)
 
+    @classmethod
+    def of_point(cls, point: Point) -> 'Rectangle':
+        """
+        :return: A Rectangle of no width or height at the point, which is shared as both of its corners.
+            Skips the validation and area calculation, as such a rectangle is always valid
+        """
+        rectangle = cls.__new__(cls)
+        rectangle.top_left = rectangle.bottom_right = point
+        rectangle.height = rectangle.width = rectangle.area = 0
+        return rectangle
+
+    @property
+    def resizer(self) -> 'RectangleResizer':
+        """
+        The resizer is only needed when the rectangle gets expanded, so it is created on demand instead of being kept
+        """
+        return RectangleResizer(self)
+
     @classmethod
     def _check_contraints(cls, top_left: Point, bottom_right: Point):
-        if not top_left.is_left_of(bottom_right) or not top_left.is_above(bottom_right):
+        """
+        Rectangles are closed intervals, so a rectangle of no width or height (e.g a single point) is valid
+        """
+        if top_left.is_right_of(bottom_right) or top_left.is_below(bottom_right):
             raise cls.InvalidRectangleError("Rectangle is not valid!")
 
     def calculate_bottom_left(self) -> Point:
@@ -33,8 +56,15 @@ class Rectangle:
         """
         return Point(x=self.bottom_right.x, y=self.top_left.y)
 
+    def calculate_center(self) -> Point:
+        """
+        :return: This rectangle's Center Point
+            Note: This state is not kept in the class
+        """
+        return Point(x=(self.top_left.x + self.bottom_right.x) / 2, y=(self.top_left.y + self.bottom_right.y) / 2)
+
     @staticmethod
-    def calculate_area(top_left_point: Point, bottom_right_point: Point) -> (int, int, int):
+    def calculate_area(top_left_point: Point, bottom_right_point: Point) -> (float, float, float):
         """
         Calculates the height, width and area of a Rectangle,
             given its top left and bottom right points
@@ -56,6 +86,7 @@ class Rectangle:
         """
         Returns a new Rectangle object which can contain the given rectangle with MOVE_DISTANCE to spare
         e.g Rectangle.containing(Rect(10, 10, 20, 20)) => Rect(11, 11, 21, 21)
+            NOTE: The padding does not scale with the coordinates, see covering() for an exact fit
         """
         from point_mover import move_left_of, move_above, move_right_of, move_below
 
@@ -64,6 +95,15 @@ class Rectangle:
 
         return cls(top_left=top_left, bottom_right=bottom_right)
 
+    @classmethod
+    def covering(cls, other_rect: 'Rectangle'):
+        """
+        Returns a new Rectangle object with the same coordinates as the given rectangle - the tightest one covering it
+        e.g Rectangle.covering(Rect(10.5, 10.5, 20.25, 20.25)) => Rect(10.5, 10.5, 20.25, 20.25)
+        """
+        return cls(top_left=Point(other_rect.top_left.x, other_rect.top_left.y),
+                   bottom_right=Point(other_rect.bottom_right.x, other_rect.bottom_right.y))
+
     def is_intersecting(self, other_rect: 'Rectangle'):
         """
         :return: Boolean, indicating if both rectangles intersect/overlap
@@ -96,6 +136,22 @@ class Rectangle:
 
         return other_rect.is_bounding(self)
 
+    def is_covering(self, other_rect: 'Rectangle'):
+        """
+        :return: Boolean, indicating if the other rectangle lies inside this one, edges included
+            NOTE: unlike is_bounding, if Rectangle A == Rectangle B, A covers B and B covers A
+        """
+        return (self.top_left.x <= other_rect.top_left.x
+                and self.top_left.y >= other_rect.top_left.y
+                and self.bottom_right.x >= other_rect.bottom_right.x
+                and self.bottom_right.y <= other_rect.bottom_right.y)
+
+    def is_covered_by(self, other_rect: 'Rectangle'):
+        """
+        :return: Boolean, indicating if this rectangle lies inside the other one, edges included
+        """
+        return other_rect.is_covering(self)
+
     def expand_to(self, other_rectangle: 'Rectangle'):
         """
         Expands the Rectangle to accommodate the given rectangle.
@@ -104,44 +160,43 @@ class Rectangle:
         self.resizer.expand_to(other_rectangle)
         self.recalculate_area()
 
+    def expand_to_cover(self, other_rectangle: 'Rectangle'):
+        """
+        Expands the Rectangle just enough to cover the given rectangle, edges included.
+            Does nothing if it already covers it
+        """
+        self.resizer.expand_to_cover(other_rectangle)
+        self.recalculate_area()
+
     def distance_between(self, other_rect: 'Rectangle') -> float:
         """
         Returns the minimum distance between two rectangle's closest points
+            Note: This is never bigger than the distance between any two points of the rectangles,
+            which is what makes it usable as a lower bound when searching for nearest neighbours
         """
-        is_left = self.bottom_right.is_left_of(other_rect.top_left)
-        is_above = self.bottom_right.is_above(other_rect.top_left)
-        is_below = self.top_left.is_below(other_rect.bottom_right)
-        is_right = self.top_left.is_right_of(other_rect.bottom_right)
-
-        if self.is_intersecting(other_rect):
-            return 0
-        if is_left and is_above:
-            closest_points = [self.bottom_right, other_rect.top_left]
-        elif is_left and is_below:
-            closest_points = [self.calculate_top_right(), other_rect.calculate_bottom_left()]
-        elif is_right and is_above:
-            closest_points = [self.calculate_bottom_left(), other_rect.calculate_top_right()]
-        elif is_right and is_below:
-            closest_points = [self.top_left, other_rect.bottom_right]
-        elif is_right:
-            closest_points = [self.calculate_bottom_left(), other_rect.bottom_right, self.top_left, other_rect.calculate_top_right()]
-        elif is_left:
-            closest_points = [self.bottom_right, other_rect.calculate_bottom_left(), self.calculate_top_right(), other_rect.top_left]
-        elif is_above:
-            closest_points = [self.calculate_bottom_left(), other_rect.top_left, self.bottom_right, other_rect.calculate_top_right()]
-        elif is_below:
-            closest_points = [self.top_left, other_rect.calculate_bottom_left(), self.calculate_top_right(), other_rect.bottom_right]
-        else:
-            raise NotImplementedError()
-
-        pairs = [(i, closest_points[idx+1]) for idx, i in enumerate(closest_points) if idx % 2 == 0]
-        return min(point_a.distance_to(point_b) for (point_a, point_b) in pairs)
+        dx = max(0, other_rect.top_left.x - self.bottom_right.x, self.top_left.x - other_rect.bottom_right.x)
+        dy = max(0, other_rect.bottom_right.y - self.top_left.y, self.bottom_right.y - other_rect.top_left.y)
+
+        return sqrt(dx * dx + dy * dy)
+
+    def closest_point_to(self, point: Point) -> Point:
+        """
+        :return: The Point inside this rectangle (edges included) which is closest to the given point
+        """
+        return Point(x=min(max(point.x, self.top_left.x), self.bottom_right.x),
+                     y=min(max(point.y, self.bottom_right.y), self.top_left.y))
+
+    def distance_to_point(self, point: Point) -> float:
+        """
+        Returns the minimum distance between the given point and this rectangle, 0 if it lies inside
+        """
+        return point.distance_to(self.closest_point_to(point))
 
     def __eq__(self, other: 'Rectangle'):
         return self.bottom_right == other.bottom_right and self.top_left == other.top_left
 
     def __hash__(self):
-        return hash(f'{hash(self.bottom_right)}{hash(self.top_left)}')
+        return hash((self.top_left.x, self.top_left.y, self.bottom_right.x, self.bottom_right.y))
 
 
 class RectangleResizer:
@@ -151,6 +206,8 @@ class RectangleResizer:
     class ResizeError(Exception):
         pass
 
+    __slots__ = ('rectangle',)
+
     def __init__(self, rectangle: Rectangle):
         self.rectangle = rectangle
 
@@ -163,6 +220,20 @@ class RectangleResizer:
             raise self.ResizeError('Rectangle is big enough to contain rectangle_b')
         self._expand_rectangle_points(self.rectangle.top_left, self.rectangle.bottom_right, other_rect)
 
+    def expand_to_cover(self, other_rect: Rectangle):
+        """
+        Moves the Rectangle's points to the other rectangle's edges where it does not cover them yet
+        """
+        top_left, bottom_right = self.rectangle.top_left, self.rectangle.bottom_right
+        if other_rect.top_left.x < top_left.x:
+            top_left.x = other_rect.top_left.x
+        if other_rect.top_left.y > top_left.y:
+            top_left.y = other_rect.top_left.y
+        if other_rect.bottom_right.x > bottom_right.x:
+            bottom_right.x = other_rect.bottom_right.x
+        if other_rect.bottom_right.y < bottom_right.y:
+            bottom_right.y = other_rect.bottom_right.y
+
     @classmethod
     def rectangle_expanded_to(cls, rectangle_a: Rectangle, rectangle_b: Rectangle) -> Rectangle:
         """
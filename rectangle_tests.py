@@ -16,6 +16,21 @@ class RectangleTests(unittest.TestCase):
             # Bottom Right point cannot be left of Top Left
             Rectangle(top_left=Point(1, 1), bottom_right=Point(0, 0))
 
+    def test_rectangles_of_no_width_or_height_are_valid(self):
+        point_rect = Rectangle(top_left=Point(1, 1), bottom_right=Point(1, 1))
+        line_rect = Rectangle(top_left=Point(1, 3), bottom_right=Point(1, 1))
+
+        self.assertEqual(point_rect.area, 0)
+        self.assertTrue(line_rect.is_covering(point_rect))
+
+    def test_of_point_equals_a_rectangle_of_no_width_or_height(self):
+        point = Point(1.5, 2.5)
+        rect = Rectangle.of_point(point)
+
+        self.assertEqual(rect, Rectangle(top_left=Point(1.5, 2.5), bottom_right=Point(1.5, 2.5)))
+        self.assertIs(rect.top_left, point)
+        self.assertEqual((rect.width, rect.height, rect.area), (0, 0, 0))
+
     def test_equals_return_true_when_points_are_same(self):
         rect_b = Rectangle(top_left=Point(2, 4), bottom_right=Point(4, 3))
         self.assertEqual(self.rect_a, rect_b)
@@ -49,6 +64,17 @@ class RectangleTests(unittest.TestCase):
         expected_point = Point(4, 4)
         self.assertEqual(expected_point, self.rect_a.calculate_top_right())
 
+    def test_rectangle_and_points_do_not_keep_a_dict(self):
+        self.assertFalse(hasattr(self.rect_a, '__dict__'))
+        self.assertFalse(hasattr(self.rect_a.top_left, '__dict__'))
+
+    def test_resizer_is_bound_to_rectangle(self):
+        self.assertIs(self.rect_a.resizer.rectangle, self.rect_a)
+
+    def test_calculate_center_point(self):
+        expected_point = Point(3, 3.5)
+        self.assertEqual(expected_point, self.rect_a.calculate_center())
+
     def test_intersects_returns_false_when_rect_above(self):
         """
        ---------
@@ -203,6 +229,28 @@ class RectangleTests(unittest.TestCase):
         expected_distance = self.rect_a.calculate_top_right().distance_to(other_rect.top_left)
         self.assertEqual(expected_distance, self.rect_a.distance_between(other_rect))
 
+    def test_distance_between_rectangle_that_is_above_and_wider(self):
+        """
+     ------------------------
+     |          B           |
+     ------------------------
+
+        ---------
+        |         |
+        |   A     |
+        _________
+        """
+        other_rect = Rectangle(Point(0, 7), Point(10, 6))
+        self.assertEqual(2, self.rect_a.distance_between(other_rect))
+
+    def test_closest_point_to_point_outside(self):
+        self.assertEqual(Point(4, 3), self.rect_a.closest_point_to(Point(7, 0)))
+        self.assertEqual(Point(3, 4), self.rect_a.closest_point_to(Point(3, 10)))
+
+    def test_distance_to_point(self):
+        self.assertEqual(0, self.rect_a.distance_to_point(Point(3, 3.5)))
+        self.assertEqual(5, self.rect_a.distance_to_point(Point(7, 8)))
+
     def test_distance_between_rectangle_that_is_right_and_above(self):
         """
                             ---------
@@ -286,6 +334,23 @@ class RectangleTests(unittest.TestCase):
 
         self.assertEqual(expected_rectangle, Rectangle.containing(self.rect_a))
 
+    def test_covering_copies_coordinates_exactly(self):
+        rectangle = Rectangle(top_left=Point(2.125, 4.5), bottom_right=Point(4.75, 3.0625))
+        covering = Rectangle.covering(rectangle)
+
+        self.assertEqual(rectangle, covering)
+        self.assertIsNot(rectangle.top_left, covering.top_left)
+        self.assertIsNot(rectangle.bottom_right, covering.bottom_right)
+
+    def test_is_covering_includes_edges(self):
+        rect_b = Rectangle(top_left=Point(2, 4), bottom_right=Point(3, 3.5))
+
+        self.assertTrue(self.rect_a.is_covering(self.rect_a))
+        self.assertTrue(self.rect_a.is_covering(rect_b))
+        self.assertTrue(rect_b.is_covered_by(self.rect_a))
+        self.assertFalse(rect_b.is_covering(self.rect_a))
+        self.assertFalse(self.rect_a.is_covering(Rectangle(top_left=Point(3.5, 3.5), bottom_right=Point(4.5, 2.5))))
+
 
 class RectangleResizingTests(unittest.TestCase):
     def setUp(self):
@@ -346,6 +411,18 @@ class RectangleResizingTests(unittest.TestCase):
         self.assertEqual(rectangle.top_left.x, 9)
         self.assertEqual(rectangle.bottom_right.x, 21)
 
+    def test_expand_to_cover_moves_points_to_edges(self):
+        rectangle = Rectangle(Point(11.5, 9.25), Point(15, 7))
+        rectangle.expand_to_cover(self.rect_dummy)
+
+        self.assertEqual(rectangle, Rectangle(Point(10, 10), Point(20, 5)))
+        self.assertEqual(rectangle.area, 50)
+
+    def test_expand_to_cover_keeps_covering_rectangle(self):
+        rectangle = Rectangle(Point(10, 10), Point(20, 5))
+        rectangle.expand_to_cover(Rectangle(Point(12.5, 10), Point(20, 7.5)))
+        self.assertEqual(rectangle, self.rect_dummy)
+
     def test_expanded_to_raises_error_if_rectangle_already_contains_other_rect(self):
         rectangle = Rectangle(top_left=Point(9, 11), bottom_right=Point(21, 4))
         with self.assertRaises(RectangleResizer.ResizeError):
@@ -0,0 +1,120 @@
+"""
+Module that contains the binary snapshot format behind RTree.save and RTree.load.
+    A snapshot holds the tree's nodes as they are, so loading needs neither pickle nor any reinsertion.
+
+File layout (little-endian):
+    header:        magic, version, min order, max order, node count, name count
+    string table:  per Entry name, its UTF-8 length followed by the UTF-8 bytes,
+                   in the order the Entries appear in the nodes below
+    nodes:         in breadth-first order - is_leaf flag, item count and the node's MBR (min x, min y, max x, max y),
+                   followed in leaves by the MBR of every Entry.
+                   The children of internal nodes are implicit, as they follow in breadth-first order
+"""
+import struct
+
+from bounds import bounds_of, rectangle_of
+from rectangle import Rectangle
+
+MAGIC = b'RTSN'
+VERSION = 1
+
+HEADER = struct.Struct('<4sHxxIIQQ')
+NAME_LENGTH = struct.Struct('<I')
+NODE = struct.Struct('<BxxxIdddd')
+BOUNDS = struct.Struct('<dddd')
+
+
+def save(r_tree, path: str):
+    """
+    Writes the RTree's orders and nodes into a snapshot file
+    """
+    nodes = r_tree._nodes_breadth_first(r_tree.root)
+
+    names = bytearray()
+    name_count = 0
+    records = bytearray()
+    for node in nodes:
+        leaf = node.is_leaf()
+        records += NODE.pack(leaf, node.item_count(), *bounds_of(node.mbr))
+        if leaf:
+            for entry in node.entries:
+                records += BOUNDS.pack(*bounds_of(entry.mbr))
+                encoded_name = entry.name.encode('utf-8')
+                names += NAME_LENGTH.pack(len(encoded_name)) + encoded_name
+                name_count += 1
+
+    with open(path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, VERSION, r_tree.minimum_order, r_tree.maximum_order, len(nodes), name_count))
+        file.write(names)
+        file.write(records)
+
+
+def load(path: str, r_tree_class, **kwargs):
+    """
+    Reads a snapshot file back into a new tree
+    :param r_tree_class: The RTree class to create
+    :param kwargs: Passed on to the tree's constructor, along with the saved orders
+    """
+    with open(path, 'rb') as file:
+        data = file.read()
+    if len(data) < HEADER.size:
+        raise r_tree_class.InvalidSnapshotError(f'{path} is not an R-Tree snapshot')
+    magic, version, min_order, max_order, node_count, name_count = HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version != VERSION:
+        raise r_tree_class.InvalidSnapshotError(f'{path} is not a version {VERSION} R-Tree snapshot')
+
+    r_tree = r_tree_class(min_order, max_order, **kwargs)
+    try:
+        r_tree.root = _decode_nodes(data, r_tree, node_count, name_count)
+    except (struct.error, IndexError, UnicodeDecodeError, ValueError, Rectangle.InvalidRectangleError) as error:
+        raise r_tree_class.InvalidSnapshotError(f'{path} is a truncated or corrupt R-Tree snapshot') from error
+    return r_tree
+
+
+def _decode_nodes(data: bytes, r_tree, node_count: int, name_count: int):
+    """
+    Decodes the string table and nodes following the header into nodes of the given tree
+    :return: The root node, None for an empty tree
+    """
+    offset = HEADER.size
+    names = []
+    for _ in range(name_count):
+        (length,) = NAME_LENGTH.unpack_from(data, offset)
+        offset += NAME_LENGTH.size
+        if offset + length > len(data):
+            raise ValueError('Entry name runs past the end of the snapshot')
+        names.append(data[offset:offset + length].decode('utf-8'))
+        offset += length
+
+    nodes, child_counts = [], []
+    name_idx = 0
+    for _ in range(node_count):
+        leaf, item_count, *node_bounds = NODE.unpack_from(data, offset)
+        offset += NODE.size
+        node = r_tree._new_node(rectangle_of(node_bounds))
+        if leaf:
+            # The saved MBRs already bound their items, so they are attached directly instead of through place()
+            node.entries = [r_tree.entry_of(name, entry_bounds) for name, entry_bounds in
+                            zip(names[name_idx:name_idx + item_count],
+                                BOUNDS.iter_unpack(data[offset:offset + item_count * BOUNDS.size]))]
+            if len(node.entries) != item_count:
+                raise ValueError('Leaf Entries run past the end of the snapshot')
+            if node.locator is not None:
+                node.locator.update((entry.name, node) for entry in node.entries)
+            node.items_changed()
+            name_idx += item_count
+            offset += item_count * BOUNDS.size
+            item_count = 0
+        nodes.append(node)
+        child_counts.append(item_count)
+
+    next_child = 1
+    for node, child_count in zip(nodes, child_counts):
+        if child_count:
+            node.children = nodes[next_child:next_child + child_count]
+            node.items_changed()
+            next_child += child_count
+    if offset != len(data) or name_idx != name_count or (nodes and next_child != len(nodes)):
+        raise ValueError('Snapshot size does not match its header')
+
+    return nodes[0] if nodes else None
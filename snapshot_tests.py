@@ -0,0 +1,89 @@
+import os
+import tempfile
+import unittest
+
+from entry_fixtures import scattered_entries
+from packed_node import PackedRTree
+from point import Point
+from r_tree import RTree, Entry
+from rectangle import Rectangle
+from snapshot import HEADER, BOUNDS
+from split_strategies import RStarSplit
+
+
+class SnapshotTests(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'index.rts')
+
+    def assert_same_structure(self, node_a: RTree.RTreeNode, node_b: RTree.RTreeNode):
+        self.assertEqual(node_a.mbr, node_b.mbr)
+        self.assertEqual(node_a.entries, node_b.entries)
+        self.assertEqual(len(node_a.children), len(node_b.children))
+        for child_a, child_b in zip(node_a.children, node_b.children):
+            self.assert_same_structure(child_a, child_b)
+
+    def test_save_and_load_keeps_tree_as_is(self):
+        r_tree = RTree(2, 6)
+        for entry in scattered_entries(300, width=2.25, height=3.5, name='entry-{}-ü'):
+            r_tree.add(entry)
+
+        r_tree.save(self.path)
+        loaded_tree = RTree.load(self.path)
+
+        self.assertEqual(loaded_tree.minimum_order, 2)
+        self.assertEqual(loaded_tree.maximum_order, 6)
+        self.assert_same_structure(r_tree.root, loaded_tree.root)
+
+    def test_loaded_tree_can_be_modified(self):
+        entries = scattered_entries(100, width=2.25, height=3.5, name='entry-{}-ü')
+        RTree.bulk_load(entries, 2, 6).save(self.path)
+
+        loaded_tree = RTree.load(self.path, split_strategy=RStarSplit, locate_entries=True)
+        loaded_tree.add(Entry('new', bounds=Rectangle(Point(0, 1), Point(1, 0))))
+
+        self.assertIs(loaded_tree.split_strategy, RStarSplit)
+        self.assertIsNotNone(loaded_tree.get('new'))
+        self.assertIsNotNone(loaded_tree.get(entries[50].name))
+        self.assertTrue(loaded_tree.remove(entries[50].name))
+
+    def test_load_as_packed_tree(self):
+        entries = scattered_entries(100, width=2.25, height=3.5, name='entry-{}-ü')
+        RTree.bulk_load(entries, 2, 6).save(self.path)
+        window = Rectangle(Point(100, 400), Point(300, 150))
+
+        loaded_tree = PackedRTree.load(self.path)
+
+        self.assertIsInstance(loaded_tree.root, PackedRTree.RTreeNode)
+        self.assertCountEqual(loaded_tree.search(window),
+                              [entry for entry in entries if entry.mbr.is_intersecting(window)])
+
+    def test_save_and_load_empty_tree(self):
+        RTree(3, 9).save(self.path)
+        loaded_tree = RTree.load(self.path)
+
+        self.assertIsNone(loaded_tree.root)
+        self.assertEqual(loaded_tree.maximum_order, 9)
+
+    def test_load_rejects_truncated_and_corrupt_files(self):
+        RTree.bulk_load(scattered_entries(100, width=2.25, height=3.5, name='entry-{}-ü'), 2, 6).save(self.path)
+        with open(self.path, 'rb') as file:
+            data = file.read()
+
+        for corrupt_data in (data[:60], data[:-1], data[:-BOUNDS.size], data + b'\0',
+                             data[:HEADER.size] + b'\xff' * (len(data) - HEADER.size)):
+            with open(self.path, 'wb') as file:
+                file.write(corrupt_data)
+            with self.assertRaises(RTree.InvalidSnapshotError):
+                RTree.load(self.path)
+
+    def test_load_rejects_other_files(self):
+        with open(self.path, 'wb') as file:
+            file.write(b'not an r-tree snapshot')
+        with self.assertRaises(RTree.InvalidSnapshotError):
+            RTree.load(self.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,188 @@
+"""
+Module that contains the algorithms an RTree can use to split an overflowing node in two.
+    Every strategy works on the raw coordinates of the items' (Entries or RTreeNodes) MBRs
+    and only decides which items go together - building the nodes is left to the RTreeNode
+"""
+from bounds import bounds_of, union, area, margin_of, enlargement, overlap
+
+
+class SplitStrategy:
+    # Whether the tree should evict and re-add some of an overflowing node's items before splitting it
+    forced_reinsert = False
+
+    @classmethod
+    def split(cls, items: list, min_order: int) -> (list, list):
+        """
+        Distributes the items into two groups with at least min_order items each
+        """
+        raise NotImplementedError()
+
+
+class LinearSplit(SplitStrategy):
+    """
+    Guttman's linear split - picks as seeds the two items which are the furthest apart along either axis
+        and then assigns the rest in a single pass. Cheapest to run, meant for write-heavy trees with a large max_order
+    """
+    @classmethod
+    def split(cls, items: list, min_order: int) -> (list, list):
+        bounds = [bounds_of(item.mbr) for item in items]
+        seed_a, seed_b = cls._pick_seeds(bounds)
+
+        return distribute(items, bounds, seed_a, seed_b, min_order, pick_next=False)
+
+    @staticmethod
+    def _pick_seeds(bounds: [tuple]) -> (int, int):
+        best_separation, seeds = None, None
+        for low, high in ((0, 2), (1, 3)):
+            highest_low = max(range(len(bounds)), key=lambda idx: bounds[idx][low])
+            lowest_high = min((idx for idx in range(len(bounds)) if idx != highest_low),
+                              key=lambda idx: bounds[idx][high])
+            width = max(b[high] for b in bounds) - min(b[low] for b in bounds)
+            separation = (bounds[highest_low][low] - bounds[lowest_high][high]) / (width or 1)
+            if best_separation is None or separation > best_separation:
+                best_separation, seeds = separation, (lowest_high, highest_low)
+        return seeds
+
+
+class QuadraticSplit(SplitStrategy):
+    """
+    Guttman's quadratic split - picks as seeds the pair of items which would waste the most area if put together,
+        then repeatedly assigns the item with the strongest preference for one of the groups
+    """
+    @classmethod
+    def split(cls, items: list, min_order: int) -> (list, list):
+        bounds = [bounds_of(item.mbr) for item in items]
+        seed_a, seed_b = cls._pick_seeds(bounds)
+
+        return distribute(items, bounds, seed_a, seed_b, min_order, pick_next=True)
+
+    @staticmethod
+    def _pick_seeds(bounds: [tuple]) -> (int, int):
+        max_waste, seeds = None, None
+        for idx, bounds_a in enumerate(bounds):
+            for idx_2 in range(idx + 1, len(bounds)):
+                bounds_b = bounds[idx_2]
+                waste = area(union(bounds_a, bounds_b)) - area(bounds_a) - area(bounds_b)
+                if max_waste is None or waste > max_waste:
+                    max_waste, seeds = waste, (idx, idx_2)
+        return seeds
+
+
+class RStarSplit(SplitStrategy):
+    """
+    The R*-tree split - chooses the axis whose candidate distributions have the smallest total margin,
+        then the distribution along it with the least overlap between the two groups.
+        An overflowing node first evicts REINSERT_FRACTION of its items to be re-added, once per level and insertion.
+        Slower to write, but produces squarer and less overlapping nodes for read-heavy trees
+    """
+    forced_reinsert = True
+    REINSERT_FRACTION = 0.3
+
+    @classmethod
+    def split(cls, items: list, min_order: int) -> (list, list):
+        bounds = [bounds_of(item.mbr) for item in items]
+        min_size = max(1, min(min_order, len(items) // 2))
+
+        best_margin, best_orderings = None, None
+        for low, high in ((0, 2), (1, 3)):
+            orderings = [sorted(range(len(items)), key=lambda idx: (bounds[idx][low], bounds[idx][high])),
+                         sorted(range(len(items)), key=lambda idx: (bounds[idx][high], bounds[idx][low]))]
+            margin = sum(margin_of(bounds_a) + margin_of(bounds_b)
+                         for ordering in orderings
+                         for _, bounds_a, bounds_b in cls._distributions(bounds, ordering, min_size))
+            if best_margin is None or margin < best_margin:
+                best_margin, best_orderings = margin, orderings
+
+        best_cost, best_split = None, None
+        for ordering in best_orderings:
+            for size, bounds_a, bounds_b in cls._distributions(bounds, ordering, min_size):
+                cost = (overlap(bounds_a, bounds_b), area(bounds_a) + area(bounds_b))
+                if best_cost is None or cost < best_cost:
+                    best_cost, best_split = cost, (ordering, size)
+
+        ordering, size = best_split
+        return [items[idx] for idx in ordering[:size]], [items[idx] for idx in ordering[size:]]
+
+    @staticmethod
+    def _distributions(bounds: [tuple], ordering: [int], min_size: int):
+        """
+        Yields (size of first group, bounds of first group, bounds of second group)
+            for every split of the ordering which leaves both groups with at least min_size items
+        """
+        prefixes, suffixes = [], []
+        for idx in ordering:
+            prefixes.append(bounds[idx] if not prefixes else union(prefixes[-1], bounds[idx]))
+        for idx in reversed(ordering):
+            suffixes.append(bounds[idx] if not suffixes else union(suffixes[-1], bounds[idx]))
+        suffixes.reverse()
+
+        for size in range(min_size, len(ordering) - min_size + 1):
+            yield size, prefixes[size - 1], suffixes[size]
+
+
+class ForcedReinsertion:
+    """
+    Keeps track of the R* forced reinsertions done during a single insertion into the tree.
+        Every level gets to evict items once, the evicted items (orphans) are then re-added by the tree
+    """
+    def __init__(self, fraction: float, root_height: int):
+        self.fraction = fraction
+        self.levels = {root_height}  # the root is never reinserted from, it splits
+        self.orphans = []
+
+    def evict(self, node, leaf: bool) -> bool:
+        """
+        Removes the items whose centers are the furthest away from the node's center, to be reinserted later
+        :return: Boolean, indicating if items were evicted. If not, the node should be split
+        """
+        height = node.height()
+        if height in self.levels:
+            return False
+        self.levels.add(height)
+
+        items = node.entries if leaf else node.children
+        center = node.mbr.calculate_center()
+        items.sort(key=lambda item: center.distance_to(item.mbr.calculate_center()))
+        evicted_count = max(1, int(len(items) * self.fraction))
+        evicted = items[-evicted_count:]
+        del items[-evicted_count:]
+        node.items_changed()
+        node.recalculate_mbr()
+
+        # Closest first ("close reinsert")
+        self.orphans.extend((item, height) for item in evicted)
+        return True
+
+
+def distribute(items: list, bounds: [tuple], seed_a: int, seed_b: int, min_order: int, pick_next: bool) -> (list, list):
+    """
+    Guttman's distribution of the items between the two groups started by the seeds.
+        Each item goes to the group whose bounds need the least enlargement for it,
+        unless a group needs every remaining item to reach min_order.
+    :param pick_next: Whether to always assign the item with the biggest enlargement difference next (quadratic)
+        or simply go through the items in order (linear)
+    """
+    min_size = min(min_order, len(items) // 2)
+    groups = ([items[seed_a]], [items[seed_b]])
+    group_bounds = [bounds[seed_a], bounds[seed_b]]
+    remaining = [idx for idx in range(len(items)) if idx != seed_a and idx != seed_b]
+
+    while remaining:
+        for group_idx in (0, 1):
+            if len(groups[group_idx]) + len(remaining) == min_size:
+                groups[group_idx].extend(items[idx] for idx in remaining)
+                return groups
+
+        if pick_next:
+            idx = max(remaining, key=lambda i: abs(enlargement(group_bounds[0], bounds[i])
+                                                   - enlargement(group_bounds[1], bounds[i])))
+            remaining.remove(idx)
+        else:
+            idx = remaining.pop(0)
+
+        group_idx = min((0, 1), key=lambda g: (enlargement(group_bounds[g], bounds[idx]),
+                                               area(group_bounds[g]), len(groups[g])))
+        groups[group_idx].append(items[idx])
+        group_bounds[group_idx] = union(group_bounds[group_idx], bounds[idx])
+
+    return groups
@@ -0,0 +1,70 @@
+import unittest
+
+from r_tree import Entry
+from rectangle import Rectangle, Point
+from split_strategies import LinearSplit, QuadraticSplit, RStarSplit, distribute
+from bounds import bounds_of
+
+
+class SplitStrategiesTests(unittest.TestCase):
+    def setUp(self):
+        """
+        The layout of RTreeTests.test_split - A and B overlap on the left, C is a thin rectangle and D a big one on the right
+        """
+        self.entry_a = Entry('A', bounds=Rectangle(Point(22, 40), Point(30, 30)))
+        self.entry_b = Entry('B', bounds=Rectangle(Point(25, 35), Point(40, 25)))
+        self.entry_c = Entry('C', bounds=Rectangle(Point(44, 40), Point(47, 25)))
+        self.entry_d = Entry('D', bounds=Rectangle(Point(52, 43), Point(68, 22)))
+        self.entries = [self.entry_a, self.entry_b, self.entry_c, self.entry_d]
+
+    def assert_split_into(self, groups, expected_groups):
+        self.assertCountEqual([sorted(entry.name for entry in group) for group in groups], expected_groups)
+
+    def test_linear_split(self):
+        groups = LinearSplit.split(self.entries, 2)
+        self.assert_split_into(groups, [['A', 'B'], ['C', 'D']])
+
+    def test_linear_split_seeds_are_furthest_apart_along_an_axis(self):
+        bounds = [bounds_of(entry.mbr) for entry in self.entries]
+        self.assertEqual(LinearSplit._pick_seeds(bounds), (0, 3))
+
+    def test_quadratic_split(self):
+        groups = QuadraticSplit.split(self.entries, 2)
+        self.assert_split_into(groups, [['A', 'B'], ['C', 'D']])
+
+    def test_quadratic_split_seeds_waste_the_most_area(self):
+        bounds = [bounds_of(entry.mbr) for entry in self.entries]
+        self.assertEqual(QuadraticSplit._pick_seeds(bounds), (0, 3))
+
+    def test_r_star_split(self):
+        groups = RStarSplit.split(self.entries, 2)
+        self.assert_split_into(groups, [['A', 'B'], ['C', 'D']])
+
+    def test_r_star_split_minimizes_overlap(self):
+        """
+        Four entries in a row, where the middle two overlap - splitting them apart would leave the groups overlapping
+        """
+        entries = [Entry('0', bounds=Rectangle(Point(0, 10), Point(10, 0))),
+                   Entry('1', bounds=Rectangle(Point(12, 10), Point(22, 0))),
+                   Entry('2', bounds=Rectangle(Point(20, 10), Point(30, 0))),
+                   Entry('3', bounds=Rectangle(Point(40, 10), Point(50, 0))),
+                   Entry('4', bounds=Rectangle(Point(52, 10), Point(62, 0)))]
+        groups = RStarSplit.split(entries, 2)
+        self.assert_split_into(groups, [['0', '1', '2'], ['3', '4']])
+
+    def test_distribute_fills_up_group_to_min_order(self):
+        """
+        Every entry is closer to A, but B's group must still get the minimum of 2
+        """
+        entries = [Entry(str(idx), bounds=Rectangle(Point(idx, 1), Point(idx + 1, 0))) for idx in range(4)]
+        entries.append(Entry('far', bounds=Rectangle(Point(100, 1), Point(101, 0))))
+        bounds = [bounds_of(entry.mbr) for entry in entries]
+
+        group_a, group_b = distribute(entries, bounds, 0, 4, 2, pick_next=True)
+
+        self.assertEqual(len(group_b), 2)
+        self.assertEqual(len(group_a), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
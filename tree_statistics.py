@@ -0,0 +1,109 @@
+"""
+Module that contains the statistics behind RTree's collect_statistics option.
+    The tree and its nodes only check whether they have a TreeStatistics to report to,
+    so a tree which does not collect any pays for little more than that check
+"""
+import time
+from collections import Counter, namedtuple
+
+InsertEvent = namedtuple('InsertEvent', ['entry', 'seconds'])
+# level is the height of the split node - 0 for leaves
+SplitEvent = namedtuple('SplitEvent', ['level', 'item_count', 'seconds'])
+# kind is 'search', 'nearest', 'contained_in' or 'containing', query the window or the queried Point/Rectangle
+QueryEvent = namedtuple('QueryEvent', ['kind', 'query', 'nodes_visited', 'entries_tested', 'result_count', 'seconds'])
+
+
+class TreeStatistics:
+    """
+    Counts the work an RTree does and passes its insert, split and query events on to the subscribed callbacks
+    """
+    def __init__(self):
+        self.insert_callbacks = []
+        self.split_callbacks = []
+        self.query_callbacks = []
+        self.reset()
+
+    def reset(self):
+        """
+        Sets every counter back to zero, keeping the callbacks
+        """
+        self.inserts = 0
+        self.queries = 0
+        self.nodes_visited = 0
+        self.entries_tested = 0
+        self.intersection_tests = 0  # every MBR tested against a search window
+        self.splits_by_level = Counter()
+        self.split_seconds = 0.0
+        self.choose_subtree_seconds = 0.0
+
+    def on_insert(self, callback):
+        """
+        Subscribes the callback to every add(), called with an InsertEvent once the Entry is in the tree
+        """
+        self.insert_callbacks.append(callback)
+
+    def on_split(self, callback):
+        """
+        Subscribes the callback to every node split, called with a SplitEvent
+        """
+        self.split_callbacks.append(callback)
+
+    def on_query(self, callback):
+        """
+        Subscribes the callback to every search(), nearest(), contained_in() and containing(), called with a QueryEvent
+        """
+        self.query_callbacks.append(callback)
+
+    def visit(self, node, tested_items: int):
+        """
+        Counts a node visited by a query, which tested the MBRs of tested_items of its items
+        """
+        self.nodes_visited += 1
+        self.intersection_tests += tested_items
+        if node.is_leaf():
+            self.entries_tested += tested_items
+
+    def record_insert(self, entry, seconds: float):
+        self.inserts += 1
+        for callback in self.insert_callbacks:
+            callback(InsertEvent(entry, seconds))
+
+    def record_split(self, level: int, item_count: int, seconds: float):
+        self.splits_by_level[level] += 1
+        self.split_seconds += seconds
+        for callback in self.split_callbacks:
+            callback(SplitEvent(level, item_count, seconds))
+
+    def measure_query(self, kind: str, query, run, *args) -> list:
+        """
+        Runs a query, counting the nodes it visits and the Entries it tests
+        :param run: The function answering the query, called with the query and args
+        :return: The query's results
+        """
+        nodes_visited, entries_tested = self.nodes_visited, self.entries_tested
+        start = time.perf_counter()
+        results = run(query, *args)
+        seconds = time.perf_counter() - start
+
+        self.queries += 1
+        if self.query_callbacks:
+            event = QueryEvent(kind, query, self.nodes_visited - nodes_visited, self.entries_tested - entries_tested,
+                               len(results), seconds)
+            for callback in self.query_callbacks:
+                callback(event)
+        return results
+
+    def as_dict(self) -> dict:
+        """
+        :return: The counters, e.g for a metrics exporter
+        """
+        return {
+            'inserts': self.inserts,
+            'queries': self.queries,
+            'nodes_visited': self.nodes_visited,
+            'entries_tested': self.entries_tested,
+            'intersection_tests': self.intersection_tests,
+            'splits_by_level': dict(self.splits_by_level),
+            'split_seconds': self.split_seconds,
+            'choose_subtree_seconds': self.choose_subtree_seconds,
+        }
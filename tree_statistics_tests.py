@@ -0,0 +1,90 @@
+import unittest
+
+from concurrent_r_tree import ConcurrentRTree
+from entry_fixtures import grid_entries
+from packed_node import PackedRTree
+from point import Point
+from r_tree import RTree, Entry
+from rectangle import Rectangle
+
+
+class TreeStatisticsTests(unittest.TestCase):
+    def test_disabled_by_default(self):
+        r_tree = RTree(2, 4)
+        r_tree.insert_many(grid_entries(5, 5))
+        self.assertIsNone(r_tree.statistics)
+        self.assertTrue(all(node.statistics is None for node in [r_tree.root] + r_tree.root.children))
+
+    def test_counts_inserts_and_splits_by_level(self):
+        r_tree = RTree(2, 4, collect_statistics=True)
+        inserts, splits = [], []
+        r_tree.statistics.on_insert(inserts.append)
+        r_tree.statistics.on_split(splits.append)
+        entries = grid_entries(10, 10)
+        r_tree.insert_many(entries)
+
+        statistics = r_tree.statistics
+        self.assertEqual(statistics.inserts, 100)
+        self.assertCountEqual([event.entry for event in inserts], entries)
+        self.assertEqual(sum(statistics.splits_by_level.values()), len(splits))
+        self.assertGreater(statistics.splits_by_level[0], statistics.splits_by_level[1])
+        self.assertEqual(max(statistics.splits_by_level), r_tree.root.height() - 1)
+        self.assertTrue(all(event.item_count == 5 for event in splits))
+        self.assertGreater(statistics.split_seconds, 0)
+        self.assertGreater(statistics.choose_subtree_seconds, 0)
+
+    def test_counts_nodes_visited_by_queries(self):
+        r_tree = RTree.bulk_load(grid_entries(10, 10), 2, 4, collect_statistics=True)
+        queries = []
+        r_tree.statistics.on_query(queries.append)
+
+        window = Rectangle(Point(12, 38), Point(33, 18))
+        results = r_tree.search(window)
+        expected_visited = [r_tree.root]
+        for node in expected_visited:  # grows while iterating
+            if not node.is_leaf():
+                expected_visited.extend(node.intersecting_items(window))
+        leaves = [node for node in expected_visited if node.is_leaf()]
+
+        event = queries[0]
+        self.assertEqual((event.kind, event.query, event.result_count), ('search', window, len(results)))
+        self.assertEqual(event.nodes_visited, len(expected_visited))
+        self.assertEqual(event.entries_tested, sum(len(leaf.entries) for leaf in leaves))
+        self.assertEqual(r_tree.statistics.intersection_tests, sum(node.item_count() for node in expected_visited))
+
+        r_tree.nearest(Point(0, 0), k=3)
+        self.assertEqual(queries[1].kind, 'nearest')
+        self.assertEqual(queries[1].result_count, 3)
+        self.assertGreaterEqual(queries[1].nodes_visited, r_tree.root.height() + 1)
+        self.assertEqual(r_tree.statistics.queries, 2)
+
+    def test_reset_keeps_callbacks(self):
+        r_tree = RTree(2, 4, collect_statistics=True)
+        inserts = []
+        r_tree.statistics.on_insert(inserts.append)
+        r_tree.insert_many(grid_entries(3, 3))
+        r_tree.statistics.reset()
+        self.assertEqual(r_tree.statistics.as_dict()['inserts'], 0)
+
+        r_tree.add(Entry('new', bounds=Rectangle(Point(0, 1), Point(1, 0))))
+        self.assertEqual(r_tree.statistics.inserts, 1)
+        self.assertEqual(len(inserts), 10)
+
+    def test_subclasses_and_snapshots_collect_statistics(self):
+        packed = PackedRTree(2, 4, collect_statistics=True)
+        packed.insert_many(grid_entries(5, 5))
+        packed.search(Rectangle(Point(0, 50), Point(50, 0)))
+        self.assertGreater(packed.statistics.splits_by_level[0], 0)
+        self.assertEqual(packed.statistics.entries_tested, 25)
+
+        concurrent = ConcurrentRTree(2, 4, collect_statistics=True)
+        concurrent.insert_many(grid_entries(5, 5))
+        concurrent.add(Entry('new', bounds=Rectangle(Point(0, 1), Point(1, 0))))
+        concurrent.search(Rectangle(Point(0, 50), Point(50, 0)))
+        statistics = concurrent.snapshot().statistics
+        self.assertEqual(statistics.inserts, 26)
+        self.assertEqual(statistics.entries_tested, 26)
+
+
+if __name__ == '__main__':
+    unittest.main()